@@ -8,14 +8,31 @@ Provides API endpoints for quantum circuit simulation and visualization.
 
 import os
 import json
-from flask import Flask, request, jsonify, send_from_directory
+import threading
+import time
+import uuid
+from concurrent.futures import as_completed
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+from flask_sock import ConnectionClosed, Sock
 from dotenv import load_dotenv
 
-# Import quantum modules
+# Import quantum modules (Qiskit, Aer and matplotlib are loaded lazily)
 from quantum.circuit_simulator import CircuitSimulator
+from quantum.admission import QUEUE, REJECT, RUN, AdmissionController
 from quantum.algorithm_library import AlgorithmLibrary
 from quantum.visualization import StateVisualizer
+from quantum.ir import compile_circuit, ir_cache_stats
+from quantum.noise import NoiseModel
+from quantum.result_cache import circuit_cache_key, create_result_cache
+from quantum.rendering import HistogramRenderer
+from quantum.batch import SimulationPool
+from quantum.jobs import DONE, JobQueue
+from quantum.serialization import encode_response, encode_sweep, negotiate_statevector_format
+from quantum.sweep import ParameterSweep, sweep_values
+from quantum.observables import ExpectationEstimator
+from quantum.gradients import AdjointGradient
+from quantum.streaming import CreditWindow, StateStreamer
 
 # Load environment variables
 load_dotenv()
@@ -23,17 +40,52 @@ load_dotenv()
 # Initialize Flask app
 app = Flask(__name__, static_folder='../frontend/build')
 CORS(app)  # Enable CORS for all routes
+sock = Sock(app)
 
 # Initialize quantum modules
 circuit_simulator = CircuitSimulator()
+admission_controller = AdmissionController(circuit_simulator)
 algorithm_library = AlgorithmLibrary()
 state_visualizer = StateVisualizer()
+result_cache = create_result_cache()
+histogram_renderer = HistogramRenderer()
+simulation_pool = SimulationPool()
+# Noisy trajectories are spread over the simulation processes
+circuit_simulator.noise_simulator.pool = simulation_pool
+parameter_sweep = ParameterSweep()
+expectation_estimator = ExpectationEstimator()
+adjoint_gradient = AdjointGradient()
+state_streamer = StateStreamer()
+job_queue = JobQueue()
+
+def _warmup():
+    """Load the heavy simulation dependencies in the background."""
+    try:
+        circuit_simulator.warmup()
+    except Exception as e:
+        app.logger.error("Warmup failed: %s", e)
+
+# Import Qiskit/Aer off the main thread so the server answers liveness checks
+# immediately; set WARMUP=0 to load them on the first simulation instead.
+WARMUP_ENABLED = os.environ.get('WARMUP', '1') != '0'
+if WARMUP_ENABLED:
+    threading.Thread(target=_warmup, name='quantum-warmup', daemon=True).start()
+
+# Seconds a state stream waits for the client's request or acknowledgements
+STREAM_TIMEOUT = float(os.environ.get('STREAM_TIMEOUT', 60))
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint to verify the API is running."""
+    """Health check endpoint to verify the API is running (liveness)."""
     return jsonify({"status": "healthy", "version": "1.0.0"})
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: succeeds once the simulation backends are loaded."""
+    if WARMUP_ENABLED and not circuit_simulator.is_warm:
+        return jsonify({"status": "warming_up"}), 503
+    return jsonify({"status": "ready"})
+
 @app.route('/api/simulate', methods=['POST'])
 def simulate_circuit():
     """
@@ -46,33 +98,638 @@ def simulate_circuit():
             "gates": [
                 {"type": "h", "targets": [0]},
                 {"type": "cx", "controls": [0], "targets": [1]},
+                {"type": "measure", "targets": [0]},  # measurements may be mid-circuit
+                {"type": "x", "targets": [2], "c_if": {"clbit": 0, "value": 1}},  # only if bit 0 reads 1
                 ...
+            ],
+            "noise": {  # optional, simulated by the NumPy engine without optimization
+                "depolarizing": 0.01,  # or {"probability": 0.01, "gates": ["cx"]}
+                "amplitude_damping": 0.005,
+                "readout_error": 0.02,  # or {"p1_given_0": 0.01, "p0_given_1": 0.03}
+                "method": "auto",  # "auto", "density_matrix" or "trajectories"
+                "trajectories": 500
+            }
+        },
+        "shots": 1024,
+        "backend": "auto",  # optional: "auto", "numpy", "aer", "stabilizer", "mps" or "out_of_core" (jobs only)
+        "backend_options": {"max_bond_dimension": 64},  # optional, MPS settings
+        "optimize": true,  # optional: cancel/merge/fuse gates before simulating
+        "precision": "single",  # optional: "double" (default) or "single" (complex64 statevector)
+        "checkpoint": true,  # optional: resume from/keep intermediate states while editing a circuit
+        "seed": 42,         # optional: seed for measurement sampling (only seeded results are cached)
+        "include": ["histogram_image"],  # optional extras, also accepted as ?include=
+        "statevector_format": "columnar",  # optional: "records" (default) or "columnar"
+        "dtype": "float32",  # optional columnar dtype: "float32" or "float64"
+        "top_k": 64,         # optional sparse mode: most probable states only
+        "threshold": 1e-6    # optional sparse mode: minimum probability
+    }
+    
+    Sending "Accept: application/vnd.quantumsandbox.columnar+json" also
+    selects the columnar statevector format.
+    
+    The response carries a "result_id" that can be passed to
+    /api/render/histogram/<result_id> to fetch the histogram image later,
+    and the predicted and actual cost under result.cost.
+    
+    Before simulating, the cost model predicts memory and runtime: requests
+    over the memory limit are rejected with 413 (or moved to a cheaper
+    backend when "backend" is "auto"), and requests predicted to be slow are
+    turned into a job and answered with 202 as by POST /api/jobs.
+    """
+    try:
+        data = request.json
+        if not data or 'circuit' not in data:
+            return jsonify({"error": "Invalid request format"}), 400
+        try:
+            wire_format = negotiate_statevector_format(data, request.headers.get('Accept'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        cache_key, options, decision = _simulation_request(data)
+        
+        # Identical seeded requests (e.g. library circuits) are served from the cache
+        response = _cached_response(cache_key, options)
+        if response is None:
+            if decision['action'] == REJECT:
+                return jsonify({"error": decision['reason'], "estimate": decision['estimate']}), 413
+            if decision['action'] == QUEUE:
+                return _queue_job(cache_key, options, decision)
+            response = _run_simulation(cache_key, options, decision['estimate'])
+        
+        # NumPy results are converted to JSON only here
+        response = dict(encode_response(response, **wire_format), result_id=cache_key)
+        if 'histogram_image' in _requested_extras(data):
+            image = histogram_renderer.render_histogram(cache_key, response['result']['counts'])
+            response['result'] = dict(response['result'], histogram_image=image)
+        
+        response = jsonify(response)
+        response.vary.add('Accept')
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _simulation_request(data, asynchronous=False):
+    """
+    Read the simulation options of a request payload and admit it.
+    
+    Args:
+        data (dict): /api/simulate style payload
+        asynchronous (bool): Whether the request is served by the job queue
+    
+    Returns:
+        tuple: (result cache key, dict of compiled circuit and simulation
+        options, admission decision)
+    """
+    # Parse and validate once; the IR is cached by circuit hash
+    options = {
+        "compiled": compile_circuit(data['circuit']),
+        "shots": data.get('shots', 1024),
+        "backend": data.get('backend', 'auto'),
+        "seed": data.get('seed'),
+        "backend_options": data.get('backend_options') or {},
+        "optimize": bool(data.get('optimize', True)),
+        "precision": data.get('precision', 'double'),
+        "noise": NoiseModel.from_dict(data['circuit'].get('noise')),
+        "checkpoint": bool(data.get('checkpoint', False))
+    }
+    dtype = CircuitSimulator.PRECISIONS.get(options['precision'])
+    if dtype is None:
+        raise ValueError(f"Unknown precision '{options['precision']}', expected one of {', '.join(CircuitSimulator.PRECISIONS)}")
+    
+    # The admitted backend may be a cheaper one than requested
+    decision = admission_controller.admit(options['compiled'], options['shots'], options['backend'], dtype=dtype,
+                                          options=options['backend_options'], asynchronous=asynchronous,
+                                          noise=options['noise'])
+    options['backend'] = decision['backend']
+    
+    # Unseeded requests draw fresh shots every time: their key is unique, so
+    # their result is only kept for /api/render/histogram/<result_id>
+    unseeded = {"request": uuid.uuid4().hex} if options['seed'] is None else {}
+    cache_key = circuit_cache_key(options['compiled'], options['shots'], options['seed'], backend=options['backend'],
+                                  backend_options=options['backend_options'], optimize=options['optimize'],
+                                  precision=options['precision'], noise=data['circuit'].get('noise'), **unseeded)
+    return cache_key, options, decision
+
+def _cached_response(cache_key, options):
+    """
+    Look up the cached response of a simulation request.
+    
+    Args:
+        cache_key (str): Result cache key
+        options (dict): Options from _simulation_request
+    
+    Returns:
+        dict: Raw response, or None if it is not cached or the request has no seed
+    """
+    if options['seed'] is None:
+        return None
+    return result_cache.get(cache_key)
+
+def _run_simulation(cache_key, options, estimate, progress=None):
+    """
+    Simulate an admitted request, report its cost and cache the response.
+    
+    Args:
+        cache_key (str): Result cache key
+        options (dict): Options from _simulation_request
+        estimate (dict): Predicted cost from the admission decision
+        progress (callable): Optional progress hook (see CircuitSimulator.simulate)
+    
+    Returns:
+        dict: Raw {"result": ..., "visualization": ...} response
+    """
+    start = time.perf_counter()
+    result = circuit_simulator.simulate(options['compiled'], options['shots'], backend=options['backend'],
+                                        seed=options['seed'], options=options['backend_options'],
+                                        optimize=options['optimize'], progress=progress,
+                                        precision=options['precision'], noise=options['noise'],
+                                        checkpoint=options['checkpoint'])
+    visualization = state_visualizer.generate_visualization(result)
+    result['cost'] = admission_controller.record(estimate, time.perf_counter() - start)
+    
+    response = {
+        "result": result,
+        "visualization": visualization
+    }
+    result_cache.put(cache_key, response)
+    return response
+
+def _queue_job(cache_key, options, decision):
+    """
+    Submit an admitted request to the job queue.
+    
+    Args:
+        cache_key (str): Result cache key
+        options (dict): Options from _simulation_request
+        decision (dict): Admission decision
+    
+    Returns:
+        tuple: (202 response with the job status, status code)
+    """
+    def task(progress):
+        response = _cached_response(cache_key, options)
+        if response is None:
+            response = _run_simulation(cache_key, options, decision['estimate'], progress)
+        return response
+    
+    compiled = options['compiled']
+    job = job_queue.submit(task, job_queue.lane_for(compiled.num_qubits, len(compiled)),
+                           shots=options['shots'], result_id=cache_key, admission=decision)
+    response = jsonify(job.to_dict())
+    response.headers['Location'] = f'/api/jobs/{job.id}'
+    return response, 202
+
+@app.route('/api/simulate/batch', methods=['POST'])
+def simulate_batch():
+    """
+    Simulate several circuits in the simulation worker pool.
+    
+    Expected JSON payload:
+    {
+        "requests": [
+            {"circuit": {...}, "shots": 1024, "seed": 1},  # same fields as /api/simulate
+            ...
+        ],
+        "shots": 1024,       # optional defaults applied to every request
+        "backend": "auto",
+        "stream": false,     # optional: stream NDJSON lines as circuits finish
+        "statevector_format": "columnar"  # optional wire format options as for /api/simulate
+    }
+    
+    Identical seeded requests within the batch are simulated once, and
+    their results already in the result cache are not simulated at all;
+    requests without a seed always sample fresh shots. Without streaming
+    the response is {"results": [...]} in request order; each entry has an
+    "index", and either the simulate response fields or an "error". With
+    "stream": true (or "Accept: application/x-ndjson") one JSON line is
+    written per request as soon as its circuit completes.
+    """
+    try:
+        data = request.json
+        if not data or not isinstance(data.get('requests'), list):
+            return jsonify({"error": "Invalid request format"}), 400
+        
+        try:
+            wire_format = negotiate_statevector_format(data, request.headers.get('Accept'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        defaults = {key: value for key, value in data.items() if key not in ('requests', 'stream')}
+        
+        entries = {}
+        estimates = {}
+        indices_by_key = {}
+        errors = {}
+        for index, item in enumerate(data['requests']):
+            item = dict(defaults, **item) if isinstance(item, dict) else {}
+            if 'circuit' not in item:
+                errors[index] = "Invalid request format"
+                continue
+            try:
+                cache_key, options, decision = _simulation_request(item)
+            except Exception as e:
+                errors[index] = str(e)
+                continue
+            if decision['action'] != RUN and _cached_response(cache_key, options) is None:
+                errors[index] = decision['reason'] + ("; submit it to /api/jobs" if decision['action'] == QUEUE else "")
+                continue
+            indices_by_key.setdefault(cache_key, []).append(index)
+            if cache_key not in entries:
+                entries[cache_key] = _cached_response(cache_key, options)
+                if entries[cache_key] is None:
+                    # Batch workers keep no checkpoints
+                    options.pop('checkpoint')
+                    entries[cache_key] = simulation_pool.submit(**options)
+                    estimates[cache_key] = decision['estimate']
+        
+        def completed():
+            """Yield (cache key, raw response or exception) as simulations finish."""
+            futures = {}
+            for cache_key, entry in entries.items():
+                if isinstance(entry, dict):
+                    yield cache_key, entry
+                else:
+                    futures[entry] = cache_key
+            for future in as_completed(futures):
+                cache_key = futures[future]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    yield cache_key, e
+                    continue
+                response['result']['cost'] = admission_controller.record(estimates[cache_key],
+                                                                         response.pop('runtime_seconds'))
+                result_cache.put(cache_key, response)
+                yield cache_key, response
+        
+        def lines():
+            """Yield one encoded entry per request index."""
+            for index, error in errors.items():
+                yield {"index": index, "error": error}
+            for cache_key, response in completed():
+                if isinstance(response, Exception):
+                    encoded = {"error": str(response)}
+                else:
+                    encoded = dict(encode_response(response, **wire_format), result_id=cache_key)
+                for index in indices_by_key[cache_key]:
+                    yield dict(encoded, index=index)
+        
+        if data.get('stream') or 'application/x-ndjson' in (request.headers.get('Accept') or ''):
+            stream = (json.dumps(line) + '\n' for line in lines())
+            return Response(stream, mimetype='application/x-ndjson')
+        
+        results = sorted(lines(), key=lambda line: line['index'])
+        response = jsonify({"results": results})
+        response.vary.add('Accept')
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _serve_computation(kind, compiled, cache_key, compute, finish=None, **cost):
+    """
+    Admit and serve a sweep, expectation or gradient request on the NumPy engine.
+    
+    Results already in the result cache are sent right away. Otherwise the
+    request is rejected with 413 when it does not fit, turned into a job
+    (202) when it is predicted to be slow, or computed in the request thread.
+    
+    Args:
+        kind (str): Job kind reported with the job status
+        compiled (CompiledCircuit): Compiled circuit
+        cache_key (str): Result cache key
+        compute (callable): compute() -> result to cache
+        finish (callable): Optional finish(result) -> JSON-serializable response
+            body, applied to cached results as well
+        **cost: "copies" and "repeats" for the cost model (see CostModel.estimate)
+    
+    Returns:
+        Response with status 200, 202 or 413
+    """
+    def task(progress=None):
+        result = result_cache.get(cache_key)
+        if result is None:
+            result = compute()
+            result_cache.put(cache_key, result)
+        return finish(result) if finish else result
+    
+    if result_cache.get(cache_key) is None:
+        decision = admission_controller.admit(compiled, 0, 'numpy', **cost)
+        if decision['action'] == REJECT:
+            return jsonify({"error": decision['reason'], "estimate": decision['estimate']}), 413
+        if decision['action'] == QUEUE:
+            job = job_queue.submit(task, job_queue.lane_for(compiled.num_qubits, len(compiled)), kind=kind,
+                                   admission=decision)
+            response = jsonify(job.to_dict())
+            response.headers['Location'] = f'/api/jobs/{job.id}'
+            return response, 202
+    return jsonify(task())
+
+@app.route('/api/sweep', methods=['POST'])
+def sweep_parameters():
+    """
+    Evaluate a circuit with symbolic rotation angles over many parameter values.
+    
+    Expected JSON payload:
+    {
+        "circuit": {
+            "qubits": 2,
+            "gates": [
+                {"type": "ry", "targets": [0], "theta": "alpha"},  # named parameter
+                {"type": "cx", "controls": [0], "targets": [1]},
+                {"type": "rz", "targets": [1], "theta": "beta"}
             ]
         },
-        "shots": 1024
+        "grid": {"alpha": [0, 0.5, 1.0], "beta": {"start": 0, "stop": 3.14, "num": 20}},
+        "points": [{"alpha": 0.1, "beta": 0.2}, ...],  # instead of "grid"
+        "observables": ["ZZ", "XI"],  # optional Pauli strings of I, X, Y, Z (qubit 0 rightmost)
+        "probabilities": true          # optional, default true
     }
+    
+    The circuit is compiled once and all points are simulated together as a
+    batched statevector. The response lists the parameter "points" and, per
+    point, the measured-qubit "probabilities" (labelled like counts) and
+    the "expectations" of each observable.
+    
+    Sweeps are admitted like /api/simulate, with one statevector per point:
+    413 when they do not fit, 202 and a job when they are predicted to be slow.
     """
     try:
         data = request.json
         if not data or 'circuit' not in data:
             return jsonify({"error": "Invalid request format"}), 400
         
-        circuit_def = data['circuit']
-        shots = data.get('shots', 1024)
+        compiled = compile_circuit(data['circuit'])
+        observables = data.get('observables') or []
+        include_probabilities = bool(data.get('probabilities', True))
+        values = sweep_values(compiled.parameters, data.get('grid'), data.get('points'))
+        num_points = len(next(iter(values.values()))) if values else 1
         
-        # Run simulation
-        result = circuit_simulator.simulate(circuit_def, shots)
+        cache_key = circuit_cache_key(compiled, None, None, grid=data.get('grid'), points=data.get('points'),
+                                      observables=observables, probabilities=include_probabilities)
+        return _serve_computation(
+            'sweep', compiled, cache_key,
+            lambda: parameter_sweep.run(compiled, values, observables, include_probabilities),
+            encode_sweep, **parameter_sweep.cost(compiled.num_qubits, num_points, include_probabilities))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/expectation', methods=['POST'])
+def expectation_values():
+    """
+    Compute exact expectation values of Pauli observables without sampling.
+    
+    Expected JSON payload:
+    {
+        "circuit": {
+            "qubits": 2,
+            "gates": [
+                {"type": "h", "targets": [0]},
+                {"type": "cx", "controls": [0], "targets": [1]}
+            ]
+        },
+        "observables": [
+            "ZZ",                                  # Pauli string, qubit 0 rightmost
+            {"pauli": "XX", "coefficient": 0.5}    # weighted term
+        ],
+        "shots": 1024,  # optional: add the shot noise of estimating each term from this many shots
+        "seed": 42      # optional: seed for the sampled estimates
+    }
+    
+    The observables are evaluated on the final statevector (terminal
+    measurements are ignored). The response lists each term's exact
+    "expectation" and the weighted "total"; with "shots" each term also gets
+    its "standard_error" and a "sampled" estimate, plus the
+    "total_standard_error" and "sampled_total" of the weighted sum.
+    
+    Requests are admitted like /api/simulate: 413 when the statevector does
+    not fit, 202 and a job when they are predicted to be slow.
+    """
+    try:
+        data = request.json
+        if not data or 'circuit' not in data or 'observables' not in data:
+            return jsonify({"error": "Invalid request format"}), 400
         
-        # Generate visualization data
-        visualization = state_visualizer.generate_visualization(result)
+        compiled = compile_circuit(data['circuit'])
         
-        return jsonify({
-            "result": result,
-            "visualization": visualization
-        })
+        def add_shot_noise(result):
+            if data.get('shots'):
+                result = expectation_estimator.add_shot_noise(result, int(data['shots']), data.get('seed'))
+            return result
+        
+        # Exact values are cached; the shot noise is drawn per request
+        cache_key = circuit_cache_key(compiled, None, None, observables=data['observables'])
+        return _serve_computation('expectation', compiled, cache_key,
+                                  lambda: expectation_estimator.run(compiled, data['observables']), add_shot_noise)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/gradient', methods=['POST'])
+def observable_gradient():
+    """
+    Compute an expectation value and its gradient with respect to every rotation angle.
+    
+    Expected JSON payload:
+    {
+        "circuit": {
+            "qubits": 2,
+            "gates": [
+                {"type": "ry", "targets": [0], "theta": "alpha"},  # named parameter
+                {"type": "cx", "controls": [0], "targets": [1]},
+                {"type": "rz", "targets": [1], "theta": 0.3}       # fixed angles are differentiated too
+            ]
+        },
+        "observables": ["ZZ", {"pauli": "XX", "coefficient": 0.5}],  # as for /api/expectation
+        "point": {"alpha": 0.1}  # values of the named parameters
+    }
+    
+    The gradient is computed by adjoint differentiation (one forward and
+    one backward pass over the statevector), so its cost does not grow
+    with the number of parameters the way finite differences or the
+    parameter-shift rule do. The response has the "expectation" of the
+    weighted sum, its "gradient" per parameter name, and "gate_gradients"
+    with the derivative for every rx/ry/rz operation of the compiled
+    circuit ("operation" index, "gate", "qubit", "theta", "parameter").
+    
+    Requests are admitted like /api/simulate, counting the extra
+    statevectors of the backward pass: 413 when they do not fit, 202 and a
+    job when they are predicted to be slow.
+    """
+    try:
+        data = request.json
+        if not data or 'circuit' not in data or 'observables' not in data:
+            return jsonify({"error": "Invalid request format"}), 400
+        
+        compiled = compile_circuit(data['circuit'])
+        point = data.get('point') or {}
+        cache_key = circuit_cache_key(compiled, None, None, observables=data['observables'], gradient_point=point)
+        return _serve_computation('gradient', compiled, cache_key,
+                                  lambda: adjoint_gradient.run(compiled, data['observables'], point),
+                                  copies=AdjointGradient.STATEVECTOR_COPIES,
+                                  repeats=AdjointGradient.SIMULATION_PASSES)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@sock.route('/api/stream')
+def stream_state_evolution(ws):
+    """
+    Stream the statevector after every gate or layer over a WebSocket.
+    
+    The client opens the stream with one JSON text message:
+    {
+        "circuit": {...},          # as for /api/simulate
+        "granularity": "gate",     # optional: "gate" (default) or "layer"
+        "tolerance": 1e-6,         # optional: smallest amplitude change sent
+        "window": 8                # optional: frames it can take before acknowledging
+    }
+    
+    The server answers {"type": "start", "num_qubits": n, "steps": k} and
+    then one binary frame per snapshot (layout in quantum.streaming),
+    starting with the initial state. Frames carry only the amplitudes that
+    changed since the client last received them. The server never has more
+    than "window" unacknowledged frames in flight: the client sends
+    {"type": "ack", "frames": m} after processing m frames, and
+    {"type": "cancel"} to stop. The stream ends with {"type": "end", ...},
+    or {"type": "error", "error": ...} on failure, including circuits the
+    admission controller would not run synchronously.
+    """
+    try:
+        data = json.loads(ws.receive(timeout=STREAM_TIMEOUT) or 'null')
+        if not isinstance(data, dict) or 'circuit' not in data:
+            ws.send(json.dumps({"type": "error", "error": "Invalid request format"}))
+            return
+        
+        compiled = compile_circuit(data['circuit'])
+        steps = state_streamer.prepare(compiled, data.get('granularity', 'gate'))
+        decision = admission_controller.admit(compiled, 0, 'numpy')
+        if decision['action'] != RUN:
+            ws.send(json.dumps({"type": "error", "error": decision['reason'], "estimate": decision['estimate']}))
+            return
+        window = CreditWindow(data.get('window', 8), STREAM_TIMEOUT)
+        
+        def receive(timeout):
+            message = ws.receive(timeout=timeout)
+            return json.loads(message) if message else None
+        
+        ws.send(json.dumps({"type": "start", "num_qubits": compiled.num_qubits, "steps": len(steps)}))
+        sent = sent_bytes = 0
+        for frame in state_streamer.frames(compiled, steps, float(data.get('tolerance', 1e-6))):
+            if not window.acquire(receive):
+                break
+            ws.send(frame)
+            sent += 1
+            sent_bytes += len(frame)
+        
+        ws.send(json.dumps({"type": "end", "frames": sent, "bytes": sent_bytes,
+                            "complete": sent == len(steps) + 1, "cancelled": window.cancelled}))
+    except ConnectionClosed:
+        pass
+    except Exception as e:
+        ws.send(json.dumps({"type": "error", "error": str(e)}))
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a simulation and return immediately.
+    
+    Takes the same JSON payload as /api/simulate. The response (202) holds
+    the job status; poll GET /api/jobs/<job_id> for progress and the result.
+    Small circuits are queued in a priority lane served by a dedicated worker.
+    Requests that do not fit the admission limits are rejected with 413.
+    """
+    try:
+        data = request.json
+        if not data or 'circuit' not in data:
+            return jsonify({"error": "Invalid request format"}), 400
+        
+        cache_key, options, decision = _simulation_request(data, asynchronous=True)
+        if decision['action'] == REJECT:
+            return jsonify({"error": decision['reason'], "estimate": decision['estimate']}), 413
+        return _queue_job(cache_key, options, decision)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def job_stats():
+    """Get the queue length per lane and the number of jobs per status."""
+    return jsonify(job_queue.stats())
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status and progress of a job, plus its result once it is done.
+    
+    The result is encoded like the /api/simulate response; the wire format
+    options (statevector_format, dtype, top_k, threshold) are read from the
+    query string.
+    """
+    try:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Job {job_id} not found or expired"}), 404
+        
+        response = job.to_dict()
+        if job.status == DONE and 'kind' in job.metadata:
+            # Sweep, expectation and gradient results are stored ready to send
+            response["result"] = job.result
+        elif job.status == DONE:
+            try:
+                wire_format = negotiate_statevector_format({
+                    "statevector_format": request.args.get('statevector_format'),
+                    "dtype": request.args.get('dtype', 'float64'),
+                    "top_k": request.args.get('top_k', type=int),
+                    "threshold": request.args.get('threshold', type=float)
+                }, request.headers.get('Accept'))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            response.update(encode_response(job.result, **wire_format))
+        
+        response = jsonify(response)
+        response.vary.add('Accept')
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job, or delete a finished one."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found or expired"}), 404
+    return jsonify(job.to_dict())
+
+def _requested_extras(data):
+    """Collect the optional response extras from ?include= and the JSON body."""
+    extras = set()
+    for value in request.args.getlist('include') + [data.get('include') or []]:
+        if isinstance(value, str):
+            value = value.split(',')
+        extras.update(item.strip() for item in value if item.strip())
+    return extras
+
+@app.route('/api/render/histogram/<result_id>', methods=['GET'])
+def render_histogram(result_id):
+    """Render the measurement histogram of a previous simulation as a PNG image."""
+    try:
+        response = result_cache.get(result_id)
+        if response is None:
+            return jsonify({"error": f"Result {result_id} not found or expired"}), 404
+        
+        image = histogram_renderer.render_histogram(result_id, response['result']['counts'])
+        return jsonify({"result_id": result_id, "histogram_image": image})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Get hit/miss/eviction counters of the result, compiled-circuit and checkpoint caches."""
+    checkpoints = circuit_simulator.checkpoint_cache
+    return jsonify({"cache": result_cache.stats(), "ir_cache": ir_cache_stats(),
+                    "checkpoints": checkpoints.stats() if checkpoints is not None else None})
+
+@app.route('/api/admission/stats', methods=['GET'])
+def admission_stats():
+    """Get the admission limits and the calibration of the cost model."""
+    return jsonify(admission_controller.stats())
+
 @app.route('/api/algorithms', methods=['GET'])
 def get_algorithms():
     """Get the list of available pre-built quantum algorithms."""
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Bloch vector benchmark for the QuantumSandbox backend.
+Compares the previous per-element Python loop (which only computed <Z> and
+stopped at 5 qubits) with the partial-trace implementation of
+StateVisualizer._generate_bloch_data on random statevectors.
+
+Usage:
+    python benchmarks/bloch_vectors.py [--max-qubits 24] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum.serialization import encode_statevector
+from quantum.visualization import StateVisualizer
+
+# The legacy implementation is too slow to run on large states
+LEGACY_MAX_QUBITS = 16
+
+
+def legacy_bloch_data(statevector_data, num_qubits):
+    """Previous implementation, looping over the list-of-records statevector."""
+    bloch_data = []
+    for qubit_idx in range(num_qubits):
+        z_exp = 0
+        for state_data in statevector_data:
+            binary = state_data['state']
+            amplitude = complex(state_data['real'], state_data['imag'])
+            prob = state_data['probability']
+            if binary[qubit_idx] == '0':
+                z_exp += prob
+            else:
+                z_exp -= prob
+        x_exp = np.random.uniform(-0.1, 0.1) if z_exp != 1 and z_exp != -1 else 0
+        y_exp = np.random.uniform(-0.1, 0.1) if z_exp != 1 and z_exp != -1 else 0
+        norm = np.sqrt(x_exp**2 + y_exp**2 + z_exp**2)
+        if norm > 0:
+            x_exp /= norm
+            y_exp /= norm
+            z_exp /= norm
+        bloch_data.append({"qubit": qubit_idx, "x": float(x_exp), "y": float(y_exp), "z": float(z_exp)})
+    return bloch_data
+
+
+def best_time(function, repeat):
+    """Return the best wall-clock time of `repeat` calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-qubits', type=int, default=24)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    visualizer = StateVisualizer()
+    rng = np.random.default_rng(0)
+    
+    print(f"{'qubits':>6}  {'legacy (ms)':>12}  {'partial trace (ms)':>18}  {'speedup':>8}")
+    for num_qubits in range(2, args.max_qubits + 1, 2):
+        amplitudes = rng.normal(size=2 ** num_qubits) + 1j * rng.normal(size=2 ** num_qubits)
+        amplitudes /= np.linalg.norm(amplitudes)
+        
+        new_ms = best_time(lambda: visualizer._generate_bloch_data(amplitudes, num_qubits), args.repeat)
+        
+        if num_qubits <= LEGACY_MAX_QUBITS:
+            records = encode_statevector(amplitudes, num_qubits)
+            legacy_ms = best_time(lambda: legacy_bloch_data(records, num_qubits), 1)
+            print(f"{num_qubits:>6}  {legacy_ms:>12.2f}  {new_ms:>18.2f}  {legacy_ms / new_ms:>7.1f}x")
+        else:
+            print(f"{num_qubits:>6}  {'-':>12}  {new_ms:>18.2f}  {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
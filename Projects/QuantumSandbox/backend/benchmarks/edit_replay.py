@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Editing-session replay benchmark for the statevector checkpoint cache.
+Replays the circuits a Circuit Builder session posts to /api/simulate, in
+order, through the optimizer and the NumPy engine: once from scratch and
+once with a CheckpointCache. Reports the gate applications saved by
+resuming from cached prefixes, and the wall-clock time of both runs.
+
+A session is a JSON list of /api/simulate payloads (or bare circuit
+definitions), e.g. recorded from the browser's network log. Without
+--session a session is generated: mostly appended gates, with tweaks of
+the last gate and occasional edits further back.
+
+Usage:
+    python benchmarks/edit_replay.py [--session session.json] [--qubits 16] [--edits 200] [--save session.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum.checkpoints import CheckpointCache
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.optimizer import optimize_circuit
+
+
+def random_gate(num_qubits, rng):
+    """Pick a gate the way a user clicks them together."""
+    kind = rng.choice(['h', 'x', 'rx', 'ry', 'rz', 'cx', 'cz'])
+    if kind in ('cx', 'cz'):
+        control, target = rng.choice(num_qubits, 2, replace=False)
+        return {"type": kind, "controls": [int(control)], "targets": [int(target)]}
+    gate = {"type": kind, "targets": [int(rng.integers(num_qubits))]}
+    if kind.startswith('r'):
+        gate["theta"] = round(float(rng.uniform(0, np.pi)), 3)
+    return gate
+
+
+def generate_session(num_qubits, num_edits, rng):
+    """Generate the circuits posted during an editing session."""
+    gates = []
+    session = []
+    for _ in range(num_edits):
+        action = rng.random()
+        if not gates or action < 0.7:
+            gates.append(random_gate(num_qubits, rng))
+        elif action < 0.9:
+            # Tweak the last gate, e.g. drag an angle slider
+            last = dict(gates[-1])
+            if 'theta' in last:
+                last["theta"] = round(last["theta"] + float(rng.normal(scale=0.2)), 3)
+            else:
+                last = random_gate(num_qubits, rng)
+            gates[-1] = last
+        elif action < 0.95:
+            gates[int(rng.integers(len(gates)))] = random_gate(num_qubits, rng)
+        else:
+            del gates[int(rng.integers(len(gates)))]
+        session.append({"circuit": {"qubits": num_qubits, "gates": list(gates)}})
+    return session
+
+
+def replay(session, checkpoints):
+    """Simulate every circuit of a session; return the elapsed seconds."""
+    engine = NumpyStatevectorEngine()
+    start = time.perf_counter()
+    for payload in session:
+        circuit = payload.get("circuit", payload)
+        compiled, _ = optimize_circuit(compile_circuit(circuit))
+        engine.run(compiled, checkpoints=checkpoints)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--session', help="JSON file with the recorded session")
+    parser.add_argument('--qubits', type=int, default=16)
+    parser.add_argument('--edits', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-bytes', type=int, default=256 * 1024 * 1024, help="Checkpoint cache size")
+    parser.add_argument('--save', help="Write the generated session to this file")
+    args = parser.parse_args()
+    
+    if args.session:
+        with open(args.session) as f:
+            session = json.load(f)
+    else:
+        session = generate_session(args.qubits, args.edits, np.random.default_rng(args.seed))
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(session, f)
+    
+    baseline_seconds = replay(session, None)
+    checkpoints = CheckpointCache(max_bytes=args.max_bytes)
+    checkpoint_seconds = replay(session, checkpoints)
+    
+    stats = checkpoints.stats()
+    total = stats["gates_applied"] + stats["gates_skipped"]
+    print(f"requests:                {len(session)}")
+    print(f"gate applications:       {total} from scratch, {stats['gates_applied']} with checkpoints "
+          f"({stats['gates_skipped'] / max(total, 1):.1%} saved)")
+    print(f"checkpoint hits/misses:  {stats['hits']}/{stats['misses']}, {stats['entries']} entries, "
+          f"{stats['bytes'] / 1024 ** 2:.1f} MiB, {stats['evictions']} evictions")
+    print(f"wall time:               {baseline_seconds:.2f}s from scratch, {checkpoint_seconds:.2f}s with checkpoints "
+          f"({baseline_seconds / checkpoint_seconds:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Thread-scaling benchmark for the NumPy statevector engine.
+Times one layer of gates (a rotation on every qubit followed by a CNOT
+chain) for 1..N gate threads and several register sizes, and reports the
+time per gate and the speedup over a single thread. The "tensordot" column
+is the previous out-of-place implementation, for reference.
+
+A 28-qubit complex128 state takes 4 GiB; use --precision single or lower
+--max-qubits on smaller machines.
+
+Usage:
+    python benchmarks/gate_threads.py [--min-qubits 20] [--max-qubits 28] [--threads 1,2,4,8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+
+DTYPES = {'double': np.complex128, 'single': np.complex64}
+
+
+def layer_circuit(num_qubits):
+    """One rotation per qubit followed by a CNOT chain."""
+    gates = [{"type": "ry", "targets": [qubit], "theta": 0.1 * (qubit + 1)} for qubit in range(num_qubits)]
+    gates += [{"type": "cx", "controls": [qubit], "targets": [qubit + 1]} for qubit in range(num_qubits - 1)]
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def time_per_gate(engine, compiled, dtype, repeat):
+    """Return the best time per gate over `repeat` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.run(compiled, dtype=dtype)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / len(compiled) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-qubits', type=int, default=20)
+    parser.add_argument('--max-qubits', type=int, default=28)
+    parser.add_argument('--threads', default=None,
+                        help="Comma-separated thread counts (default: powers of two up to the CPU count)")
+    parser.add_argument('--precision', choices=sorted(DTYPES), default='double')
+    parser.add_argument('--repeat', type=int, default=2)
+    args = parser.parse_args()
+    
+    if args.threads:
+        thread_counts = [int(count) for count in args.threads.split(',')]
+    else:
+        cpus = os.cpu_count() or 1
+        thread_counts = sorted({2 ** power for power in range(cpus.bit_length()) if 2 ** power <= cpus} | {cpus})
+    dtype = DTYPES[args.precision]
+    
+    header = f"{'qubits':>6}  {'tensordot':>10}" + ''.join(f"  {f'{count} thr':>9}  {'speedup':>7}" for count in thread_counts)
+    print(f"ms per gate ({args.precision} precision)")
+    print(header)
+    for num_qubits in range(args.min_qubits, args.max_qubits + 1, 2):
+        compiled = layer_circuit(num_qubits)
+        
+        reference = NumpyStatevectorEngine(num_threads=1)
+        reference.SLICED_MIN_AMPLITUDES = 2 ** (num_qubits + 1)
+        row = f"{num_qubits:>6}  {time_per_gate(reference, compiled, dtype, args.repeat):>10.1f}"
+        
+        single_thread = None
+        for count in thread_counts:
+            milliseconds = time_per_gate(NumpyStatevectorEngine(num_threads=count), compiled, dtype, args.repeat)
+            single_thread = single_thread or milliseconds
+            row += f"  {milliseconds:>9.1f}  {single_thread / milliseconds:>6.2f}x"
+        print(row, flush=True)
+
+
+if __name__ == '__main__':
+    main()
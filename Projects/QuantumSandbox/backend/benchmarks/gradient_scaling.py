@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parameter-count scaling benchmark for adjoint gradients.
+Builds a hardware-efficient ansatz (ry and rz on every qubit followed by
+a CNOT chain, repeated) with more and more layers, and times the gradient
+of a Z/ZZ observable two ways: by AdjointGradient, and by the
+parameter-shift rule with two expectation evaluations per parameter (what
+a notebook looping over /api/expectation does, without the HTTP overhead).
+Reports both times, their ratio and the largest difference between the
+two gradients.
+
+Usage:
+    python benchmarks/gradient_scaling.py [--qubits 10] [--layers 1,2,4,8,16] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.gradients import AdjointGradient
+from quantum.ir import compile_circuit
+from quantum.observables import pauli_expectations
+
+
+def ansatz(num_qubits, num_layers):
+    """Hardware-efficient ansatz with one named parameter per rotation."""
+    gates = []
+    for layer in range(num_layers):
+        for qubit in range(num_qubits):
+            gates.append({"type": "ry", "targets": [qubit], "theta": f"y{layer}_{qubit}"})
+            gates.append({"type": "rz", "targets": [qubit], "theta": f"z{layer}_{qubit}"})
+        gates += [{"type": "cx", "controls": [qubit], "targets": [qubit + 1]} for qubit in range(num_qubits - 1)]
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def hamiltonian(num_qubits):
+    """Ising-type observable terms: Z on every qubit and ZZ on neighbouring pairs."""
+    labels = []
+    for qubit in range(num_qubits):
+        labels.append(''.join('Z' if position == qubit else 'I' for position in reversed(range(num_qubits))))
+    for qubit in range(num_qubits - 1):
+        labels.append(''.join('Z' if position in (qubit, qubit + 1) else 'I' for position in reversed(range(num_qubits))))
+    return labels
+
+
+def parameter_shift(engine, compiled, labels, point):
+    """Gradient by the parameter-shift rule, one circuit run per shifted point."""
+    def energy(values):
+        state = engine.run_batch(compiled, {name: np.array([value]) for name, value in values.items()})
+        return pauli_expectations(state, labels, compiled.num_qubits).sum()
+    
+    gradient = {}
+    for name in compiled.parameters:
+        plus = dict(point, **{name: point[name] + np.pi / 2})
+        minus = dict(point, **{name: point[name] - np.pi / 2})
+        gradient[name] = (energy(plus) - energy(minus)) / 2
+    return gradient
+
+
+def best_time(function, repeat):
+    """Best wall-clock time of repeated calls, and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--qubits', type=int, default=10)
+    parser.add_argument('--layers', default='1,2,4,8,16', help="Comma-separated layer counts")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    differentiator = AdjointGradient()
+    engine = NumpyStatevectorEngine()
+    labels = hamiltonian(args.qubits)
+    
+    print(f"{'params':>7} {'adjoint':>10} {'shift':>10} {'speedup':>8} {'max diff':>10}")
+    for num_layers in [int(value) for value in args.layers.split(',')]:
+        compiled = ansatz(args.qubits, num_layers)
+        point = {name: float(value) for name, value in zip(compiled.parameters,
+                                                           rng.uniform(0, 2 * np.pi, len(compiled.parameters)))}
+        adjoint_seconds, adjoint = best_time(lambda: differentiator.run(compiled, labels, point), args.repeat)
+        shift_seconds, shifted = best_time(lambda: parameter_shift(engine, compiled, labels, point), args.repeat)
+        difference = max(abs(adjoint["gradient"][name] - shifted[name]) for name in compiled.parameters)
+        print(f"{len(compiled.parameters):>7} {adjoint_seconds:>9.4f}s {shift_seconds:>9.4f}s "
+              f"{shift_seconds / adjoint_seconds:>7.1f}x {difference:>10.1e}")
+
+
+if __name__ == '__main__':
+    main()
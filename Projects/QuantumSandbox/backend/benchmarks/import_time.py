@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Startup-time benchmark for the QuantumSandbox backend.
+Measures the import time of each backend module in a fresh interpreter and
+appends the numbers to a JSON history file so they can be compared across
+releases.
+
+Usage:
+    python benchmarks/import_time.py --label 1.1.0 [--repeat 5] [--output import_times.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules measured, in the order the server imports them
+MODULES = [
+    'quantum',
+    'quantum.circuit_simulator',
+    'quantum.algorithm_library',
+    'quantum.visualization',
+    'quantum.result_cache',
+    'quantum.rendering',
+    'app',
+    # Heavy dependencies, for reference
+    'qiskit',
+    'qiskit.providers.aer',
+    'matplotlib.pyplot',
+]
+
+MEASURE_SNIPPET = (
+    "import time, importlib; start = time.perf_counter(); "
+    "importlib.import_module({module!r}); print(time.perf_counter() - start)"
+)
+
+
+def measure_import(module, repeat):
+    """
+    Measure the cold import time of a module.
+    
+    Args:
+        module (str): Dotted module name
+        repeat (int): Number of fresh interpreters to average over
+    
+    Returns:
+        dict: Best and mean import time in milliseconds, or the error
+    """
+    timings = []
+    env = dict(os.environ, WARMUP='0')
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, '-c', MEASURE_SNIPPET.format(module=module)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            return {"error": process.stderr.strip().splitlines()[-1]}
+        timings.append(float(process.stdout.strip().splitlines()[-1]) * 1000)
+    
+    return {
+        "best_ms": round(min(timings), 2),
+        "mean_ms": round(sum(timings) / len(timings), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--label', default='dev', help='release label recorded with the run')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per module')
+    parser.add_argument('--output', default=os.path.join(BACKEND_DIR, 'benchmarks', 'import_times.json'),
+                        help='JSON history file to append to')
+    args = parser.parse_args()
+    
+    run = {
+        "label": args.label,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": sys.version.split()[0],
+        "modules": {}
+    }
+    for module in MODULES:
+        run["modules"][module] = measure_import(module, args.repeat)
+        timing = run["modules"][module]
+        print(f"{module:32s} " + (f"{timing['best_ms']:9.1f} ms" if 'best_ms' in timing else timing['error']))
+    
+    history = []
+    if os.path.exists(args.output):
+        with open(args.output) as f:
+            history = json.load(f)
+    
+    if history:
+        previous = history[-1]
+        print(f"\nChange since '{previous['label']}':")
+        for module, timing in run["modules"].items():
+            before = previous["modules"].get(module, {})
+            if 'best_ms' in timing and 'best_ms' in before:
+                print(f"{module:32s} {timing['best_ms'] - before['best_ms']:+9.1f} ms")
+    
+    history.append(run)
+    with open(args.output, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
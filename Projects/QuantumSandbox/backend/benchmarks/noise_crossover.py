@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Density-matrix versus trajectory benchmark for noisy simulation.
+Times a layered random circuit with depolarizing and amplitude-damping
+noise on both methods of NoisySimulator for a range of register sizes,
+and reports the largest size at which the density matrix is still the
+faster one. That size is what quantum.noise.DENSITY_MATRIX_MAX_QUBITS
+should be set to for the given number of trajectories.
+
+Trajectories run in this process; with a process pool their wall time
+divides by the number of workers, which moves the crossover down.
+
+Usage:
+    python benchmarks/noise_crossover.py [--min-qubits 2] [--max-qubits 12] [--layers 4] [--trajectories 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.noise import NoiseModel, NoisySimulator
+
+
+def layered_circuit(num_qubits, num_layers, rng):
+    """Random rotations on every qubit followed by a CNOT chain, per layer."""
+    gates = []
+    for _ in range(num_layers):
+        for qubit in range(num_qubits):
+            kind = rng.choice(['rx', 'ry', 'rz'])
+            gates.append({"type": str(kind), "targets": [qubit], "theta": float(rng.uniform(0, np.pi))})
+        gates += [{"type": "cx", "controls": [qubit], "targets": [qubit + 1]} for qubit in range(num_qubits - 1)]
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def best_time(function, repeat):
+    """Best wall-clock time of repeated calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-qubits', type=int, default=2)
+    parser.add_argument('--max-qubits', type=int, default=12)
+    parser.add_argument('--layers', type=int, default=4)
+    parser.add_argument('--trajectories', type=int, default=500)
+    parser.add_argument('--shots', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    simulator = NoisySimulator(NumpyStatevectorEngine(num_threads=1))
+    noise_spec = {"depolarizing": 0.01, "amplitude_damping": 0.005, "trajectories": args.trajectories}
+    density_matrix = NoiseModel.from_dict(dict(noise_spec, method='density_matrix'))
+    trajectories = NoiseModel.from_dict(dict(noise_spec, method='trajectories'))
+    
+    print(f"{'qubits':>6} {'gates':>6} {'density matrix':>15} {'trajectories':>13} {'faster':>15}")
+    crossover = None
+    for num_qubits in range(args.min_qubits, args.max_qubits + 1):
+        compiled = layered_circuit(num_qubits, args.layers, rng)
+        dm_seconds = best_time(lambda: simulator.simulate(compiled, density_matrix, args.shots, args.seed), args.repeat)
+        tj_seconds = best_time(lambda: simulator.simulate(compiled, trajectories, args.shots, args.seed), args.repeat)
+        faster = 'density_matrix' if dm_seconds <= tj_seconds else 'trajectories'
+        if faster == 'density_matrix':
+            crossover = num_qubits
+        print(f"{num_qubits:>6} {len(compiled):>6} {dm_seconds:>14.3f}s {tj_seconds:>12.3f}s {faster:>15}")
+    
+    if crossover is None:
+        print("trajectories are faster at every size")
+    else:
+        print(f"density matrix is faster up to {crossover} qubits with {args.trajectories} trajectories")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Single- vs double-precision benchmark for the QuantumSandbox backend.
+Times the NumPy engine in complex64 and complex128 on random circuits of
+increasing size, with the norm drift and the largest probability error of
+the single-precision state. The AlgorithmLibrary circuits are checked
+against an explicit tolerance by tests/test_precision.py.
+
+Usage:
+    python benchmarks/precision.py [--max-qubits 22] [--gates 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+
+
+def random_circuit(num_qubits, num_gates, rng):
+    """Build a random circuit of rotations, Hadamards and CNOTs."""
+    gates = []
+    for _ in range(num_gates):
+        kind = rng.integers(3)
+        if kind == 0 and num_qubits > 1:
+            control, target = rng.choice(num_qubits, 2, replace=False)
+            gates.append({"type": "cx", "controls": [int(control)], "targets": [int(target)]})
+        elif kind == 1:
+            gates.append({"type": "h", "targets": [int(rng.integers(num_qubits))]})
+        else:
+            gates.append({"type": "ry", "targets": [int(rng.integers(num_qubits))], "theta": float(rng.normal())})
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def compare(engine, compiled):
+    """Return (norm drift, max probability error) of a complex64 run."""
+    single, _ = engine.run(compiled, dtype=np.complex64)
+    double, _ = engine.run(compiled)
+    probabilities = np.abs(single).astype(np.float64) ** 2
+    return abs(1.0 - probabilities.sum()), np.max(np.abs(probabilities - np.abs(double) ** 2))
+
+
+def best_time(function, repeat):
+    """Return the best wall-clock time of `repeat` calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-qubits', type=int, default=22)
+    parser.add_argument('--gates', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    engine = NumpyStatevectorEngine()
+    rng = np.random.default_rng(0)
+    print(f"{'qubits':>6}  {'double (ms)':>12}  {'single (ms)':>12}  {'speedup':>8}  {'norm drift':>11}  {'max prob error':>14}")
+    for num_qubits in range(12, args.max_qubits + 1, 2):
+        compiled = random_circuit(num_qubits, args.gates, rng)
+        double_ms = best_time(lambda: engine.run(compiled), args.repeat)
+        single_ms = best_time(lambda: engine.run(compiled, dtype=np.complex64), args.repeat)
+        drift, error = compare(engine, compiled)
+        print(f"{num_qubits:>6}  {double_ms:>12.1f}  {single_ms:>12.1f}  {double_ms / single_ms:>7.2f}x  "
+              f"{drift:>11.2e}  {error:>14.2e}")
+
+
+if __name__ == '__main__':
+    main()
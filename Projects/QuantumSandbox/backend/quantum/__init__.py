@@ -3,8 +3,45 @@ Quantum module for QuantumSandbox.
 Contains classes and functions for quantum circuit simulation and visualization.
 """
 
-from .circuit_simulator import CircuitSimulator
-from .algorithm_library import AlgorithmLibrary
-from .visualization import StateVisualizer
+import importlib
 
-__all__ = ['CircuitSimulator', 'AlgorithmLibrary', 'StateVisualizer']
+# Public names and the submodule defining them. Submodules are imported on
+# first attribute access so that `import quantum` does not pull in Qiskit,
+# Aer or matplotlib before the server can answer health checks.
+_EXPORTS = {
+    'CircuitSimulator': 'circuit_simulator',
+    'AlgorithmLibrary': 'algorithm_library',
+    'StateVisualizer': 'visualization',
+    'ResultCache': 'result_cache',
+    'SQLiteResultCache': 'result_cache',
+    'circuit_cache_key': 'result_cache',
+    'HistogramRenderer': 'rendering',
+    'SimulationPool': 'batch',
+    'encode_statevector': 'serialization',
+    'ParameterSweep': 'sweep',
+    'ExpectationEstimator': 'observables',
+    'AdjointGradient': 'gradients',
+    'StateStreamer': 'streaming',
+    'JobQueue': 'jobs',
+    'AdmissionController': 'admission',
+    'OutOfCoreStatevectorEngine': 'out_of_core',
+    'CheckpointCache': 'checkpoints',
+    'NoiseModel': 'noise',
+    'NoisySimulator': 'noise',
+    'BranchingSimulator': 'branching',
+    'StabilizerSimulator': 'stabilizer',
+    'MPSSimulator': 'mps',
+    'optimize_circuit': 'optimizer',
+    'CompiledCircuit': 'ir',
+    'compile_circuit': 'ir',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the submodule defining `name` on first access."""
+    if name in _EXPORTS:
+        module = importlib.import_module(f'.{_EXPORTS[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
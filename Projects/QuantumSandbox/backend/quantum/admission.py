@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Admission control module for QuantumSandbox.
+Predicts the memory and runtime of a simulation from the circuit size,
+shots, backend and precision before anything is allocated, and decides
+whether a request runs right away, goes to the job queue, moves to a
+cheaper backend or is rejected. The predictions are compared with the
+measured runtimes so the model's coefficients can be calibrated.
+"""
+
+import math
+import os
+import threading
+
+import numpy as np
+
+from .branching import MAX_BRANCHES, branching_measurements
+from .mps import MPSSimulator, estimate_bond_dimensions
+from .out_of_core import OutOfCoreStatevectorEngine, plan_passes
+from .stabilizer import is_clifford_circuit
+
+# Admission decisions
+RUN = 'run'
+QUEUE = 'queue'
+REJECT = 'reject'
+
+
+def _default_memory_limit():
+    """Half of the physical memory, or 4 GiB when it cannot be read."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2
+    except (AttributeError, ValueError, OSError):
+        return 4 * 1024 ** 3
+
+
+class CostModel:
+    """
+    Analytic cost model of the simulation backends.
+    
+    Coefficients were fitted on a single core against the NumPy, stabilizer
+    and MPS engines; the calibration report of AdmissionController shows how
+    far they are off on a given machine.
+    """
+    
+    # Peak number of dense statevector copies alive at once (state,
+    # tensordot result, probabilities and visualization arrays)
+    DENSE_COPIES = {'numpy': 4, 'aer': 3}
+    
+    # Seconds per amplitude update (one gate on one amplitude)
+    SECONDS_PER_AMPLITUDE = {'numpy': 8e-9, 'aer': 2e-9}
+    
+    # Seconds per amplitude to sample, visualize and encode the final state
+    SECONDS_PER_OUTPUT_AMPLITUDE = 2.5e-7
+    
+    # Fixed Python overhead per operation and per request
+    SECONDS_PER_GATE = 5e-5
+    SECONDS_PER_REQUEST = {'numpy': 0.005, 'aer': 0.5, 'stabilizer': 0.05, 'mps': 0.02, 'out_of_core': 0.05}
+    
+    # Stabilizer engine: tableau updates and GF(2) shot sampling
+    SECONDS_PER_TABLEAU_ROW = 2e-7
+    SECONDS_PER_SAMPLED_BIT = 1.5e-9
+    
+    # MPS engine: two-site SVD cost per bond dimension cubed
+    SECONDS_PER_SVD_FLOP = 2e-8
+    
+    # Out-of-core engine: sequential read plus write throughput of the local disk
+    DISK_BYTES_PER_SECOND = 5e8
+    
+    # Statevectors of more qubits are not priced: 2**64 amplitudes exceed any
+    # address space, and 2.0 ** num_qubits overflows a float past 1023 qubits
+    MAX_STATEVECTOR_QUBITS = 64
+    
+    def is_unbounded(self, compiled, backend, noise=None):
+        """
+        Check whether a simulation needs a statevector too large to price.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            backend (str): Resolved backend
+            noise (NoiseModel): Optional noise model
+        
+        Returns:
+            bool: True if the backend stores 2**num_qubits amplitudes and
+            num_qubits is over MAX_STATEVECTOR_QUBITS
+        """
+        statevector = noise is not None or backend in self.DENSE_COPIES or backend == 'out_of_core'
+        return statevector and compiled.num_qubits > self.MAX_STATEVECTOR_QUBITS
+    
+    def estimate(self, compiled, shots, backend, dtype='complex128', options=None, noise=None, copies=None,
+                 repeats=1):
+        """
+        Predict the peak memory and runtime of a simulation.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            shots (int): Number of shots
+            backend (str): Resolved backend ('numpy', 'aer', 'stabilizer' or 'mps')
+            dtype (str): Complex dtype of the statevector
+            options (dict): Backend options ("max_bond_dimension" for MPS)
+            noise (NoiseModel): Optional noise model (NumPy backend only)
+            copies (float): Dense statevectors alive at once, for requests that
+                hold more than a simulation (defaults to DENSE_COPIES)
+            repeats (int): Number of times the circuit is simulated
+        
+        Returns:
+            dict: backend, memory_bytes and runtime_seconds, plus disk_bytes
+            for the out-of-core backend and the noise_method of noisy circuits
+        
+        Raises:
+            ValueError: If the backend is unknown or the statevector is too
+                large to price (see is_unbounded)
+        """
+        num_qubits = compiled.num_qubits
+        if self.is_unbounded(compiled, backend, noise):
+            raise ValueError(f"A {num_qubits}-qubit statevector is too large for the {backend} backend")
+        num_gates = len(compiled)
+        itemsize = np.dtype(dtype).itemsize
+        
+        if noise is not None:
+            # Every channel adds one Kraus update per gate qubit
+            channels = len(noise.channels)
+            if noise.select_method(num_qubits) == 'density_matrix':
+                # rho, its updated copy and the output arrays; a gate updates the
+                # ket and bra side, a channel is a 4x4 superoperator product
+                entries = 4.0 ** num_qubits
+                memory = 3 * entries * 16
+                runtime = num_gates * (entries * (2 + 8 * channels) * self.SECONDS_PER_AMPLITUDE['numpy']
+                                       + self.SECONDS_PER_GATE)
+                runtime += 2.0 ** num_qubits * self.SECONDS_PER_OUTPUT_AMPLITUDE
+            else:
+                amplitudes = 2.0 ** num_qubits
+                memory = self.DENSE_COPIES['numpy'] * amplitudes * 16
+                runtime = noise.trajectories * num_gates * (
+                    amplitudes * (1 + channels) * self.SECONDS_PER_AMPLITUDE['numpy'] + self.SECONDS_PER_GATE)
+                # Each trajectory also adds its probabilities and Bloch vectors to the sums
+                runtime += noise.trajectories * amplitudes * (num_qubits + 1) * self.SECONDS_PER_AMPLITUDE['numpy']
+                runtime += amplitudes * self.SECONDS_PER_OUTPUT_AMPLITUDE
+        
+        elif backend in self.DENSE_COPIES:
+            copies = self.DENSE_COPIES[backend] if copies is None else copies
+            amplitudes = 2.0 ** num_qubits
+            memory = copies * amplitudes * itemsize
+            runtime = num_gates * (amplitudes * self.SECONDS_PER_AMPLITUDE[backend] + self.SECONDS_PER_GATE)
+            if backend == 'aer' and compiled.is_dynamic:
+                # The qasm simulator replays the circuit for every shot
+                runtime *= max(shots, 1)
+            elif backend == 'numpy' and compiled.is_dynamic:
+                # Every branching measurement may double the branches (in double
+                # precision), and a split holds the parents next to their children
+                branches = min(2.0 ** len(branching_measurements(compiled)[0]), MAX_BRANCHES)
+                memory = (copies + 3 * branches) * amplitudes * 16
+                runtime *= branches
+            runtime += amplitudes * self.SECONDS_PER_OUTPUT_AMPLITUDE
+        
+        elif backend == 'stabilizer':
+            rows = 2 * num_qubits + 1
+            memory = 2 * rows * rows + 16 * shots * num_qubits
+            runtime = (num_gates * (rows * self.SECONDS_PER_TABLEAU_ROW + self.SECONDS_PER_GATE)
+                       + shots * num_qubits * num_qubits * self.SECONDS_PER_SAMPLED_BIT)
+        
+        elif backend == 'mps':
+            max_bond = (options or {}).get('max_bond_dimension') or MPSSimulator.DEFAULT_MAX_BOND_DIMENSION
+            log_bond = int(estimate_bond_dimensions(compiled).max(initial=0))
+            bond = float(min(2 ** log_bond, max_bond))
+            site_bytes = 2 * bond * bond * 16
+            memory = 2 * num_qubits * site_bytes + 2 * shots * bond * 16
+            runtime = (num_gates * ((2 * bond) ** 3 * self.SECONDS_PER_SVD_FLOP + self.SECONDS_PER_GATE)
+                       + shots * num_qubits * bond * bond * self.SECONDS_PER_SAMPLED_BIT)
+        
+        elif backend == 'out_of_core':
+            # One block of chunks is in memory; every pass reads and writes the
+            # file, and the Bloch vectors of qubits above a chunk read it once each
+            chunk_qubits = min(OutOfCoreStatevectorEngine.DEFAULT_CHUNK_QUBITS, num_qubits)
+            passes = plan_passes(compiled, chunk_qubits, OutOfCoreStatevectorEngine.MAX_HIGH_QUBITS)
+            block_qubits = max((len(high) for high, _ in passes), default=0) + chunk_qubits
+            disk = 2.0 ** num_qubits * itemsize
+            memory = 3 * 2.0 ** min(block_qubits, num_qubits) * itemsize
+            runtime = (((len(passes) + 2) * 2 + num_qubits - chunk_qubits) * disk / self.DISK_BYTES_PER_SECOND
+                       + num_gates * 2.0 ** num_qubits * self.SECONDS_PER_AMPLITUDE['numpy']
+                       + 2.0 ** num_qubits * chunk_qubits * self.SECONDS_PER_AMPLITUDE['numpy'])
+        
+        else:
+            raise ValueError(f"Unknown backend '{backend}'")
+        
+        estimate = {
+            "backend": backend,
+            "memory_bytes": int(memory),
+            "runtime_seconds": runtime * repeats + self.SECONDS_PER_REQUEST[backend]
+        }
+        if backend == 'out_of_core':
+            estimate["disk_bytes"] = int(disk)
+        if noise is not None:
+            estimate["noise_method"] = noise.select_method(num_qubits)
+        return estimate
+
+
+class AdmissionController:
+    """
+    Class for admitting simulation requests based on their predicted cost.
+    
+    A request runs synchronously when it fits in memory and is predicted to
+    finish within max_sync_seconds; slower ones go to the job queue, and
+    ones predicted to run longer than max_job_seconds are rejected. When
+    the backend was picked automatically and does not fit in memory, a
+    cheaper backend (stabilizer for Clifford circuits, otherwise a
+    truncating MPS, and Aer for dynamic circuits whose measurements
+    branch too often) is tried before rejecting. Out-of-core runs are always
+    queued and are rejected when the statevector file exceeds the disk quota.
+    """
+    
+    def __init__(self, simulator, max_memory_bytes=None, max_sync_seconds=None, max_job_seconds=None):
+        """
+        Initialize the controller.
+        
+        Args:
+            simulator (CircuitSimulator): Simulator used to resolve 'auto'
+            max_memory_bytes (int): Memory limit per simulation (defaults to the
+                ADMISSION_MAX_MEMORY environment variable, or half the RAM)
+            max_sync_seconds (float): Longest predicted runtime served in the
+                request thread (ADMISSION_MAX_SYNC_SECONDS, default 10)
+            max_job_seconds (float): Longest predicted runtime accepted at all
+                (ADMISSION_MAX_JOB_SECONDS, default 3600)
+        """
+        self.simulator = simulator
+        self.cost_model = CostModel()
+        self.max_memory_bytes = max_memory_bytes or int(os.environ.get('ADMISSION_MAX_MEMORY', _default_memory_limit()))
+        self.max_sync_seconds = max_sync_seconds or float(os.environ.get('ADMISSION_MAX_SYNC_SECONDS', 10))
+        self.max_job_seconds = max_job_seconds or float(os.environ.get('ADMISSION_MAX_JOB_SECONDS', 3600))
+        self._lock = threading.Lock()
+        self._calibration = {}
+    
+    def _fallback_backends(self, compiled):
+        """Cheaper backends able to run a circuit, cheapest first."""
+        if compiled.is_dynamic:
+            return ['aer']
+        if is_clifford_circuit(compiled):
+            return ['stabilizer', 'mps']
+        return ['mps']
+    
+    def admit(self, compiled, shots, backend='auto', dtype='complex128', options=None, asynchronous=False,
+              noise=None, copies=None, repeats=1):
+        """
+        Decide how to serve a simulation request.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            shots (int): Number of shots
+            backend (str): Requested backend
+            dtype (str): Complex dtype of the statevector
+            options (dict): Backend options
+            asynchronous (bool): Whether the request already comes through the job queue
+            noise (NoiseModel): Optional noise model
+            copies (float): Dense statevectors alive at once (see CostModel.estimate)
+            repeats (int): Number of times the circuit is simulated
+        
+        Returns:
+            dict: "action" ('run', 'queue' or 'reject'), the "backend" to use,
+            the cost "estimate" (None for statevectors too large to price)
+            and, unless it runs as requested, a "reason"
+        """
+        requested = (backend or 'auto').lower()
+        resolved = self.simulator.select_backend(compiled, requested, noise)
+        if self.cost_model.is_unbounded(compiled, resolved, noise):
+            # Not priced at all, so the decision carries no estimate
+            estimate = None
+            reason = (f"A {compiled.num_qubits}-qubit statevector on the {resolved} backend "
+                      f"exceeds the limit of {self.max_memory_bytes} bytes")
+        else:
+            estimate = self.cost_model.estimate(compiled, shots, resolved, dtype, options, noise, copies, repeats)
+            reason = (f"Predicted memory of {estimate['memory_bytes']} bytes on the {resolved} backend "
+                      f"exceeds the limit of {self.max_memory_bytes} bytes")
+        decision = {"action": RUN, "backend": resolved, "estimate": estimate}
+        
+        if estimate is None or estimate["memory_bytes"] > self.max_memory_bytes:
+            candidates = self._fallback_backends(compiled) if requested == 'auto' and noise is None else []
+            for candidate in candidates:
+                if candidate == resolved or self.cost_model.is_unbounded(compiled, candidate):
+                    continue
+                candidate_estimate = self.cost_model.estimate(compiled, shots, candidate, dtype, options,
+                                                              copies=copies, repeats=repeats)
+                if candidate_estimate["memory_bytes"] <= self.max_memory_bytes:
+                    estimate = candidate_estimate
+                    decision.update(backend=candidate, estimate=estimate,
+                                    reason=reason + f"; rerouted to the {candidate} backend")
+                    break
+            else:
+                return dict(decision, action=REJECT, reason=reason)
+        
+        disk_quota = self.simulator.out_of_core_engine.max_disk_bytes
+        if estimate.get("disk_bytes", 0) > disk_quota:
+            return dict(decision, action=REJECT, reason=f"Out-of-core statevector of {estimate['disk_bytes']} bytes "
+                                                        f"exceeds the disk quota of {disk_quota} bytes")
+        
+        runtime = estimate["runtime_seconds"]
+        if runtime > self.max_job_seconds:
+            return dict(decision, action=REJECT,
+                        reason=f"Predicted runtime of {runtime:.1f}s exceeds the limit of {self.max_job_seconds:.0f}s")
+        if asynchronous:
+            return decision
+        if decision["backend"] in self.simulator.JOB_ONLY_BACKENDS:
+            decision.update(action=QUEUE, reason=f"The {decision['backend']} backend is only served by the job queue")
+        elif runtime > self.max_sync_seconds:
+            decision.update(action=QUEUE, reason=f"Predicted runtime of {runtime:.1f}s is too long for a "
+                                                 f"synchronous request ({self.max_sync_seconds:.0f}s)")
+        return decision
+    
+    def record(self, estimate, runtime_seconds):
+        """
+        Compare a prediction with the measured runtime.
+        
+        Args:
+            estimate (dict): Estimate returned by admit
+            runtime_seconds (float): Measured wall-clock runtime
+        
+        Returns:
+            dict: Predicted and actual cost, for the response
+        """
+        ratio = runtime_seconds / max(estimate["runtime_seconds"], 1e-9)
+        # Noisy runs are calibrated separately from noiseless ones on the same backend
+        key = estimate["backend"]
+        if "noise_method" in estimate:
+            key = f"{key}:{estimate['noise_method']}"
+        with self._lock:
+            entry = self._calibration.setdefault(key, {"samples": 0, "log_ratio_sum": 0.0})
+            entry["samples"] += 1
+            entry["log_ratio_sum"] += math.log(max(ratio, 1e-9))
+        
+        return {
+            "predicted": estimate,
+            "actual": {"runtime_seconds": runtime_seconds},
+            "runtime_ratio": ratio
+        }
+    
+    def stats(self):
+        """
+        Get the limits and per-backend calibration of the cost model.
+        
+        The runtime factor is the geometric mean of actual over predicted
+        runtime; values far from 1 mean the coefficients need adjusting.
+        
+        Returns:
+            dict: Limits and calibration data
+        """
+        with self._lock:
+            calibration = {
+                backend: {
+                    "samples": entry["samples"],
+                    "runtime_factor": math.exp(entry["log_ratio_sum"] / entry["samples"])
+                }
+                for backend, entry in self._calibration.items()
+            }
+        return {
+            "max_memory_bytes": self.max_memory_bytes,
+            "max_sync_seconds": self.max_sync_seconds,
+            "max_job_seconds": self.max_job_seconds,
+            "calibration": calibration
+        }
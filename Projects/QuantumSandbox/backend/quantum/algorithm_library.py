@@ -8,7 +8,6 @@ Provides pre-built quantum algorithms and examples.
 
 import json
 import os
-from qiskit import QuantumCircuit
 
 class AlgorithmLibrary:
     """
@@ -185,9 +184,9 @@ class AlgorithmLibrary:
                 # Measure qubits 0 and 1
                 {"type": "measure", "targets": [0, 1]},
                 
-                # Apply corrections to qubit 2 (in a real circuit, these would be conditional)
-                {"type": "x", "targets": [2]},  # Apply X if qubit 1 measurement is 1
-                {"type": "z", "targets": [2]},  # Apply Z if qubit 0 measurement is 1
+                # Apply corrections to qubit 2, conditioned on the measured bits
+                {"type": "x", "targets": [2], "c_if": {"clbit": 1, "value": 1}},  # Apply X if qubit 1 measurement is 1
+                {"type": "z", "targets": [2], "c_if": {"clbit": 0, "value": 1}},  # Apply Z if qubit 0 measurement is 1
                 
                 # Measure the final state
                 {"type": "measure", "targets": [2]}
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Batch simulation module for QuantumSandbox.
+Runs simulations in a pool of worker processes that each hold a warmed-up
+CircuitSimulator, so a batch of circuits does not tie up the request
+threads and uses every core.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Per-process simulator and visualizer, created by _init_worker
+_simulator = None
+_visualizer = None
+
+
+def _init_worker(warmup):
+    """
+    Create the simulator of a worker process and load its backends.
+    
+    Args:
+        warmup (bool): Import Qiskit/Aer right away instead of on first use
+    """
+    global _simulator, _visualizer
+    from .circuit_simulator import CircuitSimulator
+    from .visualization import StateVisualizer
+    
+    _simulator = CircuitSimulator()
+    _visualizer = StateVisualizer()
+    # The pool already runs one process per core
+    _simulator.numpy_engine.num_threads = 1
+    # Batch items are unrelated circuits; a checkpoint cache per process would only hold memory
+    _simulator.checkpoint_cache = None
+    if warmup:
+        _simulator.warmup()
+
+
+def _ping():
+    """No-op task used to start the worker processes ahead of a batch."""
+    return os.getpid()
+
+
+def simulate_in_worker(compiled, shots, backend, seed, backend_options, optimize, precision='double', noise=None):
+    """
+    Simulate one circuit inside a worker process.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+        shots (int): Number of shots
+        backend (str): Requested backend
+        seed (int): Sampling seed
+        backend_options (dict): Backend options
+        optimize (bool): Whether to run the peephole optimizer
+        precision (str): Statevector precision ('double' or 'single')
+        noise (NoiseModel): Optional noise model
+    
+    Returns:
+        dict: Raw {"result": ..., "visualization": ...} response, as cached
+        by the /api/simulate endpoint, plus the measured "runtime_seconds"
+    """
+    start = time.perf_counter()
+    result = _simulator.simulate(compiled, shots, backend=backend, seed=seed,
+                                 options=backend_options, optimize=optimize, precision=precision, noise=noise)
+    return {
+        "result": result,
+        "visualization": _visualizer.generate_visualization(result),
+        "runtime_seconds": time.perf_counter() - start
+    }
+
+
+def trajectories_in_worker(compiled, noise, shots_per_trajectory, seed):
+    """
+    Run a chunk of noisy trajectories inside a worker process.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+        noise (NoiseModel): Noise model
+        shots_per_trajectory (np.ndarray): Shots drawn from each trajectory
+        seed (np.random.SeedSequence): Seed of the chunk
+    
+    Returns:
+        dict: Partial trajectory sums (see NoisySimulator.run_trajectories)
+    """
+    return _simulator.noise_simulator.run_trajectories(compiled, noise, shots_per_trajectory, seed)
+
+
+class SimulationPool:
+    """
+    Class for running simulations in a pool of warmed-up worker processes.
+    """
+    
+    def __init__(self, max_workers=None):
+        """
+        Initialize the pool. Worker processes are started on first use.
+        
+        Args:
+            max_workers (int): Number of simulation processes (defaults to
+                the SIMULATION_WORKERS environment variable, or the CPU count)
+        """
+        self.max_workers = max_workers or int(os.environ.get('SIMULATION_WORKERS', os.cpu_count() or 1))
+        self.warmup_workers = os.environ.get('WARMUP', '1') != '0'
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self):
+        """Create the process pool if it is not running yet."""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the server's threads or locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.warmup_workers,)
+                )
+            return self._executor
+    
+    def warmup(self, timeout=None):
+        """
+        Start every worker process and wait until their simulators are loaded.
+        
+        Args:
+            timeout (float): Seconds to wait for the workers
+        """
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+            future.result(timeout=timeout)
+    
+    def submit(self, compiled, shots=1024, backend='auto', seed=None, backend_options=None, optimize=True,
+               precision='double', noise=None):
+        """
+        Queue one simulation.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            shots (int): Number of shots
+            backend (str): Requested backend
+            seed (int): Sampling seed
+            backend_options (dict): Backend options
+            optimize (bool): Whether to run the peephole optimizer
+            precision (str): Statevector precision ('double' or 'single')
+            noise (NoiseModel): Optional noise model
+        
+        Returns:
+            concurrent.futures.Future: Future of the raw response
+        """
+        return self._get_executor().submit(
+            simulate_in_worker, compiled, shots, backend, seed, backend_options or {}, optimize, precision, noise
+        )
+    
+    def submit_trajectories(self, compiled, noise, shots_per_trajectory, seed):
+        """
+        Queue a chunk of noisy trajectories.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            noise (NoiseModel): Noise model
+            shots_per_trajectory (np.ndarray): Shots drawn from each trajectory
+            seed (np.random.SeedSequence): Seed of the chunk
+        
+        Returns:
+            concurrent.futures.Future: Future of the partial trajectory sums
+        """
+        return self._get_executor().submit(trajectories_in_worker, compiled, noise, shots_per_trajectory, seed)
+    
+    def shutdown(self):
+        """Stop the simulation processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Branching simulation module for QuantumSandbox.
+Simulates circuits with mid-circuit measurement and classically
+conditioned ("c_if") gates on the NumPy engine without replaying the
+circuit once per shot. Every mid-circuit measurement splits the
+simulation into one weighted branch per possible outcome, branches that
+reach the same classical bits and the same state are merged, and shots
+are only drawn at the end, so the cost grows with the number of distinct
+branches rather than with the number of shots.
+"""
+
+import numpy as np
+
+from .noise import statevector_bloch_vectors
+from .sampling import counts_from_draws
+
+# Most branches alive at once; circuits that split further are left to Aer
+MAX_BRANCHES = 256
+
+# Outcomes with a smaller probability are dropped instead of becoming branches
+MIN_BRANCH_WEIGHT = 1e-12
+
+# Branches with the same classical bits merge when |<a|b>| is this close to 1
+MERGE_TOLERANCE = 1e-9
+
+
+def branching_measurements(compiled):
+    """
+    Find the measurements that have to split the simulation.
+    
+    A measurement can instead be sampled at the end, like in a static
+    circuit, when no later operation acts on its qubit and no later gate
+    is conditioned on its bit.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+    
+    Returns:
+        tuple: (set of operation indices of branching measurements, bit
+        mask of the qubits whose final measurement is sampled at the end)
+    """
+    operations = list(compiled.operations())
+    conditions = compiled.conditions()
+    branching = set()
+    deferred_mask = 0
+    touched = set()
+    read = set()
+    for index in range(len(operations) - 1, -1, -1):
+        spec, qubits, _ = operations[index]
+        if spec.kind == 'measure':
+            if qubits[0] in touched or qubits[0] in read:
+                branching.add(index)
+            else:
+                deferred_mask |= 1 << qubits[0]
+        touched.update(qubits)
+        if conditions[index] is not None:
+            read.add(conditions[index][0])
+    
+    if not compiled.measured_qubits:
+        # Circuits without measurements are measured entirely at the end
+        deferred_mask = (1 << compiled.num_qubits) - 1
+    return branching, deferred_mask
+
+
+class BranchingSimulator:
+    """
+    Class for simulating dynamic circuits as a set of weighted branches.
+    
+    Branches are stacked along a leading batch axis of one state tensor,
+    so an unconditional gate is a single engine call for all of them and a
+    conditional gate only touches the branches whose classical bit
+    matches. Each branch carries its probability and its classical
+    register as an integer (bit c is classical bit c).
+    """
+    
+    def __init__(self, engine, max_branches=None):
+        """
+        Initialize the simulator.
+        
+        Args:
+            engine (NumpyStatevectorEngine): Engine applying the gates
+            max_branches (int): Most branches alive at once
+        """
+        self.engine = engine
+        self.max_branches = max_branches or MAX_BRANCHES
+    
+    def _measure(self, states, weights, records, qubit):
+        """
+        Split every branch on the outcome of measuring one qubit.
+        
+        Args:
+            states (np.ndarray): Branch states of shape (B,) + (2,)*n
+            weights (np.ndarray): Branch probabilities
+            records (np.ndarray): Classical registers of the branches
+            qubit (int): Measured qubit
+        
+        Returns:
+            tuple: (states, weights, records) of the child branches
+        """
+        axis = states.ndim - 1 - qubit
+        children = []
+        for outcome in (0, 1):
+            index = (slice(None),) * axis + (outcome,)
+            probabilities = (np.abs(states[index]) ** 2).reshape(len(weights), -1).sum(axis=1)
+            keep = np.flatnonzero(weights * probabilities > MIN_BRANCH_WEIGHT)
+            if not len(keep):
+                continue
+            
+            # Project onto the outcome and renormalize
+            projected = states[keep]
+            projected[(slice(None),) * axis + (1 - outcome,)] = 0
+            scale = 1 / np.sqrt(probabilities[keep])
+            projected *= scale.reshape((-1,) + (1,) * (states.ndim - 1)).astype(states.dtype)
+            
+            bit = np.int64(1) << qubit
+            children.append((projected, weights[keep] * probabilities[keep], (records[keep] & ~bit) | (outcome * bit)))
+        
+        return tuple(np.concatenate(parts) for parts in zip(*children))
+    
+    def _merge(self, states, weights, records):
+        """
+        Merge branches with the same classical register and the same state.
+        
+        States are compared up to a global phase, which does not change
+        anything the branch goes on to produce.
+        
+        Args:
+            states (np.ndarray): Branch states of shape (B,) + (2,)*n
+            weights (np.ndarray): Branch probabilities
+            records (np.ndarray): Classical registers of the branches
+        
+        Returns:
+            tuple: (states, weights, records) without duplicates
+        """
+        flat = states.reshape(len(weights), -1)
+        weights = weights.copy()
+        keep = []
+        for record in np.unique(records):
+            representatives = []
+            for member in np.flatnonzero(records == record):
+                for representative in representatives:
+                    if abs(np.vdot(flat[representative], flat[member])) > 1 - MERGE_TOLERANCE:
+                        weights[representative] += weights[member]
+                        break
+                else:
+                    representatives.append(member)
+            keep.extend(representatives)
+        
+        if len(keep) == len(weights):
+            return states, weights, records
+        keep = np.sort(keep)
+        return states[keep], weights[keep], records[keep]
+    
+    def run(self, compiled, progress=None, dtype=complex):
+        """
+        Simulate a circuit up to its final state in every branch.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            progress (callable): Optional progress(stage, done, total) hook,
+                called with stage 'gates' after every operation
+            dtype: Complex dtype of the states
+        
+        Returns:
+            tuple: (states of shape (B, 2**n), probabilities (B,), classical
+            registers (B,), report with the final, peak and merged branch
+            counts and the number of branching measurements)
+        """
+        num_qubits = compiled.num_qubits
+        branching, _ = branching_measurements(compiled)
+        states = np.zeros((1,) + (2,) * num_qubits, dtype=dtype)
+        states[(0,) * (num_qubits + 1)] = 1
+        weights = np.ones(1)
+        records = np.zeros(1, dtype=np.int64)
+        report = {"branching_measurements": len(branching), "peak_branches": 1, "merged_branches": 0}
+        
+        conditions = compiled.conditions()
+        for index, (spec, qubits, param) in enumerate(compiled.operations()):
+            condition = conditions[index]
+            if spec.kind == 'measure':
+                if index in branching:
+                    states, weights, records = self._measure(states, weights, records, qubits[0])
+                    split = len(weights)
+                    states, weights, records = self._merge(states, weights, records)
+                    report["merged_branches"] += split - len(weights)
+                    if len(weights) > self.max_branches:
+                        raise ValueError(f"Mid-circuit measurements split the simulation into more than "
+                                         f"{self.max_branches} branches; use the aer backend")
+                    report["peak_branches"] = max(report["peak_branches"], len(weights))
+            else:
+                matrix = compiled.matrix(spec, param) if spec.kind == 'single' else None
+                active = None
+                if condition is not None:
+                    clbit, value = condition
+                    active = np.flatnonzero(((records >> clbit) & 1) == value)
+                if active is None or len(active) == len(weights):
+                    states = self.engine.apply_operation(states, spec, qubits, matrix)
+                elif len(active):
+                    states[active] = self.engine.apply_operation(states[active], spec, qubits, matrix)
+            if progress is not None:
+                progress('gates', index + 1, len(compiled))
+        
+        report["branches"] = len(weights)
+        return states.reshape(len(weights), -1), weights / weights.sum(), records, report
+    
+    def simulate(self, compiled, shots, seed=None, progress=None, dtype=complex):
+        """
+        Simulate a dynamic circuit and sample its counts.
+        
+        Shots are first split over the branches by their probabilities and
+        then drawn from each branch's final state for the measurements left
+        to the end; the bits of branching measurements come from the
+        branch's classical register.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            shots (int): Number of shots
+            seed (int): Optional seed for the random generator
+            progress (callable): Optional progress(stage, done, total) hook
+            dtype: Complex dtype of the states
+        
+        Returns:
+            dict: counts, per-qubit Bloch vectors and P(qubit = 1) of the
+            final state averaged over the branches, and the "branches" report
+        """
+        num_qubits = compiled.num_qubits
+        states, weights, records, report = self.run(compiled, progress, dtype)
+        _, deferred_mask = branching_measurements(compiled)
+        
+        rng = np.random.default_rng(seed)
+        draws = np.zeros(2 ** num_qubits, dtype=np.int64)
+        branch_shots = rng.multinomial(shots, weights)
+        for branch in np.flatnonzero(branch_shots):
+            probabilities = np.abs(states[branch]).astype(np.float64) ** 2
+            branch_draws = rng.multinomial(branch_shots[branch], probabilities / probabilities.sum())
+            outcomes = np.flatnonzero(branch_draws)
+            np.add.at(draws, (outcomes & deferred_mask) | (int(records[branch]) & ~deferred_mask),
+                      branch_draws[outcomes])
+        
+        bloch = sum(weight * statevector_bloch_vectors(state, num_qubits) for weight, state in zip(weights, states))
+        return {
+            "counts": counts_from_draws(draws, compiled.measured_qubits or list(range(num_qubits)), num_qubits),
+            "bloch_vectors": bloch,
+            "marginal_probabilities": (1 - bloch[2]) / 2,
+            "branches": report
+        }
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Statevector checkpoint module for QuantumSandbox.
+Keeps intermediate statevectors of recent simulations keyed by a rolling
+hash of the gate prefix that produced them, so that a circuit edited near
+its end (the usual Circuit Builder workflow) resumes from the longest
+cached prefix instead of starting over from |0...0>.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from .ir import OPCODES
+from .result_cache import ResultCache
+
+
+def prefix_hashes(compiled, dtype=complex):
+    """
+    Compute the rolling hash of every gate prefix of a circuit.
+    
+    Entry k hashes the first k operations: each one chains the previous
+    digest with the operation's IR row (and its matrix for fused
+    'unitary' operations). Measurements do not change the simulated state
+    and leave the hash as it is.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit without symbolic parameters
+        dtype: Complex dtype of the statevector
+    
+    Returns:
+        list: len(compiled) + 1 digests (bytes)
+    """
+    ops = compiled.ops
+    rows = ops.tobytes()
+    itemsize = ops.dtype.itemsize
+    measure = OPCODES['measure']
+    unitary = OPCODES['unitary']
+    
+    digest = hashlib.blake2b(f'{compiled.num_qubits}:{np.dtype(dtype).str}'.encode('ascii'), digest_size=16).digest()
+    hashes = [digest]
+    for index, (opcode, param) in enumerate(zip(ops['opcode'].tolist(), ops['param'].tolist())):
+        if opcode != measure:
+            sha = hashlib.blake2b(digest, digest_size=16)
+            sha.update(rows[index * itemsize:(index + 1) * itemsize])
+            if opcode == unitary:
+                sha.update(np.ascontiguousarray(compiled.matrices[int(param)]).tobytes())
+            digest = sha.digest()
+        hashes.append(digest)
+    return hashes
+
+
+def checkpoint_positions(num_operations, start):
+    """
+    Prefix lengths at which a run stores checkpoints.
+    
+    Edits mostly touch the last few gates, so checkpoints are spaced
+    geometrically back from the end: after all operations and before the
+    last 1, 2, 4, 8... of them.
+    
+    Args:
+        num_operations (int): Number of operations of the circuit
+        start (int): Prefix length the run resumed from
+    
+    Returns:
+        set: Prefix lengths greater than start
+    """
+    positions = {num_operations}
+    distance = 1
+    while num_operations - distance > start:
+        positions.add(num_operations - distance)
+        distance *= 2
+    return {position for position in positions if position > start}
+
+
+class CheckpointCache(ResultCache):
+    """
+    Memory-bounded LRU cache of intermediate statevectors.
+    
+    Keys are prefix hashes (see prefix_hashes). Stored states are private
+    copies: the engine updates large states in place, so a checkpoint is
+    copied both when it is stored and when a run resumes from it. Besides
+    the cache counters, the stats report how many gate applications were
+    skipped by resuming.
+    """
+    
+    # Larger states are not checkpointed (2^20 amplitudes = 16 MiB in complex128)
+    MAX_QUBITS = 20
+    
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_entries=1024, max_qubits=None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_bytes (int): Maximum total size of the cached statevectors
+            max_entries (int): Maximum number of cached statevectors
+            max_qubits (int): Largest register that is checkpointed
+        """
+        super().__init__(max_bytes=max_bytes, max_entries=max_entries)
+        self.max_qubits = max_qubits or self.MAX_QUBITS
+        self.gates_applied = 0
+        self.gates_skipped = 0
+    
+    def accepts(self, compiled):
+        """Whether runs of a circuit are checkpointed."""
+        return compiled.num_qubits <= self.max_qubits and 2 ** compiled.num_qubits * 16 <= self.max_bytes
+    
+    def resume(self, hashes):
+        """
+        Find the longest cached prefix.
+        
+        Args:
+            hashes (list): Prefix hashes of the circuit
+        
+        Returns:
+            tuple: (prefix length, copy of its statevector), or (0, None)
+        """
+        with self._lock:
+            for length in range(len(hashes) - 1, 0, -1):
+                entry = self._entries.get(hashes[length])
+                if entry is not None:
+                    self._entries.move_to_end(hashes[length])
+                    self.hits += 1
+                    break
+            else:
+                self.misses += 1
+                return 0, None
+        return length, entry[0].copy()
+    
+    def record(self, skipped, applied):
+        """Count the gate applications skipped and performed by a run."""
+        with self._lock:
+            self.gates_skipped += skipped
+            self.gates_applied += applied
+    
+    def stats(self):
+        """
+        Get cache counters and gate savings.
+        
+        Returns:
+            dict: Hits, misses, evictions, entries, byte usage and the
+            number of gate applications skipped and performed
+        """
+        stats = super().stats()
+        with self._lock:
+            stats.update(backend="checkpoints", gates_skipped=self.gates_skipped, gates_applied=self.gates_applied)
+        return stats
+
+
+def create_checkpoint_cache():
+    """
+    Create the checkpoint cache configured by the environment.
+    
+    Checkpointing is off unless CHECKPOINT_CACHE_MAX_BYTES sets a size
+    limit (e.g. 268435456 for 256 MiB); even then only requests that ask
+    for it are checkpointed, so one-off circuits do not fill the memory.
+    
+    Returns:
+        CheckpointCache or None
+    """
+    max_bytes = int(os.environ.get('CHECKPOINT_CACHE_MAX_BYTES', 0))
+    return CheckpointCache(max_bytes=max_bytes) if max_bytes > 0 else None
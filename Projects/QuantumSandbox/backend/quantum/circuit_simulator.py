@@ -6,203 +6,645 @@ Quantum circuit simulator module for QuantumSandbox.
 Provides functionality to create, simulate, and analyze quantum circuits.
 """
 
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-from qiskit import QuantumCircuit, Aer, execute
-from qiskit.visualization import plot_histogram, plot_bloch_multivector
-from qiskit.quantum_info import Statevector
-import matplotlib.pyplot as plt
-import io
-import base64
 
-class CircuitSimulator:
+from .checkpoints import checkpoint_positions, create_checkpoint_cache, prefix_hashes
+from .gates import rotation_matrix
+from .branching import BranchingSimulator
+from .ir import compile_circuit
+from .sampling import sample_counts
+from .stabilizer import StabilizerSimulator, is_clifford_circuit, sample_stabilizer_counts
+from .mps import MPSSimulator, estimate_bond_dimensions
+from .noise import NoiseModel, NoisySimulator
+from .optimizer import optimize_circuit
+from .rendering import draw_circuit_text
+
+# Qiskit and Aer are imported on first use (see CircuitSimulator.warmup) so
+# that importing this module stays cheap for a fast server cold start.
+
+class NumpyStatevectorEngine:
     """
-    Class for simulating quantum circuits using Qiskit.
+    Pure NumPy statevector engine.
+    
+    The state of an n-qubit register is kept as a (2,)*n complex tensor and
+    gates are applied with tensordot/slicing along the axes they act on,
+    which avoids the transpile and job overhead of Qiskit Aer for the small
+    and mid-sized circuits built in the sandbox. Qubit ordering follows
+    Qiskit: qubit 0 is the least significant bit, i.e. the last tensor axis.
+    
+    On large states, gates are instead applied in place, slice by slice:
+    the amplitudes are split along the axes the gate does not act on into
+    cache-sized independent slices, which a thread pool updates in
+    parallel (NumPy releases the GIL inside its kernels).
     """
     
-    def __init__(self):
-        """Initialize the circuit simulator with available backends."""
-        self.statevector_backend = Aer.get_backend('statevector_simulator')
-        self.qasm_backend = Aer.get_backend('qasm_simulator')
+    # States with at least this many amplitudes are updated in slices
+    SLICED_MIN_AMPLITUDES = 2 ** 16
+    
+    # Amplitudes per slice; small enough for a slice to stay in cache
+    SLICE_AMPLITUDES = 2 ** 14
+    
+    def __init__(self, num_threads=None):
+        """
+        Initialize the engine. The thread pool is created on first use.
+        
+        Args:
+            num_threads (int): Threads applying a gate (defaults to the
+                SIMULATION_THREADS environment variable, or the CPU count)
+        """
+        self.num_threads = num_threads or int(os.environ.get('SIMULATION_THREADS', os.cpu_count() or 1))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self):
+        """Create the gate thread pool if it is not running yet."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.num_threads, thread_name_prefix='gate')
+            return self._executor
     
-    def _create_circuit_from_definition(self, circuit_def):
+    def run(self, compiled, progress=None, dtype=complex, checkpoints=None):
         """
-        Create a Qiskit QuantumCircuit from a circuit definition.
+        Compute the final statevector of a compiled circuit.
+        
+        Measurements are expected to be terminal (no gate acts on a qubit
+        after it has been measured, and no gate is classically conditioned)
+        and are not applied to the state; dynamic circuits go through
+        quantum.branching instead.
         
         Args:
-            circuit_def (dict): Circuit definition with qubits and gates
+            compiled (CompiledCircuit): Compiled circuit
+            progress (callable): Optional progress(stage, done, total) hook,
+                called with stage 'gates' after every operation
+            dtype: Complex dtype of the state (np.complex64 halves memory)
+            checkpoints (CheckpointCache): Optional cache of intermediate
+                states; the run resumes from the longest cached gate prefix
+                and stores new checkpoints near the end of the circuit
             
         Returns:
-            QuantumCircuit: A Qiskit quantum circuit
+            tuple: (statevector as a flat np.ndarray, list of measured qubits)
         """
-        num_qubits = circuit_def.get('qubits', 1)
-        gates = circuit_def.get('gates', [])
+        if compiled.is_dynamic:
+            raise ValueError("Circuits with mid-circuit measurement or conditional gates have no single final statevector")
         
-        # Create quantum circuit
-        circuit = QuantumCircuit(num_qubits, num_qubits)
+        num_qubits = compiled.num_qubits
+        start, state, save_at = 0, None, ()
+        if checkpoints is not None and checkpoints.accepts(compiled):
+            hashes = prefix_hashes(compiled, dtype)
+            start, state = checkpoints.resume(hashes)
+            save_at = checkpoint_positions(len(compiled), start)
+            checkpoints.record(start, len(compiled) - start)
         
-        # Add gates to the circuit
-        for gate in gates:
-            gate_type = gate.get('type', '').lower()
-            
-            if gate_type == 'h':
-                for target in gate.get('targets', []):
-                    circuit.h(target)
-            
-            elif gate_type == 'x':
-                for target in gate.get('targets', []):
-                    circuit.x(target)
-            
-            elif gate_type == 'y':
-                for target in gate.get('targets', []):
-                    circuit.y(target)
-            
-            elif gate_type == 'z':
-                for target in gate.get('targets', []):
-                    circuit.z(target)
-            
-            elif gate_type == 'cx' or gate_type == 'cnot':
-                controls = gate.get('controls', [])
-                targets = gate.get('targets', [])
-                if controls and targets:
-                    for control in controls:
-                        for target in targets:
-                            circuit.cx(control, target)
-            
-            elif gate_type == 'cz':
-                controls = gate.get('controls', [])
-                targets = gate.get('targets', [])
-                if controls and targets:
-                    for control in controls:
-                        for target in targets:
-                            circuit.cz(control, target)
-            
-            elif gate_type == 'ccx' or gate_type == 'toffoli':
-                controls = gate.get('controls', [])
-                targets = gate.get('targets', [])
-                if len(controls) >= 2 and targets:
-                    for target in targets:
-                        circuit.ccx(controls[0], controls[1], target)
-            
-            elif gate_type == 'rx':
-                targets = gate.get('targets', [])
-                theta = gate.get('theta', 0)
-                for target in targets:
-                    circuit.rx(theta, target)
-            
-            elif gate_type == 'ry':
-                targets = gate.get('targets', [])
-                theta = gate.get('theta', 0)
-                for target in targets:
-                    circuit.ry(theta, target)
-            
-            elif gate_type == 'rz':
-                targets = gate.get('targets', [])
-                theta = gate.get('theta', 0)
-                for target in targets:
-                    circuit.rz(theta, target)
-            
-            elif gate_type == 's':
-                for target in gate.get('targets', []):
-                    circuit.s(target)
+        if state is None:
+            state = np.zeros((2,) * num_qubits, dtype=dtype)
+            state[(0,) * num_qubits] = 1
+        else:
+            state = state.reshape((2,) * num_qubits)
+        
+        operations = itertools.islice(compiled.operations(), start, None)
+        for index, (spec, qubits, param) in enumerate(operations, start):
+            if spec.kind != 'measure':
+                state = self.apply_operation(state, spec, qubits, compiled.matrix(spec, param) if spec.kind == 'single' else None)
+            if index + 1 in save_at:
+                # Large states are updated in place, so the checkpoint needs its own copy
+                checkpoints.put(hashes[index + 1], state.copy())
+            if progress is not None:
+                progress('gates', index + 1, len(compiled))
+        
+        return state.reshape(-1), compiled.measured_qubits
+    
+    def run_batch(self, compiled, values):
+        """
+        Compute the final statevectors of a circuit for a batch of parameter values.
+        
+        The state carries a leading batch axis, shape (B,) + (2,)*n. Fixed
+        gates are applied to every batch entry in one contraction, while
+        rotations with a symbolic angle use one matrix per entry.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit, possibly symbolic
+            values (dict): Parameter name -> array of B angles
             
-            elif gate_type == 'sdg':
-                for target in gate.get('targets', []):
-                    circuit.sdg(target)
+        Returns:
+            np.ndarray: Statevectors of shape (B, 2**n)
+        """
+        if compiled.is_dynamic:
+            raise ValueError("Circuits with mid-circuit measurement or conditional gates have no single final statevector")
+        missing = [name for name in compiled.parameters if name not in values]
+        if missing:
+            raise ValueError(f"No values given for parameters: {', '.join(missing)}")
+        
+        num_qubits = compiled.num_qubits
+        batch = len(next(iter(values.values()))) if values else 1
+        state = np.zeros((batch,) + (2,) * num_qubits, dtype=complex)
+        state[(slice(None),) + (0,) * num_qubits] = 1
+        
+        for spec, qubits, param, name in compiled.operations(symbolic=True):
+            if spec.kind == 'measure':
+                continue
+            if name is not None:
+                matrix = rotation_matrix(spec.name, values[name])
+            else:
+                matrix = compiled.matrix(spec, param) if spec.kind == 'single' else None
+            state = self.apply_operation(state, spec, qubits, matrix)
+        
+        return state.reshape(batch, -1)
+    
+    def apply_operation(self, state, spec, qubits, matrix):
+        """
+        Apply one compiled operation to a state tensor.
+        
+        Axes are counted from the end, so the state may carry leading batch
+        axes.
+        
+        Args:
+            state (np.ndarray): State tensor of shape (2,)*n, or (B,) + (2,)*n
+            spec (GateSpec): Gate of the operation
+            qubits (tuple): Controls followed by targets
+            matrix (np.ndarray): 2x2 matrix of 'single' operations (or a
+                (B, 2, 2) stack, one per batch entry), else None
             
-            elif gate_type == 't':
-                for target in gate.get('targets', []):
-                    circuit.t(target)
+        Returns:
+            np.ndarray: Updated state tensor
+        """
+        # Matrices are cast to the state dtype so complex64 states are not promoted
+        sliced = state.size >= self.SLICED_MIN_AMPLITUDES
+        if spec.kind == 'single':
+            matrix = matrix.astype(state.dtype, copy=False)
+            if sliced and matrix.ndim == 2:
+                return self._apply_sliced(state, matrix, (), qubits[0])
+            return self._apply_single(state, matrix, qubits[0])
+        if spec.kind == 'controlled':
+            matrix = spec.matrix.astype(state.dtype, copy=False)
+            if sliced:
+                return self._apply_sliced(state, matrix, qubits[:-1], qubits[-1])
+            return self._apply_controlled(state, matrix, qubits[:-1], qubits[-1])
+        if spec.kind == 'swap':
+            num_qubits = state.ndim
+            return np.swapaxes(state, num_qubits - 1 - qubits[0], num_qubits - 1 - qubits[1])
+        return state
+    
+    def _apply_sliced(self, state, matrix, controls, target):
+        """
+        Apply a 2x2 matrix to `target` in place, where all controls are |1>.
+        
+        Control axes are fixed to 1, and the outermost remaining axes other
+        than the target are fixed to every combination of values until a
+        slice holds at most SLICE_AMPLITUDES amplitudes. Slices are disjoint
+        views of the state, so threads can update them concurrently.
+        
+        Args:
+            state (np.ndarray): State tensor (may carry leading batch axes)
+            matrix (np.ndarray): 2x2 matrix in the state dtype
+            controls (tuple): Control qubits
+            target (int): Target qubit
             
-            elif gate_type == 'tdg':
-                for target in gate.get('targets', []):
-                    circuit.tdg(target)
+        Returns:
+            np.ndarray: The updated state (same array)
+        """
+        num_axes = state.ndim
+        index = [slice(None)] * num_axes
+        for control in controls:
+            index[num_axes - 1 - control] = 1
+        target_axis = num_axes - 1 - target
+        
+        split_axes = []
+        slice_size = state.size >> len(controls)
+        for axis in range(num_axes):
+            if slice_size <= self.SLICE_AMPLITUDES:
+                break
+            if axis != target_axis and isinstance(index[axis], slice):
+                split_axes.append(axis)
+                slice_size //= state.shape[axis]
+        
+        slices = []
+        for values in itertools.product(*(range(state.shape[axis]) for axis in split_axes)):
+            for axis, value in zip(split_axes, values):
+                index[axis] = value
+            slices.append(state[tuple(index)])
+        
+        # Integer-indexed axes before the target drop out of each slice
+        slice_axis = target_axis - sum(1 for axis in range(target_axis) if not isinstance(index[axis], slice))
+        
+        num_groups = min(self.num_threads, len(slices))
+        if num_groups > 1:
+            groups = [slices[start::num_groups] for start in range(num_groups)]
+            list(self._get_executor().map(lambda group: self._update_slices(group, matrix, slice_axis), groups))
+        else:
+            self._update_slices(slices, matrix, slice_axis)
+        return state
+    
+    @staticmethod
+    def _update_slices(slices, matrix, axis):
+        """Multiply the `axis` pairs of each slice by a 2x2 matrix, in place."""
+        diagonal = matrix[0, 1] == 0 and matrix[1, 0] == 0
+        for view in slices:
+            # Ellipsis keeps 1-D slices as 0-d views instead of scalar copies
+            view = np.moveaxis(view, axis, 0)
+            zero, one = view[0, ...], view[1, ...]
+            if diagonal:
+                if matrix[0, 0] != 1:
+                    zero *= matrix[0, 0]
+                if matrix[1, 1] != 1:
+                    one *= matrix[1, 1]
+                continue
+            original = zero.copy()
+            zero *= matrix[0, 0]
+            zero += matrix[0, 1] * one
+            one *= matrix[1, 1]
+            one += matrix[1, 0] * original
+    
+    @staticmethod
+    def _apply_single(state, matrix, qubit):
+        """Contract a 2x2 matrix (or a (B, 2, 2) stack) with the tensor axis of `qubit`."""
+        if matrix.ndim == 3:
+            # Batch entry b gets matrix[b]
+            view = state.reshape(state.shape[0], -1, 2, 2 ** qubit)
+            return np.einsum('bij,bljr->blir', matrix, view).reshape(state.shape)
+        
+        axis = state.ndim - 1 - qubit
+        state = np.tensordot(matrix, state, axes=([1], [axis]))
+        return np.moveaxis(state, 0, axis)
+    
+    @staticmethod
+    def _apply_controlled(state, matrix, controls, target):
+        """Apply a 2x2 matrix to `target` on the subspace where all controls are |1>."""
+        num_qubits = state.ndim
+        index = [slice(None)] * num_qubits
+        for control in controls:
+            index[num_qubits - 1 - control] = 1
+        index = tuple(index)
+        
+        # Selecting the control axes drops them, shifting the target axis left
+        target_axis = num_qubits - 1 - target
+        target_axis -= sum(1 for control in controls if num_qubits - 1 - control < target_axis)
+        
+        subspace = np.tensordot(matrix, state[index], axes=([1], [target_axis]))
+        state[index] = np.moveaxis(subspace, 0, target_axis)
+        return state
+
+
+class CircuitSimulator:
+    """
+    Class for simulating quantum circuits using Qiskit or the built-in NumPy engine.
+    """
+    
+    # Circuits up to this size run on the NumPy engine when backend is 'auto'
+    NUMPY_MAX_QUBITS = 20
+    
+    # Largest dense statevector the nodes can hold; beyond it 'auto' uses MPS
+    DENSE_MAX_QUBITS = 28
+    
+    # Text diagrams are only drawn up to this many qubits
+    DIAGRAM_MAX_QUBITS = 32
+    
+    BACKENDS = ('auto', 'numpy', 'aer', 'stabilizer', 'mps', 'out_of_core')
+    
+    # Disk-backed runs are too slow for a request thread and are only served as jobs
+    JOB_ONLY_BACKENDS = ('out_of_core',)
+    
+    # Statevector dtypes; the stabilizer and MPS backends always use double
+    PRECISIONS = {'double': np.complex128, 'single': np.complex64}
+    STATEVECTOR_BACKENDS = ('numpy', 'aer', 'out_of_core')
+    
+    # Single-precision runs are compared against a double-precision rerun up to this size
+    PRECISION_REFERENCE_MAX_QUBITS = 16
+    
+    def __init__(self):
+        """Initialize the circuit simulator. Aer backends are loaded on first use."""
+        self._statevector_backend = None
+        self._qasm_backend = None
+        self._warmup_lock = threading.Lock()
+        self.numpy_engine = NumpyStatevectorEngine()
+        self.checkpoint_cache = create_checkpoint_cache()
+        self.stabilizer_simulator = StabilizerSimulator()
+        self.mps_simulator = MPSSimulator()
+        # Trajectories run in-process unless a process pool is attached
+        self.noise_simulator = NoisySimulator(self.numpy_engine)
+        self.branching_simulator = BranchingSimulator(self.numpy_engine)
+        self._out_of_core_engine = None
+    
+    def warmup(self):
+        """
+        Import Qiskit and load the Aer backends.
+        
+        This is the slow part of starting a worker; it runs lazily on the first
+        simulation or ahead of time from a background warmup thread.
+        """
+        with self._warmup_lock:
+            if self._statevector_backend is None:
+                from qiskit import Aer
+                self._qasm_backend = Aer.get_backend('qasm_simulator')
+                self._statevector_backend = Aer.get_backend('statevector_simulator')
+    
+    @property
+    def is_warm(self):
+        """Whether the Aer backends are loaded."""
+        return self._statevector_backend is not None
+    
+    @property
+    def out_of_core_engine(self):
+        """Disk-backed statevector engine, created on first use."""
+        if self._out_of_core_engine is None:
+            from .out_of_core import OutOfCoreStatevectorEngine
+            self._out_of_core_engine = OutOfCoreStatevectorEngine()
+        return self._out_of_core_engine
+    
+    @property
+    def statevector_backend(self):
+        """Aer statevector simulator backend."""
+        if self._statevector_backend is None:
+            self.warmup()
+        return self._statevector_backend
+    
+    @property
+    def qasm_backend(self):
+        """Aer qasm simulator backend."""
+        if self._qasm_backend is None:
+            self.warmup()
+        return self._qasm_backend
+    
+    def select_backend(self, compiled, backend='auto', noise=None):
+        """
+        Resolve the simulation backend for a circuit.
+        
+        Circuits too large for the NumPy engine that only use Clifford gates
+        go to the stabilizer engine, which scales polynomially. Other large
+        circuits go to the MPS engine when their entanglement bound fits in
+        the default bond dimension, or when they are too large for a dense
+        statevector anyway. Dynamic circuits (mid-circuit measurement or
+        conditional gates) that are too large for the NumPy engine go to Aer.
+        Noisy circuits always run on the NumPy engine.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            backend (str): Requested backend ('auto', 'numpy', 'aer', 'stabilizer',
+                'mps' or 'out_of_core'; the last one is never picked automatically)
+            noise (NoiseModel): Optional noise model
             
-            elif gate_type == 'swap':
-                targets = gate.get('targets', [])
-                if len(targets) >= 2:
-                    circuit.swap(targets[0], targets[1])
+        Returns:
+            str: The resolved backend
+        """
+        backend = (backend or 'auto').lower()
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(self.BACKENDS)}")
+        if noise is not None:
+            if backend not in ('auto', 'numpy'):
+                raise ValueError(f"Noise models are simulated by the NumPy engine, not the {backend} backend")
+            return 'numpy'
+        if backend != 'auto':
+            return backend
+        
+        if compiled.num_qubits <= self.NUMPY_MAX_QUBITS:
+            return 'numpy'
+        if compiled.is_dynamic:
+            return 'aer'
+        if is_clifford_circuit(compiled):
+            return 'stabilizer'
+        
+        log_bond = estimate_bond_dimensions(compiled).max(initial=0)
+        if 2 ** log_bond <= MPSSimulator.DEFAULT_MAX_BOND_DIMENSION or compiled.num_qubits > self.DENSE_MAX_QUBITS:
+            return 'mps'
+        return 'aer'
+    
+    def _create_qiskit_circuit(self, compiled):
+        """
+        Create a Qiskit QuantumCircuit from a compiled circuit.
+        
+        Every registry gate maps onto the QuantumCircuit method of the same
+        name; fused single-qubit runs become unitary instructions, and
+        classical conditions become c_if on the single classical bit.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
             
-            elif gate_type == 'measure':
-                for i, target in enumerate(gate.get('targets', [])):
-                    circuit.measure(target, target)
+        Returns:
+            QuantumCircuit: A Qiskit quantum circuit
+        """
+        from qiskit import QuantumCircuit
+        
+        circuit = QuantumCircuit(compiled.num_qubits, compiled.num_qubits)
+        
+        for (spec, qubits, param), condition in zip(compiled.operations(), compiled.conditions()):
+            if spec.kind == 'measure':
+                circuit.measure(qubits[0], qubits[0])
+                continue
+            if spec.name == 'unitary':
+                instructions = circuit.unitary(compiled.matrix(spec, param), list(qubits), label='fused')
+            elif spec.num_params:
+                instructions = getattr(circuit, spec.name)(param, *qubits)
+            else:
+                instructions = getattr(circuit, spec.name)(*qubits)
+            if condition is not None:
+                instructions.c_if(circuit.clbits[condition[0]], condition[1])
         
         # Add measurements if not already added
-        if not any(gate.get('type', '').lower() == 'measure' for gate in gates):
+        if not compiled.measured_qubits:
             circuit.measure_all()
             
         return circuit
     
-    def simulate(self, circuit_def, shots=1024):
+    def simulate(self, circuit_def, shots=1024, backend='auto', seed=None, options=None, optimize=True,
+                 progress=None, precision='double', noise=None, checkpoint=False):
         """
         Simulate a quantum circuit and return the results.
         
+        Circuits whose measurements are all terminal are simulated once and
+        their counts are sampled from the final statevector probabilities.
+        Dynamic circuits, with mid-circuit measurement or classically
+        conditioned gates, branch on every measurement outcome on the NumPy
+        backend (see quantum.branching) and go through the shot-based qasm
+        simulator on Aer. Checkpointed NumPy runs resume from the longest
+        gate prefix in the checkpoint cache (see quantum.checkpoints), so a
+        circuit edited near its end only applies the changed gates.
+        
         Args:
-            circuit_def (dict): Circuit definition
+            circuit_def (dict or CompiledCircuit): Circuit definition
             shots (int): Number of simulation shots
+            backend (str): 'numpy', 'aer' or 'auto' to pick by circuit size
+            seed (int): Optional seed for measurement sampling
+            options (dict): Backend options; the MPS backend reads
+                "max_bond_dimension" and "truncation_threshold"
+            optimize (bool): Run the peephole optimizer (quantum.optimizer)
+                before simulating; its gate count/depth report is returned
+                under "optimization"
+            progress (callable): Optional progress(stage, done, total) hook
+                reporting 'gates' applied (per gate on the NumPy backend,
+                once at the end elsewhere) and 'shots' sampled; it may raise
+                to abort the simulation
+            precision (str): 'double' (complex128) or 'single' (complex64)
+                statevector; single-precision results report their accuracy
+                under "accuracy"
+            noise (NoiseModel or dict): Optional noise model, by default the
+                "noise" section of circuit_def (see quantum.noise); noisy
+                circuits are not optimized, since that would drop or merge
+                the gates the noise follows
+            checkpoint (bool): Resume from and store intermediate NumPy
+                statevectors in the checkpoint cache, if the server has one
             
         Returns:
-            dict: Simulation results including counts and statevector
+            dict: Simulation results including counts, a text
+            "circuit_diagram" (up to DIAGRAM_MAX_QUBITS qubits) and the raw
+            complex statevector array (encoded for JSON by
+            quantum.serialization; histogram images are rendered
+            separately, see quantum.rendering).
+            The stabilizer and MPS backends return no statevector but
+            per-qubit Bloch vectors plus stabilizer generators or marginal
+            probabilities and truncation data, and so do noisy and dynamic
+            NumPy simulations (the latter report their "branches").
         """
-        circuit = self._create_circuit_from_definition(circuit_def)
-        
-        # Get circuit diagram
-        circuit_diagram = circuit.draw(output='text').data
-        
-        # Run statevector simulation
-        statevector_job = execute(circuit, self.statevector_backend)
-        statevector_result = statevector_job.result()
-        statevector = statevector_result.get_statevector(circuit)
-        
-        # Run measurement simulation
-        measurement_circuit = circuit.copy()
-        if not any(gate.get('type', '').lower() == 'measure' for gate in circuit_def.get('gates', [])):
-            measurement_circuit.measure_all()
-        
-        qasm_job = execute(measurement_circuit, self.qasm_backend, shots=shots)
-        qasm_result = qasm_job.result()
-        counts = qasm_result.get_counts(circuit)
-        
-        # Generate histogram plot
-        plt.figure(figsize=(10, 6))
-        plot_histogram(counts)
-        histogram_buf = io.BytesIO()
-        plt.savefig(histogram_buf, format='png')
-        plt.close()
-        histogram_buf.seek(0)
-        histogram_img = base64.b64encode(histogram_buf.read()).decode('utf-8')
-        
-        # Format statevector for JSON
-        formatted_statevector = []
-        for i, amplitude in enumerate(statevector):
-            binary = format(i, f'0{circuit_def.get("qubits", 1)}b')
-            formatted_statevector.append({
-                "state": binary,
-                "real": float(amplitude.real),
-                "imag": float(amplitude.imag),
-                "probability": float(abs(amplitude)**2)
-            })
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {', '.join(self.PRECISIONS)}")
+        
+        compiled = compile_circuit(circuit_def)
+        if noise is None and isinstance(circuit_def, dict):
+            noise = circuit_def.get('noise')
+        if isinstance(noise, dict):
+            noise = NoiseModel.from_dict(noise)
+        backend = self.select_backend(compiled, backend, noise)
+        num_qubits = compiled.num_qubits
+        dynamic_numpy = backend == 'numpy' and compiled.is_dynamic
+        if backend not in self.STATEVECTOR_BACKENDS or noise is not None or dynamic_numpy:
+            precision = 'double'
+        dtype = self.PRECISIONS[precision]
+        extra = {"precision": precision}
+        
+        # Qiskit is only loaded for Aer runs
+        circuit = self._create_qiskit_circuit(compiled) if backend == 'aer' else None
+        
+        # Get circuit diagram (of the circuit as submitted); Qiskit draws it on Aer
+        circuit_diagram = None
+        if num_qubits <= self.DIAGRAM_MAX_QUBITS:
+            circuit_diagram = circuit.draw(output='text').data if circuit is not None else draw_circuit_text(compiled)
+        
+        if optimize and noise is None:
+            # The tableau engine cannot apply fused 2x2 matrices
+            compiled, extra["optimization"] = optimize_circuit(compiled, fuse=backend != 'stabilizer')
+            if backend == 'aer':
+                circuit = self._create_qiskit_circuit(compiled)
+        
+        measured = compiled.measured_qubits or list(range(num_qubits))
+        
+        if noise is not None:
+            noisy_result = self.noise_simulator.simulate(compiled, noise, shots, seed, progress)
+            counts = noisy_result.pop('counts')
+            statevector = None
+            extra.update(noisy_result)
+        
+        elif backend == 'stabilizer':
+            # Polynomial-time tableau simulation; no 2^n statevector is built
+            tableau, _ = self.stabilizer_simulator.run(compiled)
+            counts = sample_stabilizer_counts(tableau, measured, shots, seed)
+            statevector = None
+            extra.update(stabilizers=tableau.stabilizer_strings(), bloch_vectors=tableau.bloch_vectors())
+        
+        elif backend == 'mps':
+            options = options or {}
+            mps_result = self.mps_simulator.simulate(
+                compiled, shots, seed,
+                max_bond_dimension=options.get('max_bond_dimension'),
+                truncation_threshold=options.get('truncation_threshold')
+            )
+            counts = mps_result.pop('counts')
+            statevector = None
+            extra.update(mps_result)
+        
+        elif backend == 'out_of_core':
+            out_of_core_result = self.out_of_core_engine.simulate(compiled, shots, seed, progress, dtype)
+            counts = out_of_core_result.pop('counts')
+            statevector = None
+            extra.update(out_of_core_result)
+        
+        elif dynamic_numpy:
+            branching_result = self.branching_simulator.simulate(compiled, shots, seed, progress, dtype)
+            counts = branching_result.pop('counts')
+            statevector = None
+            extra.update(branching_result)
+        
+        elif backend == 'numpy':
+            checkpoints = self.checkpoint_cache if checkpoint else None
+            statevector, _ = self.numpy_engine.run(compiled, progress, dtype, checkpoints)
+            counts = sample_counts(statevector, measured, num_qubits, shots, seed)
+        
+        elif compiled.is_dynamic:
+            # Measurement outcomes feed into later gates: run the full shot-based path
+            from qiskit import execute
+            statevector_job = execute(circuit, self.statevector_backend, seed_simulator=seed, precision=precision)
+            statevector = np.asarray(statevector_job.result().get_statevector(circuit), dtype=dtype)
+            
+            qasm_job = execute(circuit, self.qasm_backend, shots=shots, seed_simulator=seed, precision=precision)
+            counts = qasm_job.result().get_counts(circuit)
+        
+        else:
+            # Single statevector execution; counts are sampled from its probabilities
+            from qiskit import execute
+            statevector_circuit = circuit.remove_final_measurements(inplace=False)
+            statevector_job = execute(statevector_circuit, self.statevector_backend, precision=precision)
+            statevector = statevector_job.result().get_statevector(statevector_circuit)
+            statevector = np.asarray(statevector, dtype=dtype)
+            counts = sample_counts(statevector, measured, num_qubits, shots, seed)
+        
+        if precision == 'single' and statevector is None:
+            extra["accuracy"] = {"norm_drift": abs(1.0 - extra["out_of_core"]["norm"]), "max_probability_error": None}
+        elif precision == 'single':
+            extra["accuracy"] = self._single_precision_accuracy(compiled, statevector)
+        
+        if progress is not None:
+            progress('gates', len(compiled), len(compiled))
+            progress('shots', shots, shots)
         
         return {
             "counts": counts,
-            "statevector": formatted_statevector,
+            "statevector": statevector,
             "circuit_diagram": circuit_diagram,
-            "histogram_image": histogram_img,
-            "num_qubits": circuit_def.get('qubits', 1),
-            "shots": shots
+            "num_qubits": num_qubits,
+            "shots": shots,
+            "backend": backend,
+            **extra
+        }
+    
+    def _single_precision_accuracy(self, compiled, statevector):
+        """
+        Measure the error of a single-precision statevector.
+        
+        The norm drift is always available; the maximum probability error is
+        measured against a double-precision NumPy rerun for circuits of up to
+        PRECISION_REFERENCE_MAX_QUBITS qubits, and is None above that.
+        
+        Args:
+            compiled (CompiledCircuit): Simulated (optimized) circuit
+            statevector (np.ndarray): complex64 statevector
+        
+        Returns:
+            dict: norm_drift and max_probability_error
+        """
+        probabilities = np.abs(statevector).astype(np.float64) ** 2
+        accuracy = {
+            "norm_drift": float(abs(1.0 - probabilities.sum())),
+            "max_probability_error": None
         }
+        if compiled.num_qubits <= self.PRECISION_REFERENCE_MAX_QUBITS and not compiled.is_dynamic:
+            reference, _ = self.numpy_engine.run(compiled)
+            accuracy["max_probability_error"] = float(np.max(np.abs(probabilities - np.abs(reference) ** 2)))
+        return accuracy
     
     def export_to_qiskit(self, circuit_def):
         """
         Export a circuit definition to Qiskit Python code.
         
         Args:
-            circuit_def (dict): Circuit definition
+            circuit_def (dict or CompiledCircuit): Circuit definition
             
         Returns:
             str: Qiskit Python code
         """
-        num_qubits = circuit_def.get('qubits', 1)
-        gates = circuit_def.get('gates', [])
+        compiled = compile_circuit(circuit_def)
+        num_qubits = compiled.num_qubits
         
         code_lines = [
             "from qiskit import QuantumCircuit, Aer, execute",
@@ -213,92 +655,26 @@ class CircuitSimulator:
             ""
         ]
         
-        # Add gates to the code
-        for gate in gates:
-            gate_type = gate.get('type', '').lower()
-            
-            if gate_type == 'h':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.h({target})  # Hadamard gate on qubit {target}")
-            
-            elif gate_type == 'x':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.x({target})  # X gate (NOT) on qubit {target}")
-            
-            elif gate_type == 'y':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.y({target})  # Y gate on qubit {target}")
-            
-            elif gate_type == 'z':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.z({target})  # Z gate on qubit {target}")
-            
-            elif gate_type == 'cx' or gate_type == 'cnot':
-                controls = gate.get('controls', [])
-                targets = gate.get('targets', [])
-                if controls and targets:
-                    for control in controls:
-                        for target in targets:
-                            code_lines.append(f"circuit.cx({control}, {target})  # CNOT gate with control={control}, target={target}")
-            
-            elif gate_type == 'cz':
-                controls = gate.get('controls', [])
-                targets = gate.get('targets', [])
-                if controls and targets:
-                    for control in controls:
-                        for target in targets:
-                            code_lines.append(f"circuit.cz({control}, {target})  # CZ gate with control={control}, target={target}")
-            
-            elif gate_type == 'ccx' or gate_type == 'toffoli':
-                controls = gate.get('controls', [])
-                targets = gate.get('targets', [])
-                if len(controls) >= 2 and targets:
-                    for target in targets:
-                        code_lines.append(f"circuit.ccx({controls[0]}, {controls[1]}, {target})  # Toffoli gate")
-            
-            elif gate_type == 'rx':
-                targets = gate.get('targets', [])
-                theta = gate.get('theta', 0)
-                for target in targets:
-                    code_lines.append(f"circuit.rx({theta}, {target})  # RX rotation by {theta} on qubit {target}")
-            
-            elif gate_type == 'ry':
-                targets = gate.get('targets', [])
-                theta = gate.get('theta', 0)
-                for target in targets:
-                    code_lines.append(f"circuit.ry({theta}, {target})  # RY rotation by {theta} on qubit {target}")
-            
-            elif gate_type == 'rz':
-                targets = gate.get('targets', [])
-                theta = gate.get('theta', 0)
-                for target in targets:
-                    code_lines.append(f"circuit.rz({theta}, {target})  # RZ rotation by {theta} on qubit {target}")
-            
-            elif gate_type == 's':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.s({target})  # S gate on qubit {target}")
-            
-            elif gate_type == 'sdg':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.sdg({target})  # S dagger gate on qubit {target}")
-            
-            elif gate_type == 't':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.t({target})  # T gate on qubit {target}")
-            
-            elif gate_type == 'tdg':
-                for target in gate.get('targets', []):
-                    code_lines.append(f"circuit.tdg({target})  # T dagger gate on qubit {target}")
-            
-            elif gate_type == 'swap':
-                targets = gate.get('targets', [])
-                if len(targets) >= 2:
-                    code_lines.append(f"circuit.swap({targets[0]}, {targets[1]})  # SWAP gate between qubits {targets[0]} and {targets[1]}")
+        # Add gates to the code (measurements of static circuits are added below)
+        dynamic = compiled.is_dynamic
+        for (spec, qubits, param), condition in zip(compiled.operations(), compiled.conditions()):
+            comment = spec.comment.format(q=qubits, theta=param)
+            if spec.kind == 'measure':
+                if dynamic:
+                    code_lines.append(f"circuit.measure({qubits[0]}, {qubits[0]})  # {comment}")
+                continue
+            args = ([param] if spec.num_params else []) + list(qubits)
+            call = f"circuit.{spec.name}({', '.join(map(str, args))})"
+            if condition is not None:
+                call += f".c_if(circuit.clbits[{condition[0]}], {condition[1]})"
+                comment += f" if bit {condition[0]} is {condition[1]}"
+            code_lines.append(f"{call}  # {comment}")
         
         # Add measurements
-        code_lines.append("")
-        code_lines.append("# Add measurements")
-        code_lines.append("circuit.measure_all()")
+        if not dynamic:
+            code_lines.append("")
+            code_lines.append("# Add measurements")
+            code_lines.append("circuit.measure_all()")
         
         # Add simulation code
         code_lines.extend([
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Gate definitions module for QuantumSandbox.
+Provides the gate matrices and type aliases shared by the simulation engines.
+"""
+
+import numpy as np
+
+_INV_SQRT2 = 1 / np.sqrt(2)
+
+# Fixed single-qubit gate matrices used by the NumPy engine
+SINGLE_QUBIT_GATES = {
+    'h': np.array([[_INV_SQRT2, _INV_SQRT2], [_INV_SQRT2, -_INV_SQRT2]], dtype=complex),
+    'x': np.array([[0, 1], [1, 0]], dtype=complex),
+    'y': np.array([[0, -1j], [1j, 0]], dtype=complex),
+    'z': np.array([[1, 0], [0, -1]], dtype=complex),
+    's': np.array([[1, 0], [0, 1j]], dtype=complex),
+    'sdg': np.array([[1, 0], [0, -1j]], dtype=complex),
+    't': np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex),
+    'tdg': np.array([[1, 0], [0, np.exp(-1j * np.pi / 4)]], dtype=complex),
+}
+
+GATE_ALIASES = {
+    'cnot': 'cx',
+    'toffoli': 'ccx',
+}
+
+
+def rotation_matrix(gate_type, theta):
+    """
+    Build the 2x2 matrix of an rx/ry/rz rotation (Qiskit conventions).
+    
+    Args:
+        gate_type (str): One of 'rx', 'ry' or 'rz'
+        theta (float or np.ndarray): Rotation angle in radians, or an array
+            of angles for a stack of matrices
+        
+    Returns:
+        np.ndarray: 2x2 complex unitary, or shape theta.shape + (2, 2)
+    """
+    theta = np.asarray(theta, dtype=float)
+    cos = np.cos(theta / 2)
+    sin = np.sin(theta / 2)
+    matrix = np.zeros(theta.shape + (2, 2), dtype=complex)
+    if gate_type == 'rx':
+        matrix[..., 0, 0] = matrix[..., 1, 1] = cos
+        matrix[..., 0, 1] = matrix[..., 1, 0] = -1j * sin
+    elif gate_type == 'ry':
+        matrix[..., 0, 0] = matrix[..., 1, 1] = cos
+        matrix[..., 0, 1] = -sin
+        matrix[..., 1, 0] = sin
+    elif gate_type == 'rz':
+        matrix[..., 0, 0] = np.exp(-0.5j * theta)
+        matrix[..., 1, 1] = np.exp(0.5j * theta)
+    else:
+        raise ValueError(f"Unknown rotation gate: {gate_type}")
+    return matrix
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Circuit IR module for QuantumSandbox.
+Compiles JSON circuit definitions once into a compact, validated
+intermediate representation: a NumPy structured array with one row per
+operation (opcode, qubits, parameter). Opcodes come from a table-driven
+gate registry shared by the simulation engines, the optimizer and the
+Qiskit exporter, so no other module parses gate dicts.
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from .gates import GATE_ALIASES, SINGLE_QUBIT_GATES, rotation_matrix
+from .result_cache import ResultCache
+
+GateSpec = namedtuple('GateSpec', ['name', 'kind', 'num_controls', 'num_targets', 'num_params', 'matrix', 'comment'])
+GateSpec.__doc__ = """
+Registry entry of a gate.
+
+kind is 'single' (2x2 matrix on one qubit), 'controlled' (`matrix` applied
+to the target when every control is |1>), 'swap' or 'measure'. `comment`
+is the annotation written next to the gate by the Qiskit exporter; it is
+formatted with the operation's qubits `q` and parameter `theta`.
+"""
+
+# Opcode of a gate is its position in this table
+GATE_REGISTRY = (
+    GateSpec('h', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['h'], "Hadamard gate on qubit {q[0]}"),
+    GateSpec('x', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['x'], "X gate (NOT) on qubit {q[0]}"),
+    GateSpec('y', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['y'], "Y gate on qubit {q[0]}"),
+    GateSpec('z', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['z'], "Z gate on qubit {q[0]}"),
+    GateSpec('s', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['s'], "S gate on qubit {q[0]}"),
+    GateSpec('sdg', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['sdg'], "S dagger gate on qubit {q[0]}"),
+    GateSpec('t', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['t'], "T gate on qubit {q[0]}"),
+    GateSpec('tdg', 'single', 0, 1, 0, SINGLE_QUBIT_GATES['tdg'], "T dagger gate on qubit {q[0]}"),
+    GateSpec('rx', 'single', 0, 1, 1, None, "RX rotation by {theta} on qubit {q[0]}"),
+    GateSpec('ry', 'single', 0, 1, 1, None, "RY rotation by {theta} on qubit {q[0]}"),
+    GateSpec('rz', 'single', 0, 1, 1, None, "RZ rotation by {theta} on qubit {q[0]}"),
+    # Fused single-qubit run from the optimizer; the parameter indexes CompiledCircuit.matrices
+    GateSpec('unitary', 'single', 0, 1, 0, None, "Fused single-qubit gates on qubit {q[0]}"),
+    GateSpec('cx', 'controlled', 1, 1, 0, SINGLE_QUBIT_GATES['x'], "CNOT gate with control={q[0]}, target={q[1]}"),
+    GateSpec('cz', 'controlled', 1, 1, 0, SINGLE_QUBIT_GATES['z'], "CZ gate with control={q[0]}, target={q[1]}"),
+    GateSpec('ccx', 'controlled', 2, 1, 0, SINGLE_QUBIT_GATES['x'], "Toffoli gate"),
+    GateSpec('swap', 'swap', 0, 2, 0, None, "SWAP gate between qubits {q[0]} and {q[1]}"),
+    GateSpec('measure', 'measure', 0, 1, 0, None, "Measure qubit {q[0]}"),
+)
+
+OPCODES = {spec.name: opcode for opcode, spec in enumerate(GATE_REGISTRY)}
+
+# Gates only the optimizer may emit
+INTERNAL_GATES = frozenset(['unitary'])
+
+MAX_GATE_QUBITS = 3
+
+# One row per operation; unused qubit slots hold -1. Rotations whose theta
+# is a parameter name store the index of that name in `symbol` (else -1).
+# Classically conditioned operations only act when classical bit `clbit`
+# reads `value`; unconditional ones have clbit -1.
+IR_DTYPE = np.dtype([
+    ('opcode', np.uint8),
+    ('qubits', np.int32, (MAX_GATE_QUBITS,)),
+    ('param', np.float64),
+    ('symbol', np.int16),
+    ('clbit', np.int32),
+    ('value', np.uint8),
+])
+
+# Compiled circuits are kept by raw circuit hash so resubmitting a large
+# generated circuit skips parsing and validation
+IR_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CompiledCircuit:
+    """
+    Compiled form of a circuit definition.
+    
+    Every row of `ops` is a single operation: multi-target gates are
+    expanded, aliases resolved and qubit indices validated. Controls come
+    first in the qubit slots, then targets. Rotation angles given as a name
+    (e.g. "theta": "phi") are symbolic parameters, listed in `parameters`;
+    such circuits can only be evaluated by a parameter sweep.
+    
+    The classical register has one bit per qubit: measuring qubit q writes
+    bit q, and a gate with "c_if": {"clbit": c, "value": v} only acts when
+    bit c currently reads v (bits read 0 until they are measured).
+    """
+    
+    def __init__(self, num_qubits, ops, matrices=None, parameters=()):
+        """
+        Initialize a compiled circuit.
+        
+        Args:
+            num_qubits (int): Number of qubits
+            ops (np.ndarray): Operations with dtype IR_DTYPE
+            matrices (np.ndarray): (k, 2, 2) matrices of 'unitary' operations
+            parameters (tuple): Names of the symbolic parameters
+        """
+        self.num_qubits = num_qubits
+        self.ops = ops
+        self.matrices = np.zeros((0, 2, 2), dtype=complex) if matrices is None else matrices
+        self.parameters = tuple(parameters)
+        self._digest = None
+    
+    def __len__(self):
+        return len(self.ops)
+    
+    @property
+    def nbytes(self):
+        """Memory held by the arrays (used by the IR cache accounting)."""
+        return self.ops.nbytes + self.matrices.nbytes
+    
+    @property
+    def digest(self):
+        """Hex SHA-256 of the IR; equal for circuits that simulate identically."""
+        if self._digest is None:
+            sha = hashlib.sha256(np.int64(self.num_qubits).tobytes())
+            sha.update(self.ops.tobytes())
+            sha.update(np.ascontiguousarray(self.matrices).tobytes())
+            sha.update(json.dumps(self.parameters).encode('utf-8'))
+            self._digest = sha.hexdigest()
+        return self._digest
+    
+    def operations(self, symbolic=False):
+        """
+        Iterate over the operations.
+        
+        Args:
+            symbolic (bool): Also yield the parameter name of each operation
+                (None for fixed angles); required for symbolic circuits
+        
+        Yields:
+            tuple: (GateSpec, tuple of qubits, parameter[, parameter name])
+        
+        Raises:
+            ValueError: If the circuit has symbolic parameters and `symbolic` is False
+        """
+        if self.parameters and not symbolic:
+            raise ValueError(f"Circuit has unbound parameters: {', '.join(self.parameters)}")
+        
+        columns = (self.ops['opcode'].tolist(), self.ops['qubits'].tolist(), self.ops['param'].tolist(), self.ops['symbol'].tolist())
+        for opcode, qubits, param, symbol in zip(*columns):
+            spec = GATE_REGISTRY[opcode]
+            qubits = tuple(qubits[:spec.num_controls + spec.num_targets])
+            if symbolic:
+                yield spec, qubits, param, self.parameters[symbol] if symbol >= 0 else None
+            else:
+                yield spec, qubits, param
+    
+    def matrix(self, spec, param):
+        """
+        Get the 2x2 matrix of a 'single' operation.
+        
+        Args:
+            spec (GateSpec): Gate of the operation
+            param (float): Operation parameter
+        
+        Returns:
+            np.ndarray: 2x2 complex unitary
+        """
+        if spec.matrix is not None:
+            return spec.matrix
+        if spec.name == 'unitary':
+            return self.matrices[int(param)]
+        return rotation_matrix(spec.name, param)
+    
+    def gate_names(self):
+        """Set of gate names used by the circuit."""
+        return {GATE_REGISTRY[opcode].name for opcode in np.unique(self.ops['opcode']).tolist()}
+    
+    @property
+    def measured_qubits(self):
+        """Measured qubits in order of first measurement."""
+        measures = self.ops['qubits'][self.ops['opcode'] == OPCODES['measure'], 0]
+        _, first = np.unique(measures, return_index=True)
+        return measures[np.sort(first)].tolist()
+    
+    def conditions(self):
+        """
+        Classical condition of every operation, in order.
+        
+        Returns:
+            list: (clbit, value) per operation, or None for unconditional ones
+        """
+        return [(clbit, value) if clbit >= 0 else None
+                for clbit, value in zip(self.ops['clbit'].tolist(), self.ops['value'].tolist())]
+    
+    @property
+    def has_conditions(self):
+        """Whether any operation is classically conditioned."""
+        return bool((self.ops['clbit'] >= 0).any())
+    
+    @property
+    def is_dynamic(self):
+        """
+        Whether measurement outcomes are needed before the end of the circuit:
+        there is mid-circuit measurement or a classically conditioned gate.
+        Only the branching NumPy engine and Aer simulate such circuits.
+        """
+        return self.has_conditions or self.has_mid_circuit_measurement
+    
+    @property
+    def has_mid_circuit_measurement(self):
+        """Whether any gate acts on a qubit after it has been measured."""
+        is_measure = self.ops['opcode'] == OPCODES['measure']
+        positions = np.arange(len(self.ops))
+        first_measure = np.full(self.num_qubits, len(self.ops))
+        np.minimum.at(first_measure, self.ops['qubits'][is_measure, 0], positions[is_measure])
+        
+        qubits = self.ops['qubits']
+        measured_at = np.where(qubits >= 0, first_measure[np.maximum(qubits, 0)], len(self.ops))
+        return bool(((measured_at.min(axis=1) < positions) & ~is_measure).any())
+
+
+def build_circuit(num_qubits, operations):
+    """
+    Build a CompiledCircuit from (name, qubits, param) triples.
+    
+    For 'unitary' operations the parameter is the 2x2 matrix itself; a
+    string parameter of a rotation is a symbolic parameter name. An
+    operation may carry a fourth element, its (clbit, value) condition.
+    
+    Args:
+        num_qubits (int): Number of qubits
+        operations (iterable): Triples of gate name, qubit tuple and
+            parameter, optionally followed by a condition
+    
+    Returns:
+        CompiledCircuit: Compiled circuit
+    """
+    rows = []
+    matrices = []
+    parameters = {}
+    padding = (-1,) * MAX_GATE_QUBITS
+    for operation in operations:
+        name, qubits, param = operation[:3]
+        condition = operation[3] if len(operation) > 3 and operation[3] is not None else (-1, 0)
+        symbol = -1
+        if name == 'unitary':
+            matrices.append(param)
+            param = len(matrices) - 1
+        elif isinstance(param, str):
+            symbol = parameters.setdefault(param, len(parameters))
+            param = 0.0
+        rows.append((OPCODES[name], (tuple(qubits) + padding)[:MAX_GATE_QUBITS], param, symbol) + tuple(condition))
+    
+    ops = np.array(rows, dtype=IR_DTYPE)
+    return CompiledCircuit(num_qubits, ops, np.array(matrices, dtype=complex).reshape(-1, 2, 2), parameters)
+
+
+def _check_qubits(qubits, num_qubits):
+    """Validate qubit indices against the register size."""
+    for qubit in qubits:
+        if isinstance(qubit, bool) or not isinstance(qubit, int) or not 0 <= qubit < num_qubits:
+            raise ValueError(f"Qubit index {qubit} out of range for a {num_qubits}-qubit circuit")
+
+
+def _parse_condition(gate, num_qubits):
+    """
+    Read the optional "c_if" condition of a JSON gate.
+    
+    Args:
+        gate (dict): Gate definition
+        num_qubits (int): Number of qubits (and classical bits)
+    
+    Returns:
+        tuple: (clbit, value), or None for an unconditional gate
+    """
+    condition = gate.get('c_if')
+    if condition is None:
+        return None
+    if not isinstance(condition, dict) or 'clbit' not in condition:
+        raise ValueError('Gate conditions must look like {"clbit": 0, "value": 1}')
+    clbit = condition['clbit']
+    if isinstance(clbit, bool) or not isinstance(clbit, int) or not 0 <= clbit < num_qubits:
+        raise ValueError(f"Classical bit {clbit} out of range for a {num_qubits}-bit register")
+    value = condition.get('value', 1)
+    if value not in (0, 1) or isinstance(value, bool):
+        raise ValueError(f"Condition value must be 0 or 1, got {value!r}")
+    return clbit, value
+
+
+def _expand_gate(gate, num_qubits):
+    """
+    Turn one JSON gate into (name, qubits, param, condition) operations.
+    
+    Args:
+        gate (dict): Gate definition
+        num_qubits (int): Number of qubits
+    
+    Returns:
+        list: Operations of the gate
+    """
+    gate_type = gate.get('type', '').lower()
+    gate_type = GATE_ALIASES.get(gate_type, gate_type)
+    spec = GATE_REGISTRY[OPCODES[gate_type]] if gate_type in OPCODES and gate_type not in INTERNAL_GATES else None
+    if spec is None:
+        raise ValueError(f"Unknown gate type '{gate.get('type')}'")
+    
+    targets = list(gate.get('targets', []))
+    controls = list(gate.get('controls', []))
+    _check_qubits(targets + controls, num_qubits)
+    condition = _parse_condition(gate, num_qubits)
+    if condition is not None and spec.kind == 'measure':
+        raise ValueError("Measurements cannot be classically conditioned")
+    
+    param = 0.0
+    if spec.num_params:
+        theta = gate.get('theta', 0)
+        if isinstance(theta, str) and theta:
+            # Symbolic parameter, bound by /api/sweep
+            param = theta
+        else:
+            try:
+                param = float(theta)
+            except (TypeError, ValueError):
+                raise ValueError(f"Gate '{gate_type}' needs a numeric theta or a parameter name")
+    
+    if spec.kind in ('single', 'measure'):
+        return [(gate_type, (target,), param, condition) for target in targets]
+    
+    if spec.kind == 'swap':
+        if len(targets) < 2:
+            raise ValueError("SWAP gates need two targets")
+        if targets[0] == targets[1]:
+            raise ValueError("SWAP targets must be distinct")
+        return [(gate_type, tuple(targets[:2]), param, condition)]
+    
+    if len(controls) < spec.num_controls:
+        raise ValueError(f"Gate '{gate_type}' needs {spec.num_controls} control qubit(s)")
+    if spec.num_controls == 1:
+        control_sets = [(control,) for control in controls]
+    else:
+        control_sets = [tuple(controls[:spec.num_controls])]
+    
+    operations = []
+    for control_set in control_sets:
+        for target in targets:
+            if target in control_set or len(set(control_set)) != len(control_set):
+                raise ValueError("Control and target qubits of a gate must be distinct")
+            operations.append((gate_type, control_set + (target,), param, condition))
+    return operations
+
+
+def circuit_hash(circuit_def):
+    """
+    Hash a raw circuit definition (used to look up compiled circuits).
+    
+    Args:
+        circuit_def (dict): Circuit definition
+    
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    encoded = json.dumps([circuit_def.get('qubits', 1), circuit_def.get('gates', [])],
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+_ir_cache = ResultCache(max_bytes=IR_CACHE_MAX_BYTES)
+
+
+def compile_circuit(circuit_def):
+    """
+    Compile and validate a circuit definition, reusing cached IR.
+    
+    Args:
+        circuit_def (dict or CompiledCircuit): Circuit definition; an already
+            compiled circuit is returned unchanged
+    
+    Returns:
+        CompiledCircuit: Compiled circuit
+    
+    Raises:
+        ValueError: If the definition contains an unknown or malformed gate
+    """
+    if isinstance(circuit_def, CompiledCircuit):
+        return circuit_def
+    
+    key = circuit_hash(circuit_def)
+    compiled = _ir_cache.get(key)
+    if compiled is None:
+        num_qubits = circuit_def.get('qubits', 1)
+        if isinstance(num_qubits, bool) or not isinstance(num_qubits, int) or num_qubits < 1:
+            raise ValueError(f"Invalid number of qubits: {num_qubits}")
+        
+        operations = []
+        for gate in circuit_def.get('gates', []):
+            operations.extend(_expand_gate(gate, num_qubits))
+        compiled = build_circuit(num_qubits, operations)
+        _ir_cache.put(key, compiled)
+    return compiled
+
+
+def ir_cache_stats():
+    """Counters of the compiled-circuit cache."""
+    return _ir_cache.stats()
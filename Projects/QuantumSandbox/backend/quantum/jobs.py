@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Job queue module for QuantumSandbox.
+Runs long simulations in background worker threads so that a large circuit
+does not hold a request thread until it finishes. Clients poll the job for
+its progress and result. Jobs and their results live in the memory of the
+server process and expire a while after they finish.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Queue lanes, in the order workers look at them
+LANES = ('small', 'large')
+
+
+class JobCancelled(Exception):
+    """Raised from a job's progress hook to abort a cancelled job."""
+
+
+class Job:
+    """
+    State of one queued simulation.
+    """
+    
+    def __init__(self, task, lane, shots, metadata=None):
+        """
+        Initialize a queued job.
+        
+        Args:
+            task (callable): task(progress) -> result, run by a worker
+            lane (str): Queue lane ('small' or 'large')
+            shots (int): Number of shots, for progress reporting
+            metadata (dict): Extra fields reported with the job status
+        """
+        self.id = uuid.uuid4().hex
+        self.task = task
+        self.lane = lane
+        self.metadata = metadata or {}
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {"gates_applied": 0, "gates_total": None, "shots_done": 0, "shots_total": shots}
+        self.cancel_event = threading.Event()
+    
+    def report(self, stage, done, total):
+        """
+        Progress hook passed to the simulator.
+        
+        Args:
+            stage (str): 'gates' or 'shots'
+            done (int): Units completed
+            total (int): Total units
+        
+        Raises:
+            JobCancelled: If the job was cancelled while running
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        if stage == 'gates':
+            self.progress.update(gates_applied=done, gates_total=total)
+        elif stage == 'shots':
+            self.progress.update(shots_done=done, shots_total=total)
+    
+    def to_dict(self):
+        """
+        Describe the job for the status endpoint (without its result).
+        
+        Returns:
+            dict: Job id, status, lane, progress, error, timestamps and metadata
+        """
+        return {
+            **self.metadata,
+            "job_id": self.id,
+            "status": self.status,
+            "lane": self.lane,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobQueue:
+    """
+    Class for running simulation jobs in a pool of worker threads.
+    
+    Jobs are queued in two lanes. Small circuits go into the 'small' lane,
+    which every worker serves first, and one worker only serves that lane,
+    so quick jobs never wait behind a long-running one. NumPy releases the
+    GIL inside its array kernels, so threads run large statevectors in
+    parallel. Jobs are kept in memory: with several server processes,
+    clients must reach the process that created the job.
+    """
+    
+    # Circuits with at most this many amplitude updates (2^n per gate) are small
+    SMALL_JOB_WORK = 2 ** 24
+    
+    def __init__(self, max_workers=None, result_ttl=None, max_jobs=1000):
+        """
+        Initialize the queue. Worker threads are started on first use.
+        
+        Args:
+            max_workers (int): Number of worker threads (defaults to the
+                JOB_WORKERS environment variable, or 2)
+            result_ttl (float): Seconds a finished job is kept (defaults to
+                the JOB_RESULT_TTL environment variable, or 3600)
+            max_jobs (int): Maximum number of queued and finished jobs kept
+        """
+        self.max_workers = max(2, max_workers or int(os.environ.get('JOB_WORKERS', 2)))
+        self.result_ttl = result_ttl or float(os.environ.get('JOB_RESULT_TTL', 3600))
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lanes = {lane: deque() for lane in LANES}
+        self._condition = threading.Condition()
+        self._workers = []
+    
+    def lane_for(self, num_qubits, num_gates):
+        """
+        Pick the queue lane of a circuit.
+        
+        Args:
+            num_qubits (int): Number of qubits
+            num_gates (int): Number of operations
+        
+        Returns:
+            str: 'small' or 'large'
+        """
+        return 'small' if (2 ** num_qubits) * max(num_gates, 1) <= self.SMALL_JOB_WORK else 'large'
+    
+    def _start_workers(self):
+        """Start the worker threads if they are not running yet."""
+        if self._workers:
+            return
+        # The first worker is reserved for the small lane
+        for index in range(self.max_workers):
+            lanes = LANES[:1] if index == 0 else LANES
+            worker = threading.Thread(target=self._work, args=(lanes,), name=f'job-worker-{index}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    def submit(self, task, lane='small', shots=0, **metadata):
+        """
+        Queue a job.
+        
+        Args:
+            task (callable): task(progress) -> result; progress is the
+                job's report hook and raises JobCancelled once cancelled
+            lane (str): Queue lane (see lane_for)
+            shots (int): Number of shots, for progress reporting
+            **metadata: Extra fields reported with the job status
+        
+        Returns:
+            Job: The queued job
+        """
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown job lane '{lane}', expected one of {', '.join(LANES)}")
+        
+        job = Job(task, lane, shots, metadata)
+        with self._condition:
+            self._evict_expired()
+            if len(self._jobs) >= self.max_jobs:
+                raise RuntimeError("Too many jobs, try again later")
+            self._jobs[job.id] = job
+            self._lanes[lane].append(job)
+            self._start_workers()
+            self._condition.notify_all()
+        return job
+    
+    def get(self, job_id):
+        """
+        Look up a job.
+        
+        Args:
+            job_id (str): Job id
+        
+        Returns:
+            Job: The job, or None if it is unknown or expired
+        """
+        with self._condition:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job, or delete a finished one.
+        
+        A running job stops at its next progress report.
+        
+        Args:
+            job_id (str): Job id
+        
+        Returns:
+            Job: The job, or None if it is unknown or expired
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == QUEUED:
+                self._lanes[job.lane].remove(job)
+                self._finish(job, CANCELLED)
+            elif job.status == RUNNING:
+                job.cancel_event.set()
+            else:
+                del self._jobs[job_id]
+            return job
+    
+    def stats(self):
+        """
+        Get the number of jobs per lane and state.
+        
+        Returns:
+            dict: Queue lengths and job counts by status
+        """
+        with self._condition:
+            self._evict_expired()
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            return {
+                "workers": self.max_workers,
+                "queued": {lane: len(queue) for lane, queue in self._lanes.items()},
+                "jobs": statuses
+            }
+    
+    def _evict_expired(self):
+        """Drop finished jobs older than the result TTL (caller holds the lock)."""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.status in FINISHED_STATES and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def _finish(self, job, status, result=None, error=None):
+        """Record the outcome of a job (caller holds the lock)."""
+        job.status = status
+        job.result = result
+        job.error = error
+        job.task = None
+        job.finished_at = time.time()
+    
+    def _next_job(self, lanes):
+        """Wait for the next queued job in the given lanes."""
+        with self._condition:
+            while True:
+                for lane in lanes:
+                    if self._lanes[lane]:
+                        job = self._lanes[lane].popleft()
+                        job.status = RUNNING
+                        job.started_at = time.time()
+                        return job
+                self._condition.wait()
+    
+    def _work(self, lanes):
+        """Worker loop: run queued jobs one after another."""
+        while True:
+            job = self._next_job(lanes)
+            try:
+                result = job.task(job.report)
+                outcome = (DONE, result, None)
+            except JobCancelled:
+                outcome = (CANCELLED, None, None)
+            except Exception as e:
+                outcome = (FAILED, None, str(e))
+            
+            with self._condition:
+                self._finish(job, *outcome)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Matrix-product-state simulation module for QuantumSandbox.
+Simulates low-entanglement circuits on 50-100+ qubits by keeping the state
+as a chain of tensors whose bond dimension is capped and truncated by SVD.
+"""
+
+import numpy as np
+
+from .gates import SINGLE_QUBIT_GATES
+from .ir import GATE_REGISTRY, OPCODES
+from .sampling import count_outcomes
+
+_X = SINGLE_QUBIT_GATES['x']
+_Z = SINGLE_QUBIT_GATES['z']
+_P0 = np.diag([1, 0]).astype(complex)
+_P1 = np.diag([0, 1]).astype(complex)
+_SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex)
+
+# Toffoli as one- and two-qubit gates, with (a, b) the controls and c the target
+_TOFFOLI_DECOMPOSITION = [
+    ('h', 'c'), ('cx', 'b', 'c'), ('tdg', 'c'), ('cx', 'a', 'c'), ('t', 'c'),
+    ('cx', 'b', 'c'), ('tdg', 'c'), ('cx', 'a', 'c'), ('t', 'b'), ('t', 'c'),
+    ('h', 'c'), ('cx', 'a', 'b'), ('t', 'a'), ('tdg', 'b'), ('cx', 'a', 'b'),
+]
+
+
+# log2 of the factor by which a gate can grow the bond dimension of a cut it spans
+_CUT_WEIGHTS = np.zeros(len(GATE_REGISTRY), dtype=np.int64)
+_CUT_WEIGHTS[[OPCODES['cx'], OPCODES['cz']]] = 1
+_CUT_WEIGHTS[[OPCODES['ccx'], OPCODES['swap']]] = 2
+
+
+def _controlled(matrix):
+    """4x4 matrix of a controlled gate in the (control, target) basis."""
+    return np.kron(_P0, np.eye(2)) + np.kron(_P1, matrix)
+
+
+def estimate_bond_dimensions(compiled):
+    """
+    Upper-bound the bond dimension needed to simulate a circuit exactly.
+    
+    Each two-qubit gate can at most double (swap: quadruple) the bond
+    dimension of every cut it spans on the qubit line, and no cut needs more
+    than 2^min(left, right) states.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+    
+    Returns:
+        np.ndarray: log2 of the bound for each of the n-1 cuts
+    """
+    num_qubits = compiled.num_qubits
+    weights = _CUT_WEIGHTS[compiled.ops['opcode']]
+    qubits = compiled.ops['qubits'][weights > 0]
+    weights = weights[weights > 0]
+    
+    # A gate on qubits lo..hi crosses cuts lo+1..hi
+    crossings = np.zeros(num_qubits + 1, dtype=np.int64)
+    np.add.at(crossings, np.where(qubits >= 0, qubits, num_qubits).min(axis=1) + 1, weights)
+    np.add.at(crossings, qubits.max(axis=1) + 1, -weights)
+    
+    crossings = np.cumsum(crossings)[1:num_qubits]
+    cuts = np.arange(1, num_qubits)
+    return np.minimum(crossings, np.minimum(cuts, num_qubits - cuts))
+
+
+class MatrixProductState:
+    """
+    Matrix product state with an orthogonality center.
+    
+    Site k holds qubit k as a tensor of shape (left bond, 2, right bond).
+    Sites left of the center are left-canonical and sites right of it
+    right-canonical, so two-site SVD truncations are optimal and the
+    discarded weight is a faithful error estimate.
+    """
+    
+    def __init__(self, num_qubits, max_bond_dimension=64, truncation_threshold=1e-12):
+        """
+        Initialize |0...0>.
+        
+        Args:
+            num_qubits (int): Number of qubits
+            max_bond_dimension (int): Largest bond dimension kept after an SVD
+            truncation_threshold (float): Discarded weight allowed per SVD
+        """
+        self.num_qubits = num_qubits
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_threshold = truncation_threshold
+        self.tensors = [np.array([1, 0], dtype=complex).reshape(1, 2, 1) for _ in range(num_qubits)]
+        self.center = 0
+        self.truncation_error = 0.0
+    
+    @property
+    def bond_dimensions(self):
+        """Bond dimension of every cut between neighbouring qubits."""
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+    
+    def move_center(self, site):
+        """
+        Move the orthogonality center with QR decompositions.
+        
+        Args:
+            site (int): New center site
+        """
+        while self.center < site:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left * 2, right))
+            self.tensors[self.center] = q.reshape(left, 2, q.shape[1])
+            self.tensors[self.center + 1] = np.einsum('ab,bpc->apc', r, self.tensors[self.center + 1])
+            self.center += 1
+        
+        while self.center > site:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left, 2 * right).T)
+            self.tensors[self.center] = q.T.reshape(q.shape[1], 2, right)
+            self.tensors[self.center - 1] = np.einsum('apb,bc->apc', self.tensors[self.center - 1], r.T)
+            self.center -= 1
+    
+    def apply_single(self, matrix, qubit):
+        """Apply a 2x2 unitary to one qubit."""
+        self.tensors[qubit] = np.einsum('pq,aqb->apb', matrix, self.tensors[qubit])
+    
+    def _apply_adjacent(self, matrix, site):
+        """Apply a 4x4 unitary, in the (site, site + 1) basis, to two neighbouring sites."""
+        self.move_center(site)
+        theta = np.einsum('apb,bqc->apqc', self.tensors[site], self.tensors[site + 1])
+        theta = np.einsum('pqrs,arsc->apqc', matrix.reshape(2, 2, 2, 2), theta)
+        left, _, _, right = theta.shape
+        
+        u, singular_values, vh = np.linalg.svd(theta.reshape(left * 2, 2 * right), full_matrices=False)
+        
+        # Drop the smallest singular values while their weight stays under the threshold
+        weights = singular_values ** 2
+        weights /= weights.sum()
+        tail = np.cumsum(weights[::-1])[::-1]
+        keep = max(1, int(np.count_nonzero(tail > self.truncation_threshold)))
+        keep = min(keep, self.max_bond_dimension)
+        self.truncation_error += float(weights[keep:].sum())
+        
+        kept = singular_values[:keep] / np.linalg.norm(singular_values[:keep])
+        self.tensors[site] = u[:, :keep].reshape(left, 2, keep)
+        self.tensors[site + 1] = (kept[:, None] * vh[:keep]).reshape(keep, 2, right)
+        self.center = site + 1
+    
+    def apply_two_qubit(self, matrix, first, second):
+        """
+        Apply a 4x4 unitary, in the (first, second) basis, to any two qubits.
+        
+        Distant qubits are brought next to each other with a chain of
+        neighbouring SWAPs, which are undone afterwards.
+        
+        Args:
+            matrix (np.ndarray): 4x4 unitary
+            first (int): Qubit of the most significant basis index
+            second (int): Qubit of the least significant basis index
+        """
+        if first > second:
+            first, second = second, first
+            matrix = _SWAP @ matrix @ _SWAP
+        
+        path = list(range(second - 1, first, -1))
+        for site in path:
+            self._apply_adjacent(_SWAP, site)
+        self._apply_adjacent(matrix, first)
+        for site in reversed(path):
+            self._apply_adjacent(_SWAP, site)
+    
+    def apply_operation(self, spec, qubits, matrix):
+        """
+        Apply one compiled operation.
+        
+        Args:
+            spec (GateSpec): Gate of the operation
+            qubits (tuple): Controls followed by targets
+            matrix (np.ndarray): 2x2 matrix of 'single' operations, else None
+        """
+        if spec.kind == 'single':
+            self.apply_single(matrix, qubits[0])
+        
+        elif spec.name == 'ccx':
+            named = {'a': qubits[0], 'b': qubits[1], 'c': qubits[2]}
+            for step in _TOFFOLI_DECOMPOSITION:
+                if step[0] == 'cx':
+                    self.apply_two_qubit(_controlled(_X), named[step[1]], named[step[2]])
+                else:
+                    self.apply_single(SINGLE_QUBIT_GATES[step[0]], named[step[1]])
+        
+        elif spec.kind == 'controlled':
+            self.apply_two_qubit(_controlled(spec.matrix), qubits[0], qubits[1])
+        
+        elif spec.kind == 'swap':
+            self.apply_two_qubit(_SWAP, qubits[0], qubits[1])
+        
+        else:
+            raise ValueError(f"Gate '{spec.name}' is not supported by the MPS engine")
+    
+    def sample(self, shots, rng):
+        """
+        Draw measurement outcomes of every qubit, vectorized over shots.
+        
+        With the center on site 0 all other sites are right-canonical, so
+        qubits can be sampled left to right from local norms while carrying
+        one left environment vector per shot.
+        
+        Args:
+            shots (int): Number of shots
+            rng (np.random.Generator): Random generator
+        
+        Returns:
+            np.ndarray: Bool array of shape (shots, n); column q is qubit q
+        """
+        self.move_center(0)
+        outcomes = np.zeros((shots, self.num_qubits), dtype=bool)
+        environment = np.ones((shots, 1), dtype=complex)
+        rows = np.arange(shots)
+        
+        for site, tensor in enumerate(self.tensors):
+            branches = np.einsum('sa,apb->spb', environment, tensor)
+            weights = np.sum(np.abs(branches) ** 2, axis=2)
+            probability_one = weights[:, 1] / weights.sum(axis=1)
+            outcomes[:, site] = rng.random(shots) < probability_one
+            environment = branches[rows, outcomes[:, site].astype(int)]
+            environment /= np.linalg.norm(environment, axis=1, keepdims=True)
+        
+        return outcomes
+    
+    def local_expectations(self):
+        """
+        Get marginal probabilities and Bloch vectors of every qubit.
+        
+        The center is swept across the chain; at each site the reduced
+        density matrix is the contraction of the center tensor with itself.
+        
+        Returns:
+            tuple: (P(qubit = 1) as array of length n, Bloch vectors (3, n))
+        """
+        marginals = np.zeros(self.num_qubits)
+        bloch = np.zeros((3, self.num_qubits))
+        
+        self.move_center(0)
+        for site in range(self.num_qubits):
+            self.move_center(site)
+            tensor = self.tensors[site]
+            rho = np.einsum('apb,aqb->pq', tensor, tensor.conj())
+            rho /= np.trace(rho).real
+            marginals[site] = rho[1, 1].real
+            bloch[:, site] = (2 * rho[0, 1].real, -2 * rho[0, 1].imag, (rho[0, 0] - rho[1, 1]).real)
+        
+        return marginals, bloch
+
+
+class MPSSimulator:
+    """
+    Class for simulating circuits with a matrix product state.
+    """
+    
+    DEFAULT_MAX_BOND_DIMENSION = 64
+    DEFAULT_TRUNCATION_THRESHOLD = 1e-12
+    
+    def run(self, compiled, max_bond_dimension=None, truncation_threshold=None):
+        """
+        Compute the final matrix product state of a circuit.
+        
+        Measurements must be terminal and are not applied to the state.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            max_bond_dimension (int): Bond dimension cap (default 64)
+            truncation_threshold (float): Discarded weight allowed per SVD
+        
+        Returns:
+            tuple: (MatrixProductState, list of measured qubits)
+        """
+        if compiled.is_dynamic:
+            raise ValueError("Mid-circuit measurement and conditional gates are not supported by the MPS engine")
+        
+        state = MatrixProductState(
+            compiled.num_qubits,
+            max_bond_dimension=max_bond_dimension or self.DEFAULT_MAX_BOND_DIMENSION,
+            truncation_threshold=self.DEFAULT_TRUNCATION_THRESHOLD if truncation_threshold is None else truncation_threshold
+        )
+        for spec, qubits, param in compiled.operations():
+            if spec.kind != 'measure':
+                state.apply_operation(spec, qubits, compiled.matrix(spec, param) if spec.kind == 'single' else None)
+        
+        return state, compiled.measured_qubits
+    
+    def simulate(self, compiled, shots, seed=None, max_bond_dimension=None, truncation_threshold=None):
+        """
+        Simulate a circuit and collect counts and per-qubit data.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            shots (int): Number of shots
+            seed (int): Optional seed for the random generator
+            max_bond_dimension (int): Bond dimension cap
+            truncation_threshold (float): Discarded weight allowed per SVD
+        
+        Returns:
+            dict: counts, marginal probabilities, Bloch vectors and MPS metadata
+        """
+        state, measured = self.run(compiled, max_bond_dimension, truncation_threshold)
+        rng = np.random.default_rng(seed)
+        
+        outcomes = state.sample(shots, rng)
+        counts = count_outcomes(outcomes, measured or range(state.num_qubits))
+        marginals, bloch = state.local_expectations()
+        
+        return {
+            "counts": counts,
+            "marginal_probabilities": marginals,
+            "bloch_vectors": bloch,
+            "mps": {
+                "max_bond_dimension": state.max_bond_dimension,
+                "bond_dimensions": state.bond_dimensions,
+                "truncation_error": state.truncation_error
+            }
+        }
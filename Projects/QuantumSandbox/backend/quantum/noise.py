@@ -0,0 +1,470 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Noise model module for QuantumSandbox.
+Simulates circuits under depolarizing, amplitude-damping and readout
+errors, given by a "noise" section of the circuit definition. Small
+registers are simulated exactly as a density matrix; larger ones as
+Monte-Carlo wavefunction trajectories, which the simulation process pool
+runs in parallel.
+"""
+
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from .gates import GATE_ALIASES
+from .ir import GATE_REGISTRY, OPCODES
+from .sampling import counts_from_draws
+
+METHODS = ('auto', 'density_matrix', 'trajectories')
+
+# 'auto' simulates up to this many qubits as a density matrix (4^n entries)
+DENSITY_MATRIX_MAX_QUBITS = 10
+
+# Largest density matrix simulated at all (4^12 entries = 256 MiB in complex128)
+DENSITY_MATRIX_LIMIT_QUBITS = 12
+
+DEFAULT_TRAJECTORIES = 500
+MAX_TRAJECTORIES = 100000
+
+# Operation under which Kraus operators are applied to a state
+_UNITARY_SPEC = GATE_REGISTRY[OPCODES['unitary']]
+
+
+def depolarizing_kraus(probability):
+    """
+    Kraus operators of the single-qubit depolarizing channel.
+    
+    rho -> (1 - p) rho + p I / 2, i.e. X, Y and Z errors with probability p / 4 each.
+    
+    Args:
+        probability (float): Depolarizing probability p
+    
+    Returns:
+        np.ndarray: (4, 2, 2) Kraus operators
+    """
+    paulis = np.array([[[1, 0], [0, 1]], [[0, 1], [1, 0]], [[0, -1j], [1j, 0]], [[1, 0], [0, -1]]], dtype=complex)
+    weights = np.sqrt([1 - 3 * probability / 4] + [probability / 4] * 3)
+    return weights[:, None, None] * paulis
+
+
+def amplitude_damping_kraus(probability):
+    """
+    Kraus operators of the amplitude-damping channel (energy relaxation |1> -> |0>).
+    
+    Args:
+        probability (float): Damping probability gamma
+    
+    Returns:
+        np.ndarray: (2, 2, 2) Kraus operators
+    """
+    return np.array([
+        [[1, 0], [0, np.sqrt(1 - probability)]],
+        [[0, np.sqrt(probability)], [0, 0]]
+    ], dtype=complex)
+
+
+# Gate channels of the noise schema
+CHANNELS = {
+    'depolarizing': depolarizing_kraus,
+    'amplitude_damping': amplitude_damping_kraus,
+}
+
+
+def _probability(value, name):
+    """Validate a probability of the noise schema."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+        raise ValueError(f"Noise parameter '{name}' must be a probability between 0 and 1")
+    return float(value)
+
+
+class NoiseModel:
+    """
+    Gate and readout noise of a circuit.
+    
+    Schema of the "noise" section of a circuit definition:
+    
+        "noise": {
+            "depolarizing": 0.01,                                  # after every gate
+            "amplitude_damping": {"probability": 0.02, "gates": ["cx"]},
+            "readout_error": {"p1_given_0": 0.02, "p0_given_1": 0.05},  # or one symmetric probability
+            "method": "auto",          # "density_matrix", "trajectories" or "auto"
+            "trajectories": 500        # trajectories of the Monte-Carlo method
+        }
+    
+    Gate channels act independently on every qubit of each gate they apply
+    to (all gates unless "gates" is given), right after the gate.
+    Measurements are not followed by gate noise; readout errors flip the
+    recorded bits instead.
+    """
+    
+    def __init__(self, channels=(), readout=None, method='auto', trajectories=None):
+        """
+        Initialize a noise model.
+        
+        Args:
+            channels (list): (channel name, (k, 2, 2) Kraus operators,
+                frozenset of gate names or None for every gate)
+            readout (np.ndarray): 2x2 readout confusion matrix
+                P(read r | value v) at [r, v], or None
+            method (str): 'auto', 'density_matrix' or 'trajectories'
+            trajectories (int): Number of Monte-Carlo trajectories
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown noise method '{method}', expected one of {', '.join(METHODS)}")
+        self.channels = list(channels)
+        self.readout = readout
+        self.method = method
+        self.trajectories = trajectories or DEFAULT_TRAJECTORIES
+        if not 1 <= self.trajectories <= MAX_TRAJECTORIES:
+            raise ValueError(f"Number of trajectories must be between 1 and {MAX_TRAJECTORIES}")
+    
+    @classmethod
+    def from_dict(cls, spec):
+        """
+        Build a noise model from the "noise" section of a circuit definition.
+        
+        Args:
+            spec (dict): Noise section (see the class docstring), or None
+        
+        Returns:
+            NoiseModel: The model, or None for a missing or empty section
+        """
+        if not spec:
+            return None
+        if not isinstance(spec, dict):
+            raise ValueError("Noise model must be an object")
+        unknown = set(spec) - set(CHANNELS) - {'readout_error', 'method', 'trajectories'}
+        if unknown:
+            raise ValueError(f"Unknown noise options: {', '.join(sorted(unknown))}")
+        
+        channels = []
+        for name, kraus in CHANNELS.items():
+            if name not in spec:
+                continue
+            options = spec[name] if isinstance(spec[name], dict) else {"probability": spec[name]}
+            gates = None
+            if options.get("gates") is not None:
+                gates = frozenset(GATE_ALIASES.get(gate.lower(), gate.lower()) for gate in options["gates"])
+                if gates - set(OPCODES):
+                    raise ValueError(f"Unknown gates in the {name} noise: {', '.join(sorted(gates - set(OPCODES)))}")
+            channels.append((name, kraus(_probability(options.get("probability"), name)), gates))
+        
+        readout = None
+        if spec.get('readout_error') is not None:
+            error = spec['readout_error']
+            if isinstance(error, dict):
+                flip_up = _probability(error.get('p1_given_0', 0.0), 'p1_given_0')
+                flip_down = _probability(error.get('p0_given_1', 0.0), 'p0_given_1')
+            else:
+                flip_up = flip_down = _probability(error, 'readout_error')
+            readout = np.array([[1 - flip_up, flip_down], [flip_up, 1 - flip_down]])
+        
+        trajectories = spec.get('trajectories')
+        return cls(channels, readout, spec.get('method', 'auto'), int(trajectories) if trajectories else None)
+    
+    def kraus_after(self, gate_name):
+        """
+        Kraus operator sets applied after a gate.
+        
+        Args:
+            gate_name (str): Registry name of the gate
+        
+        Returns:
+            list: (k, 2, 2) arrays, applied in order to each qubit of the gate
+        """
+        if gate_name == 'measure':
+            return []
+        return [kraus for _, kraus, gates in self.channels if gates is None or gate_name in gates]
+    
+    def select_method(self, num_qubits):
+        """
+        Resolve the simulation method for a register size.
+        
+        Args:
+            num_qubits (int): Number of qubits
+        
+        Returns:
+            str: 'density_matrix' or 'trajectories'
+        """
+        if self.method == 'density_matrix' and num_qubits > DENSITY_MATRIX_LIMIT_QUBITS:
+            raise ValueError(f"Density-matrix simulation supports at most {DENSITY_MATRIX_LIMIT_QUBITS} qubits")
+        if self.method != 'auto':
+            return self.method
+        return 'density_matrix' if num_qubits <= DENSITY_MATRIX_MAX_QUBITS else 'trajectories'
+    
+    def apply_readout(self, probabilities, measured_qubits, num_qubits):
+        """
+        Turn basis-state probabilities into probabilities of the recorded bits.
+        
+        Args:
+            probabilities (np.ndarray): Flat probabilities of length 2**n
+            measured_qubits (list): Qubits that are measured
+            num_qubits (int): Number of qubits
+        
+        Returns:
+            np.ndarray: Flat probabilities including readout errors
+        """
+        if self.readout is None:
+            return probabilities
+        tensor = probabilities.reshape((2,) * num_qubits)
+        for qubit in measured_qubits:
+            axis = num_qubits - 1 - qubit
+            tensor = np.moveaxis(np.tensordot(self.readout, tensor, axes=([1], [axis])), 0, axis)
+        return tensor.reshape(-1)
+
+
+def superoperator(kraus):
+    """
+    Superoperator of a single-qubit channel acting on (ket, bra) index pairs.
+    
+    Args:
+        kraus (np.ndarray): (k, 2, 2) Kraus operators
+    
+    Returns:
+        np.ndarray: (2, 2, 2, 2) tensor S[a, b, c, d] = sum_k K[a, c] conj(K[b, d])
+    """
+    return np.einsum('kac,kbd->abcd', kraus, kraus.conj())
+
+
+def density_matrix_bloch_vectors(rho, num_qubits):
+    """
+    Per-qubit Bloch vectors and P(qubit = 1) of a density matrix.
+    
+    Args:
+        rho (np.ndarray): Density matrix of shape (2**n, 2**n)
+        num_qubits (int): Number of qubits
+    
+    Returns:
+        tuple: (Bloch vectors (3, n), marginal probabilities (n,))
+    """
+    bloch = np.zeros((3, num_qubits))
+    for qubit in range(num_qubits):
+        high, low = 2 ** (num_qubits - 1 - qubit), 2 ** qubit
+        reduced = np.einsum('iajibj->ab', rho.reshape(high, 2, low, high, 2, low))
+        bloch[:, qubit] = [2 * reduced[0, 1].real, -2 * reduced[0, 1].imag, (reduced[0, 0] - reduced[1, 1]).real]
+    return bloch, (1 - bloch[2]) / 2
+
+
+def statevector_bloch_vectors(state, num_qubits):
+    """
+    Per-qubit Bloch vectors of a pure state.
+    
+    Args:
+        state (np.ndarray): Normalized flat statevector
+        num_qubits (int): Number of qubits
+    
+    Returns:
+        np.ndarray: Bloch vectors (3, n)
+    """
+    bloch = np.zeros((3, num_qubits))
+    for qubit in range(num_qubits):
+        pairs = state.reshape(-1, 2, 2 ** qubit)
+        coherence = np.vdot(pairs[:, 1], pairs[:, 0])
+        population = np.vdot(pairs[:, 1], pairs[:, 1]).real
+        bloch[:, qubit] = [2 * coherence.real, -2 * coherence.imag, 1 - 2 * population]
+    return bloch
+
+
+class NoisySimulator:
+    """
+    Class for simulating circuits under a noise model.
+    
+    The density-matrix method is exact: rho is stored as a 2n-qubit tensor,
+    gates act as U on the ket and conj(U) on the bra qubits, and channels
+    as 4x4 superoperators on (ket, bra) qubit pairs. The trajectory method
+    samples one Kraus operator per channel application with its Born
+    probability, so every trajectory stays a pure 2^n state; averaging
+    trajectories converges to the density matrix. Trajectories are split
+    into one chunk per worker of the process pool, each with its own
+    SeedSequence child, and the workers' counts are merged.
+    """
+    
+    def __init__(self, engine, pool=None):
+        """
+        Initialize the simulator.
+        
+        Args:
+            engine (NumpyStatevectorEngine): Engine applying gates and Kraus operators
+            pool (SimulationPool): Optional process pool for trajectories
+        """
+        self.engine = engine
+        self.pool = pool
+    
+    def run_density_matrix(self, compiled, noise, progress=None):
+        """
+        Evolve the density matrix of a circuit.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit without mid-circuit measurement or conditions
+            noise (NoiseModel): Noise model
+            progress (callable): Optional progress(stage, done, total) hook
+        
+        Returns:
+            np.ndarray: Density matrix of shape (2**n, 2**n)
+        """
+        num_qubits = compiled.num_qubits
+        rho = np.zeros((2,) * (2 * num_qubits), dtype=complex)
+        rho[(0,) * (2 * num_qubits)] = 1
+        superoperators = {}
+        
+        for index, (spec, qubits, param) in enumerate(compiled.operations()):
+            if spec.kind != 'measure':
+                matrix = compiled.matrix(spec, param) if spec.kind == 'single' else None
+                # Ket qubits are n..2n-1, bra qubits 0..n-1; registry controlled gates are real
+                rho = self.engine.apply_operation(rho, spec, tuple(qubit + num_qubits for qubit in qubits), matrix)
+                rho = self.engine.apply_operation(rho, spec, qubits, None if matrix is None else matrix.conj())
+                if spec.name not in superoperators:
+                    superoperators[spec.name] = [superoperator(kraus) for kraus in noise.kraus_after(spec.name)]
+                for channel in superoperators[spec.name]:
+                    for qubit in qubits:
+                        ket, bra = num_qubits - 1 - qubit, 2 * num_qubits - 1 - qubit
+                        rho = np.moveaxis(np.tensordot(channel, rho, axes=([2, 3], [ket, bra])), (0, 1), (ket, bra))
+            if progress is not None:
+                progress('gates', index + 1, len(compiled))
+        
+        return rho.reshape(2 ** num_qubits, 2 ** num_qubits)
+    
+    def _jump(self, state, kraus, qubit, fixed, rng):
+        """Apply one Kraus operator of a channel, drawn with its Born probability."""
+        if fixed is not None:
+            weights = fixed
+        else:
+            axis = state.ndim - 1 - qubit
+            halves = (np.take(state, 0, axis=axis), np.take(state, 1, axis=axis))
+            overlaps = np.array([[np.vdot(left, right) for right in halves] for left in halves])
+            weights = np.einsum('kba,kbc,ac->k', kraus.conj(), kraus, overlaps).real
+        choice = rng.choice(len(kraus), p=weights / weights.sum())
+        operator = kraus[choice]
+        if operator[0, 1] == 0 and operator[1, 0] == 0 and operator[0, 0] == operator[1, 1]:
+            # A multiple of the identity leaves the normalized state unchanged
+            return state
+        return self.engine.apply_operation(state, _UNITARY_SPEC, (qubit,), operator / np.sqrt(weights[choice]))
+    
+    def run_trajectories(self, compiled, noise, shots_per_trajectory, seed=None, progress=None):
+        """
+        Run Monte-Carlo wavefunction trajectories and sample their shots.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit without mid-circuit measurement or conditions
+            noise (NoiseModel): Noise model
+            shots_per_trajectory (np.ndarray): Shots sampled from each trajectory
+            seed: Seed or np.random.SeedSequence of this chunk
+            progress (callable): Optional progress hook, called after every trajectory
+        
+        Returns:
+            dict: "counts", the number of "trajectories" and the sums of their
+            "bloch_vectors" and "marginal_probabilities"
+        """
+        num_qubits = compiled.num_qubits
+        measured = compiled.measured_qubits or list(range(num_qubits))
+        rng = np.random.default_rng(seed)
+        
+        operations = []
+        for spec, qubits, param in compiled.operations():
+            if spec.kind == 'measure':
+                continue
+            channels = []
+            for kraus in noise.kraus_after(spec.name):
+                # Channels like depolarizing have state-independent Born probabilities
+                products = np.einsum('kba,kbc->kac', kraus.conj(), kraus)
+                fixed = products[:, 0, 0].real if np.allclose(products, products[:, :1, :1] * np.eye(2)) else None
+                channels.append((kraus, fixed))
+            operations.append((spec, qubits, compiled.matrix(spec, param) if spec.kind == 'single' else None, channels))
+        
+        draws = np.zeros(2 ** num_qubits, dtype=np.int64)
+        bloch_sum = np.zeros((3, num_qubits))
+        for trajectory, shots in enumerate(shots_per_trajectory):
+            state = np.zeros((2,) * num_qubits, dtype=complex)
+            state[(0,) * num_qubits] = 1
+            for spec, qubits, matrix, channels in operations:
+                state = self.engine.apply_operation(state, spec, qubits, matrix)
+                for kraus, fixed in channels:
+                    for qubit in qubits:
+                        state = self._jump(state, kraus, qubit, fixed, rng)
+            
+            flat = state.reshape(-1)
+            bloch_sum += statevector_bloch_vectors(flat, num_qubits)
+            if shots:
+                probabilities = np.abs(flat) ** 2
+                probabilities = noise.apply_readout(probabilities / probabilities.sum(), measured, num_qubits)
+                draws += rng.multinomial(int(shots), probabilities)
+            if progress is not None:
+                progress('gates', (trajectory + 1) * len(operations), len(shots_per_trajectory) * len(operations))
+        
+        return {
+            "counts": counts_from_draws(draws, measured, num_qubits),
+            "trajectories": len(shots_per_trajectory),
+            "bloch_vectors": bloch_sum,
+            "marginal_probabilities": (len(shots_per_trajectory) - bloch_sum[2]) / 2
+        }
+    
+    def simulate(self, compiled, noise, shots, seed=None, progress=None):
+        """
+        Simulate a noisy circuit.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit without mid-circuit measurement or conditions
+            noise (NoiseModel): Noise model
+            shots (int): Number of shots
+            seed (int): Optional seed; trajectory chunks use its SeedSequence children
+            progress (callable): Optional progress(stage, done, total) hook
+        
+        Returns:
+            dict: counts, per-qubit Bloch vectors and P(qubit = 1) before
+            readout, and "noise" metadata (method, trajectories)
+        """
+        if compiled.is_dynamic:
+            raise ValueError("Mid-circuit measurement and conditional gates are not supported with a noise model")
+        
+        num_qubits = compiled.num_qubits
+        measured = compiled.measured_qubits or list(range(num_qubits))
+        method = noise.select_method(num_qubits)
+        
+        if method == 'density_matrix':
+            rho = self.run_density_matrix(compiled, noise, progress)
+            probabilities = np.clip(rho.diagonal().real, 0, None)
+            probabilities = noise.apply_readout(probabilities / probabilities.sum(), measured, num_qubits)
+            draws = np.random.default_rng(seed).multinomial(shots, probabilities)
+            bloch, marginals = density_matrix_bloch_vectors(rho, num_qubits)
+            return {
+                "counts": counts_from_draws(draws, measured, num_qubits),
+                "bloch_vectors": bloch,
+                "marginal_probabilities": marginals,
+                "noise": {"method": method}
+            }
+        
+        # Spread the shots evenly over the trajectories
+        shots_per_trajectory = np.full(noise.trajectories, shots // noise.trajectories)
+        shots_per_trajectory[:shots % noise.trajectories] += 1
+        
+        workers = self.pool.max_workers if self.pool is not None else 1
+        if workers > 1:
+            chunks = [chunk for chunk in np.array_split(shots_per_trajectory, workers) if len(chunk)]
+            seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+            futures = [self.pool.submit_trajectories(compiled, noise, chunk, chunk_seed)
+                       for chunk, chunk_seed in zip(chunks, seeds)]
+            parts = []
+            try:
+                for future in as_completed(futures):
+                    parts.append(future.result())
+                    if progress is not None:
+                        progress('gates', len(parts) * len(compiled), len(chunks) * len(compiled))
+            finally:
+                for future in futures:
+                    future.cancel()
+        else:
+            parts = [self.run_trajectories(compiled, noise, shots_per_trajectory, seed, progress)]
+        
+        counts = {}
+        for part in parts:
+            for key, count in part["counts"].items():
+                counts[key] = counts.get(key, 0) + count
+        return {
+            "counts": counts,
+            "bloch_vectors": sum(part["bloch_vectors"] for part in parts) / noise.trajectories,
+            "marginal_probabilities": sum(part["marginal_probabilities"] for part in parts) / noise.trajectories,
+            "noise": {"method": method, "trajectories": noise.trajectories, "chunks": len(parts)}
+        }
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pauli observable module for QuantumSandbox.
+Computes exact expectation values of weighted Pauli strings on a final
+statevector, so observables like <Z0 Z1> no longer have to be estimated
+from sampled counts, and predicts the shot noise a sampled estimate would
+have.
+"""
+
+import numpy as np
+
+from .circuit_simulator import CircuitSimulator, NumpyStatevectorEngine
+
+PAULIS = 'IXYZ'
+
+# Sign vectors are built for blocks of observables holding at most this many entries
+MAX_SIGN_ENTRIES = 2 ** 22
+
+
+def pauli_masks(label, num_qubits):
+    """
+    Encode a Pauli string as bit masks.
+    
+    P|i> = i^ny (-1)^|i & z| |i ^ x>, where x marks the X and Y factors,
+    z the Z and Y factors and ny counts the Y factors.
+    
+    Args:
+        label (str): String of I, X, Y and Z (qubit 0 rightmost)
+        num_qubits (int): Number of qubits
+    
+    Returns:
+        tuple: (x mask, z mask, number of Y factors)
+    """
+    label = label.upper()
+    if len(label) != num_qubits or set(label) - set(PAULIS):
+        raise ValueError(f"Observable '{label}' must be a {num_qubits}-character string of I, X, Y and Z")
+    
+    x_mask = z_mask = 0
+    for qubit, pauli in enumerate(reversed(label)):
+        if pauli in 'XY':
+            x_mask |= 1 << qubit
+        if pauli in 'ZY':
+            z_mask |= 1 << qubit
+    return x_mask, z_mask, label.count('Y')
+
+
+def bit_parity(values):
+    """
+    Parity of the set bits of every entry of an integer array.
+    
+    Args:
+        values (np.ndarray): Non-negative int64 array
+    
+    Returns:
+        np.ndarray: 0/1 array of the same shape
+    """
+    values = values.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        values ^= values >> shift
+    return values & 1
+
+
+def pauli_expectations(states, labels, num_qubits):
+    """
+    Compute <psi|P|psi> for many Pauli strings and statevectors at once.
+    
+    Observables sharing an X mask share the product conj(psi[i ^ x]) psi[i];
+    their expectation values are one matrix product of those products with
+    the +-1 parity signs of the Z masks.
+    
+    Args:
+        states (np.ndarray): Statevector of shape (2**n,) or batch of shape (B, 2**n)
+        labels (list): Pauli strings (see pauli_masks)
+        num_qubits (int): Number of qubits
+    
+    Returns:
+        np.ndarray: Expectation values of shape (len(labels),) or (len(labels), B)
+    """
+    batched = np.ndim(states) == 2
+    states = np.asarray(states, dtype=complex).reshape(-1, 2 ** num_qubits)
+    indices = np.arange(2 ** num_qubits, dtype=np.int64)
+    
+    groups = {}
+    for position, label in enumerate(labels):
+        x_mask, z_mask, num_y = pauli_masks(label, num_qubits)
+        groups.setdefault(x_mask, []).append((position, z_mask, num_y))
+    
+    block = max(1, MAX_SIGN_ENTRIES >> num_qubits)
+    values = np.empty((len(labels), len(states)))
+    for x_mask, members in groups.items():
+        partners = states[:, indices ^ x_mask] if x_mask else states
+        products = partners.conj() * states
+        for start in range(0, len(members), block):
+            block_members = members[start:start + block]
+            signs = np.stack([1.0 - 2 * bit_parity(indices & z_mask) for _, z_mask, _ in block_members])
+            sums = products @ signs.T
+            for column, (position, _, num_y) in enumerate(block_members):
+                values[position] = (1j ** num_y * sums[:, column]).real
+    return values if batched else values[:, 0]
+
+
+def parse_observables(observables):
+    """
+    Normalize the observables of a request.
+    
+    Args:
+        observables (list): Pauli strings, or {"pauli": str, "coefficient": float} terms
+    
+    Returns:
+        tuple: (list of upper-case Pauli strings, np.ndarray of coefficients)
+    """
+    if not observables:
+        raise ValueError("At least one observable is required")
+    
+    labels, coefficients = [], []
+    for observable in observables:
+        if isinstance(observable, str):
+            observable = {"pauli": observable}
+        if not isinstance(observable, dict) or not isinstance(observable.get("pauli"), str):
+            raise ValueError("Each observable must be a Pauli string or an object with a 'pauli' string")
+        labels.append(observable["pauli"].upper())
+        coefficients.append(float(observable.get("coefficient", 1.0)))
+    return labels, np.array(coefficients)
+
+
+def shot_noise(expectations, coefficients, shots, rng):
+    """
+    Predict and draw the statistical error of estimating Pauli terms from shots.
+    
+    A Pauli measurement gives +-1, so with S shots per term the estimate of
+    <P> has standard error sqrt((1 - <P>^2) / S). A sampled estimate is
+    drawn from the corresponding binomial distribution.
+    
+    Args:
+        expectations (np.ndarray): Exact expectation values per term
+        coefficients (np.ndarray): Coefficient per term
+        shots (int): Shots per term
+        rng (np.random.Generator): Random generator
+    
+    Returns:
+        dict: Per-term "standard_error" and "sampled" arrays, and the
+        "total_standard_error" of the weighted sum
+    """
+    if shots <= 0:
+        raise ValueError("Shots must be positive")
+    
+    plus_probabilities = np.clip((1 + expectations) / 2, 0.0, 1.0)
+    variances = 1 - np.clip(expectations, -1.0, 1.0) ** 2
+    standard_errors = np.sqrt(variances / shots)
+    return {
+        "standard_error": standard_errors,
+        "sampled": 2 * rng.binomial(shots, plus_probabilities) / shots - 1,
+        "total_standard_error": float(np.sqrt(np.sum(coefficients ** 2 * standard_errors ** 2)))
+    }
+
+
+class ExpectationEstimator:
+    """
+    Class for evaluating weighted Pauli observables on the final state of a circuit.
+    """
+    
+    MAX_QUBITS = CircuitSimulator.DENSE_MAX_QUBITS
+    
+    def __init__(self):
+        """Initialize the estimator with its own NumPy engine."""
+        self.engine = NumpyStatevectorEngine()
+    
+    def run(self, compiled, observables):
+        """
+        Compute the exact expectation value of every observable.
+        
+        Terminal measurements are ignored: the observables are evaluated on
+        the state just before them.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            observables (list): Observables (see parse_observables)
+        
+        Returns:
+            dict: Per-term "observables" with their "pauli", "coefficient" and
+            "expectation", and the weighted "total"
+        """
+        if compiled.num_qubits > self.MAX_QUBITS:
+            raise ValueError(f"Expectation values support at most {self.MAX_QUBITS} qubits")
+        
+        labels, coefficients = parse_observables(observables)
+        state, _ = self.engine.run(compiled)
+        expectations = pauli_expectations(state, labels, compiled.num_qubits)
+        return {
+            "observables": [
+                {"pauli": label, "coefficient": float(coefficient), "expectation": float(expectation)}
+                for label, coefficient, expectation in zip(labels, coefficients, expectations)
+            ],
+            "total": float(coefficients @ expectations)
+        }
+    
+    @staticmethod
+    def add_shot_noise(result, shots, seed=None):
+        """
+        Attach shot-noise estimates to a result of run.
+        
+        Args:
+            result (dict): Result of run
+            shots (int): Shots per observable
+            seed (int): Optional seed for the sampled estimates
+        
+        Returns:
+            dict: Copy of the result with per-term "standard_error" and
+            "sampled" values, and the "total_standard_error" and "sampled_total"
+        """
+        terms = result["observables"]
+        expectations = np.array([term["expectation"] for term in terms])
+        coefficients = np.array([term["coefficient"] for term in terms])
+        noise = shot_noise(expectations, coefficients, shots, np.random.default_rng(seed))
+        
+        noisy_terms = [
+            dict(term, standard_error=float(error), sampled=float(sampled))
+            for term, error, sampled in zip(terms, noise["standard_error"], noise["sampled"])
+        ]
+        return dict(result, observables=noisy_terms, shots=shots,
+                    total_standard_error=noise["total_standard_error"],
+                    sampled_total=float(coefficients @ noise["sampled"]))
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Circuit optimization module for QuantumSandbox.
+Runs a peephole pass over the compiled operations before simulation:
+adjacent inverse gates cancel, rotations about the same axis merge and runs
+of single-qubit gates are fused into one 2x2 unitary per qubit.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+from .gates import rotation_matrix
+from .ir import GATE_REGISTRY, OPCODES, build_circuit
+
+# Named single-qubit gates and their inverses
+INVERSE_GATES = {'h': 'h', 'x': 'x', 'y': 'y', 'z': 'z', 's': 'sdg', 'sdg': 's', 't': 'tdg', 'tdg': 't'}
+
+ROTATION_GATES = ('rx', 'ry', 'rz')
+
+# Diagonal gates commute with the controls of controlled gates
+DIAGONAL_GATES = frozenset(['z', 's', 'sdg', 't', 'tdg', 'rz'])
+
+# Multi-qubit gates that are their own inverse; for symmetric ones the
+# qubit order does not matter
+SELF_INVERSE_GATES = frozenset(['cx', 'cz', 'ccx', 'swap'])
+SYMMETRIC_GATES = frozenset(['cz', 'swap'])
+
+# Rotations are 4*pi periodic (a 2*pi rotation flips the global sign)
+_ROTATION_PERIOD = 4 * np.pi
+
+_ATOL = 1e-12
+
+
+def _spec(name):
+    """Registry entry of a gate name."""
+    return GATE_REGISTRY[OPCODES[name]]
+
+
+def _matrix(name, param):
+    """2x2 matrix of a single-qubit operation (param is the matrix for 'unitary')."""
+    if name == 'unitary':
+        return param
+    if name in ROTATION_GATES:
+        return rotation_matrix(name, param)
+    return _spec(name).matrix
+
+
+def circuit_stats(operations, num_qubits):
+    """
+    Count operations and the circuit depth.
+    
+    Args:
+        operations (list): (name, qubits, param) triples
+        num_qubits (int): Number of qubits
+    
+    Returns:
+        tuple: (gate count, depth)
+    """
+    levels = [0] * num_qubits
+    for _, qubits, _ in operations:
+        level = max(levels[qubit] for qubit in qubits) + 1
+        for qubit in qubits:
+            levels[qubit] = level
+    return len(operations), max(levels, default=0)
+
+
+def _is_diagonal(name, param):
+    """Check whether a single-qubit operation is diagonal in the computational basis."""
+    if name in DIAGONAL_GATES:
+        return True
+    if name == 'unitary':
+        return abs(param[0, 1]) < _ATOL and abs(param[1, 0]) < _ATOL
+    return False
+
+
+def _is_full_period(theta):
+    """Check whether a rotation angle is equivalent to no rotation at all."""
+    remainder = np.fmod(theta, _ROTATION_PERIOD)
+    return min(abs(remainder), _ROTATION_PERIOD - abs(remainder)) < _ATOL
+
+
+def _reduce_run(run, qubit, fuse):
+    """
+    Simplify a run of consecutive single-qubit operations on one qubit.
+    
+    Adjacent inverse pairs cancel and neighbouring rotations about the same
+    axis merge. With `fuse`, whatever remains is multiplied into a single
+    'unitary' operation, or dropped when the product is the identity.
+    
+    Args:
+        run (list): (name, param) pairs in circuit order
+        qubit (int): Qubit the run acts on
+        fuse (bool): Whether to fuse the run into one matrix
+    
+    Returns:
+        list: Replacement (name, qubits, param) operations
+    """
+    reduced = []
+    for name, param in run:
+        if reduced and INVERSE_GATES.get(reduced[-1][0]) == name:
+            reduced.pop()
+            continue
+        if name in ROTATION_GATES:
+            if reduced and reduced[-1][0] == name:
+                param += reduced.pop()[1]
+            if not _is_full_period(param):
+                reduced.append((name, param))
+            continue
+        reduced.append((name, param))
+    
+    if not fuse or len(reduced) < 2:
+        return [(name, (qubit,), param) for name, param in reduced]
+    
+    matrix = np.eye(2, dtype=complex)
+    for name, param in reduced:
+        matrix = _matrix(name, param) @ matrix
+    if np.allclose(matrix, np.eye(2), atol=_ATOL):
+        return []
+    return [('unitary', (qubit,), matrix)]
+
+
+def _same_operation(first, second):
+    """Check whether two multi-qubit operations are the same."""
+    if first[0] != second[0]:
+        return False
+    spec = _spec(first[0])
+    if first[0] in SYMMETRIC_GATES:
+        return set(first[1]) == set(second[1])
+    controls = spec.num_controls
+    return set(first[1][:controls]) == set(second[1][:controls]) and first[1][controls:] == second[1][controls:]
+
+
+def _peephole(operations, fuse):
+    """
+    Run one optimization pass over a list of operations.
+    
+    Single-qubit operations are collected per qubit and only emitted when
+    another gate touches the qubit. Diagonal runs stay pending across
+    controls of controlled gates (they commute), and a self-inverse
+    multi-qubit gate cancels against the last emitted operation on all of
+    its qubits when that is the same operation.
+    
+    Args:
+        operations (list): (name, qubits, param) triples
+        fuse (bool): Whether to fuse single-qubit runs into unitaries
+    
+    Returns:
+        list: Optimized operations
+    """
+    output = []
+    last_gates = defaultdict(list)
+    pending = defaultdict(list)
+    
+    def emit(operation):
+        output.append(operation)
+        for qubit in operation[1]:
+            last_gates[qubit].append(len(output) - 1)
+    
+    def flush(qubit):
+        for operation in _reduce_run(pending.pop(qubit, []), qubit, fuse):
+            emit(operation)
+    
+    for operation in operations:
+        name, qubits, param = operation
+        spec = _spec(name)
+        
+        if spec.kind == 'single':
+            pending[qubits[0]].append((name, param))
+            continue
+        
+        if name == 'cz':
+            commuting = set(qubits)
+        elif spec.kind == 'controlled':
+            commuting = set(qubits[:spec.num_controls])
+        else:
+            commuting = set()
+        for qubit in qubits:
+            if not (qubit in commuting and all(_is_diagonal(*pending_gate) for pending_gate in pending[qubit])):
+                flush(qubit)
+        
+        if name in SELF_INVERSE_GATES:
+            tops = {last_gates[qubit][-1] if last_gates[qubit] else None for qubit in qubits}
+            top = tops.pop()
+            if not tops and top is not None and _same_operation(output[top], operation):
+                output[top] = None
+                for qubit in qubits:
+                    last_gates[qubit].pop()
+                continue
+        
+        emit(operation)
+    
+    for qubit in list(pending):
+        flush(qubit)
+    
+    return [operation for operation in output if operation is not None]
+
+
+def optimize_circuit(compiled, fuse=True):
+    """
+    Optimize a compiled circuit before simulation.
+    
+    Passes are repeated until the gate count stops shrinking, since a
+    cancellation can make new single-qubit runs adjacent. The global phase
+    is preserved, so statevectors match the unoptimized circuit. Circuits
+    with classically conditioned gates are returned unchanged.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+        fuse (bool): Fuse single-qubit runs into 'unitary' operations; engines
+            that only understand named gates (the stabilizer tableau) pass False
+    
+    Returns:
+        tuple: (optimized CompiledCircuit, report with the gate count and
+        depth before and after)
+    """
+    num_qubits = compiled.num_qubits
+    operations = [
+        (spec.name, qubits, compiled.matrix(spec, param) if spec.name == 'unitary' else param)
+        for spec, qubits, param in compiled.operations()
+    ]
+    gates_before, depth_before = circuit_stats(operations, num_qubits)
+    if compiled.has_conditions:
+        # A classically conditioned gate must neither merge with nor move past its neighbours
+        return compiled, {
+            "gates_before": gates_before,
+            "gates_after": gates_before,
+            "depth_before": depth_before,
+            "depth_after": depth_before
+        }
+    
+    while True:
+        optimized = _peephole(operations, fuse)
+        shrunk = len(optimized) < len(operations)
+        operations = optimized
+        if not shrunk:
+            break
+    
+    gates_after, depth_after = circuit_stats(operations, num_qubits)
+    report = {
+        "gates_before": gates_before,
+        "gates_after": gates_after,
+        "depth_before": depth_before,
+        "depth_after": depth_after
+    }
+    return build_circuit(num_qubits, operations), report
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Out-of-core statevector module for QuantumSandbox.
+Keeps the amplitudes of very large circuits in a numpy.memmap on local disk
+and streams them through memory in chunks, trading speed for the ability to
+simulate more qubits than fit in RAM. Only served through the job API.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from .circuit_simulator import NumpyStatevectorEngine
+from .sampling import count_indices
+
+
+def plan_passes(compiled, chunk_qubits, max_high_qubits=2):
+    """
+    Group the operations of a circuit into passes over the statevector file.
+    
+    The file is split into chunks of 2^chunk_qubits amplitudes. Gates on
+    low-order qubits act within a chunk; a gate on high-order qubits pairs
+    up the chunks that differ in those bits. Consecutive operations are
+    grouped as long as their high-order qubits together stay within
+    max_high_qubits, so each group is a single read/write pass over the
+    file in blocks of at most 2^max_high_qubits chunks.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit without mid-circuit measurement
+        chunk_qubits (int): log2 of the chunk size
+        max_high_qubits (int): High-order qubits a pass may span (a single
+            gate may exceed it)
+    
+    Returns:
+        list: (sorted tuple of high-order qubits, [(spec, qubits, matrix), ...]) per pass
+    """
+    passes = []
+    high = set()
+    operations = []
+    for spec, qubits, param in compiled.operations():
+        if spec.kind == 'measure':
+            continue
+        gate_high = {qubit for qubit in qubits if qubit >= chunk_qubits}
+        if operations and len(high | gate_high) > max(max_high_qubits, len(gate_high)):
+            passes.append((tuple(sorted(high)), operations))
+            high, operations = set(), []
+        high |= gate_high
+        operations.append((spec, qubits, compiled.matrix(spec, param) if spec.kind == 'single' else None))
+    if operations:
+        passes.append((tuple(sorted(high)), operations))
+    return passes
+
+
+class OutOfCoreStatevectorEngine:
+    """
+    Class for simulating circuits with a disk-backed statevector.
+    
+    The statevector lives in a temporary numpy.memmap file. Every pass of
+    plan_passes loads blocks of chunks into memory, applies its gates with
+    the NumPy engine on a small tensor in which the block's high-order
+    qubits become extra axes, and writes the block back. Counts are sampled
+    by streaming cumulative probabilities over the chunks, so no full-size
+    array is ever held in memory.
+    """
+    
+    # log2 of the number of amplitudes per chunk (64 MB in complex128)
+    DEFAULT_CHUNK_QUBITS = 22
+    
+    # High-order qubits per pass, i.e. up to 4 chunks in memory at once
+    MAX_HIGH_QUBITS = 2
+    
+    # Disk space shared by all running out-of-core simulations
+    _disk_lock = threading.Lock()
+    _disk_reserved = 0
+    
+    def __init__(self, directory=None, max_disk_bytes=None, chunk_qubits=None):
+        """
+        Initialize the engine.
+        
+        Args:
+            directory (str): Directory of the statevector files (defaults to
+                the OUT_OF_CORE_DIR environment variable, or the temp dir)
+            max_disk_bytes (int): Disk quota of all running simulations
+                (defaults to OUT_OF_CORE_MAX_DISK, or 64 GiB)
+            chunk_qubits (int): log2 of the chunk size
+        """
+        self.directory = directory or os.environ.get('OUT_OF_CORE_DIR') or tempfile.gettempdir()
+        self.max_disk_bytes = max_disk_bytes or int(os.environ.get('OUT_OF_CORE_MAX_DISK', 64 * 1024 ** 3))
+        self.chunk_qubits = chunk_qubits or self.DEFAULT_CHUNK_QUBITS
+        self.numpy_engine = NumpyStatevectorEngine()
+    
+    def _reserve_disk(self, size):
+        """Claim disk space against the quota and the free space of the directory."""
+        with self._disk_lock:
+            reserved = OutOfCoreStatevectorEngine._disk_reserved
+            if reserved + size > self.max_disk_bytes:
+                raise ValueError(f"Out-of-core statevector of {size} bytes exceeds the disk quota "
+                                 f"({self.max_disk_bytes - reserved} of {self.max_disk_bytes} bytes free)")
+            free = shutil.disk_usage(self.directory).free
+            if size > free:
+                raise ValueError(f"Out-of-core statevector of {size} bytes does not fit on disk ({free} bytes free)")
+            OutOfCoreStatevectorEngine._disk_reserved += size
+    
+    def _release_disk(self, size):
+        """Return disk space to the quota."""
+        with self._disk_lock:
+            OutOfCoreStatevectorEngine._disk_reserved -= size
+    
+    def _apply_pass(self, state, high, operations, chunk_qubits, progress, done, total):
+        """
+        Apply one pass of operations block by block.
+        
+        Args:
+            state (np.memmap): Flat statevector file
+            high (tuple): Sorted high-order qubits of the pass
+            operations (list): (spec, qubits, matrix) triples
+            chunk_qubits (int): log2 of the chunk size
+            progress (callable): Optional progress hook
+            done (int): Operations applied before this pass
+            total (int): Total number of operations
+        """
+        chunk = 2 ** chunk_qubits
+        num_chunks = len(state) // chunk
+        bits = [qubit - chunk_qubits for qubit in high]
+        high_mask = sum(1 << bit for bit in bits)
+        
+        # Block axis order: most significant high qubit first, then the chunk axes
+        offsets = [sum(value << bit for value, bit in zip(values, reversed(bits)))
+                   for values in itertools.product((0, 1), repeat=len(bits))]
+        virtual = {qubit: chunk_qubits + index for index, qubit in enumerate(high)}
+        operations = [(spec, tuple(virtual.get(qubit, qubit) for qubit in qubits), matrix)
+                      for spec, qubits, matrix in operations]
+        
+        block = np.empty((len(offsets), chunk), dtype=state.dtype)
+        for base in range(num_chunks):
+            if base & high_mask:
+                continue
+            for row, offset in enumerate(offsets):
+                start = (base + offset) * chunk
+                block[row] = state[start:start + chunk]
+            
+            tensor = block.reshape((2,) * (len(bits) + chunk_qubits))
+            for spec, qubits, matrix in operations:
+                tensor = self.numpy_engine.apply_operation(tensor, spec, qubits, matrix)
+            block = np.ascontiguousarray(tensor).reshape(len(offsets), chunk)
+            
+            for row, offset in enumerate(offsets):
+                start = (base + offset) * chunk
+                state[start:start + chunk] = block[row]
+            
+            # Lets a cancelled job stop between blocks
+            if progress is not None:
+                progress('gates', done, total)
+    
+    def _local_statistics(self, state, chunk_qubits, num_qubits):
+        """
+        Stream over the chunks to collect per-chunk probabilities and local data.
+        
+        Bloch x/y components need amplitude pairs. For qubits inside a chunk
+        the pairs are in the same chunk; for a higher qubit they are in the
+        two chunks whose indices differ in that qubit's bit, so every higher
+        qubit takes one more pass reading the chunks in pairs.
+        
+        Args:
+            state (np.memmap): Flat statevector file
+            chunk_qubits (int): log2 of the chunk size
+            num_qubits (int): Number of qubits
+        
+        Returns:
+            tuple: (probability of each chunk, P(qubit = 1) per qubit,
+            Bloch vectors (3, n), both normalized)
+        """
+        chunk = 2 ** chunk_qubits
+        num_chunks = len(state) // chunk
+        chunk_totals = np.zeros(num_chunks)
+        marginals = np.zeros(num_qubits)
+        coherences = np.zeros(num_qubits, dtype=complex)
+        
+        for index in range(num_chunks):
+            # Accumulate in double precision, also for complex64 files
+            amplitudes = np.asarray(state[index * chunk:(index + 1) * chunk], dtype=complex)
+            probabilities = np.abs(amplitudes) ** 2
+            chunk_totals[index] = probabilities.sum()
+            for qubit in range(chunk_qubits):
+                pairs = amplitudes.reshape(-1, 2, 2 ** qubit)
+                marginals[qubit] += probabilities.reshape(-1, 2, 2 ** qubit)[:, 1].sum()
+                coherences[qubit] += np.vdot(pairs[:, 1], pairs[:, 0])
+            for qubit in range(chunk_qubits, num_qubits):
+                if index >> (qubit - chunk_qubits) & 1:
+                    marginals[qubit] += chunk_totals[index]
+        
+        for qubit in range(chunk_qubits, num_qubits):
+            stride = 1 << (qubit - chunk_qubits)
+            for index in range(num_chunks):
+                if index & stride:
+                    continue
+                lower = np.asarray(state[index * chunk:(index + 1) * chunk], dtype=complex)
+                upper = np.asarray(state[(index + stride) * chunk:(index + stride + 1) * chunk], dtype=complex)
+                coherences[qubit] += np.vdot(upper, lower)
+        
+        norm = chunk_totals.sum()
+        marginals /= norm
+        coherences /= norm
+        bloch = np.array([2 * coherences.real, -2 * coherences.imag, 1 - 2 * marginals])
+        return chunk_totals, marginals, bloch
+    
+    @staticmethod
+    def _sample(state, chunk_totals, shots, rng):
+        """
+        Sample basis-state indices by streaming cumulative probabilities.
+        
+        Sorted uniform draws are located first among the cumulative chunk
+        probabilities, then within the chunks that received draws.
+        
+        Args:
+            state (np.memmap): Flat statevector file
+            chunk_totals (np.ndarray): Probability of each chunk
+            shots (int): Number of shots
+            rng (np.random.Generator): Random generator
+        
+        Returns:
+            np.ndarray: Sampled basis-state indices
+        """
+        chunk = len(state) // len(chunk_totals)
+        boundaries = np.cumsum(chunk_totals)
+        draws = np.sort(rng.random(shots)) * boundaries[-1]
+        chunk_of_draw = np.minimum(np.searchsorted(boundaries, draws, side='right'), len(chunk_totals) - 1)
+        
+        outcomes = np.empty(shots, dtype=np.int64)
+        for index in np.unique(chunk_of_draw):
+            selected = chunk_of_draw == index
+            amplitudes = np.asarray(state[index * chunk:(index + 1) * chunk])
+            cumulative = np.cumsum(np.abs(amplitudes).astype(np.float64) ** 2)
+            offset = boundaries[index] - chunk_totals[index]
+            positions = np.searchsorted(cumulative, draws[selected] - offset, side='right')
+            outcomes[selected] = index * chunk + np.minimum(positions, chunk - 1)
+        return outcomes
+    
+    def simulate(self, compiled, shots, seed=None, progress=None, dtype=complex):
+        """
+        Simulate a circuit with the statevector on disk.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            shots (int): Number of shots
+            seed (int): Optional seed for the random generator
+            progress (callable): Optional progress(stage, done, total) hook
+            dtype: Complex dtype of the statevector
+        
+        Returns:
+            dict: counts, marginal probabilities, Bloch vectors and
+            out-of-core metadata (chunking, passes, disk usage, norm)
+        """
+        if compiled.is_dynamic:
+            raise ValueError("Mid-circuit measurement and conditional gates are not supported by the out-of-core engine")
+        
+        num_qubits = compiled.num_qubits
+        chunk_qubits = min(self.chunk_qubits, num_qubits)
+        passes = plan_passes(compiled, chunk_qubits, self.MAX_HIGH_QUBITS)
+        total = sum(len(operations) for _, operations in passes)
+        disk_bytes = 2 ** num_qubits * np.dtype(dtype).itemsize
+        
+        self._reserve_disk(disk_bytes)
+        descriptor, path = tempfile.mkstemp(suffix='.statevector', dir=self.directory)
+        os.close(descriptor)
+        try:
+            # The file starts out sparse, i.e. all zeros
+            state = np.memmap(path, dtype=dtype, mode='w+', shape=(2 ** num_qubits,))
+            state[0] = 1
+            
+            done = 0
+            for high, operations in passes:
+                self._apply_pass(state, high, operations, chunk_qubits, progress, done, total)
+                done += len(operations)
+                if progress is not None:
+                    progress('gates', done, total)
+            
+            chunk_totals, marginals, bloch = self._local_statistics(state, chunk_qubits, num_qubits)
+            outcomes = self._sample(state, chunk_totals, shots, np.random.default_rng(seed))
+            del state
+        finally:
+            os.remove(path)
+            self._release_disk(disk_bytes)
+        
+        return {
+            "counts": count_indices(outcomes, compiled.measured_qubits or range(num_qubits), num_qubits),
+            "marginal_probabilities": marginals,
+            "bloch_vectors": bloch,
+            "out_of_core": {
+                "chunk_qubits": chunk_qubits,
+                "passes": len(passes),
+                "disk_bytes": disk_bytes,
+                "norm": float(chunk_totals.sum())
+            }
+        }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Image rendering module for QuantumSandbox.
+Renders matplotlib images (measurement histograms) in a dedicated process
+pool, since matplotlib is not thread-safe, and caches the encoded images.
+Also draws text circuit diagrams without Qiskit.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .result_cache import ResultCache
+
+
+def _operation_labels(spec, qubits, param, name, condition):
+    """Label of an operation on each of its qubits (the target carries the condition)."""
+    if spec.kind == 'measure':
+        labels = {qubits[0]: 'M'}
+    elif spec.kind == 'swap':
+        labels = {qubit: 'x' for qubit in qubits}
+    elif spec.kind == 'controlled':
+        labels = {qubit: '■' for qubit in qubits[:-1]}
+        labels[qubits[-1]] = spec.name.lstrip('c').upper()
+    elif spec.name == 'unitary':
+        labels = {qubits[0]: 'U'}
+    elif spec.num_params:
+        labels = {qubits[0]: f"{spec.name.upper()}({name if name is not None else f'{param:.4g}'})"}
+    else:
+        labels = {qubits[0]: spec.name.upper()}
+    
+    if condition is not None:
+        labels[qubits[-1]] += f"[c{condition[0]}={condition[1]}]"
+    return labels
+
+
+def draw_circuit_text(compiled):
+    """
+    Draw a compiled circuit as text, one wire per qubit (qubit 0 on top).
+    
+    Operations are placed in the leftmost column where all the wires they
+    span are free and, for c_if gates, after the measurement writing their
+    classical bit; multi-qubit operations draw '┼' on the wires they cross.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit, possibly with symbolic angles
+    
+    Returns:
+        str: The diagram, lines joined by newlines
+    """
+    num_qubits = compiled.num_qubits
+    levels = [0] * num_qubits
+    # First free column for writing (measuring) and for reading each classical bit
+    writable = [0] * num_qubits
+    readable = [0] * num_qubits
+    columns = []
+    for (spec, qubits, param, name), condition in zip(compiled.operations(symbolic=True), compiled.conditions()):
+        labels = _operation_labels(spec, qubits, param, name, condition)
+        span = range(min(qubits), max(qubits) + 1)
+        level = max(levels[qubit] for qubit in span)
+        if spec.kind == 'measure':
+            level = max(level, writable[qubits[0]])
+            readable[qubits[0]] = level + 1
+        if condition is not None:
+            level = max(level, readable[condition[0]])
+            writable[condition[0]] = max(writable[condition[0]], level + 1)
+        if level == len(columns):
+            columns.append({})
+        for qubit in span:
+            columns[level][qubit] = labels.get(qubit, '┼')
+            levels[qubit] = level + 1
+    
+    prefixes = [f"q_{qubit}: " for qubit in range(num_qubits)]
+    prefix_width = max(len(prefix) for prefix in prefixes)
+    lines = []
+    for qubit in range(num_qubits):
+        cells = []
+        for column in columns:
+            width = max(len(label) for label in column.values())
+            cells.append(column.get(qubit, '').center(width, '─'))
+        lines.append(prefixes[qubit].rjust(prefix_width) + '─' + '─'.join(cells) + '─')
+    return '\n'.join(lines)
+
+
+def render_histogram_png(counts):
+    """
+    Render a measurement histogram to a base64-encoded PNG.
+    
+    Runs inside a rendering worker process; matplotlib is imported there
+    with the non-interactive Agg backend.
+    
+    Args:
+        counts (dict): Measurement counts
+    
+    Returns:
+        str: Base64-encoded PNG image
+    """
+    import io
+    import base64
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from qiskit.visualization import plot_histogram
+    
+    figure = plot_histogram(counts, figsize=(10, 6))
+    buf = io.BytesIO()
+    figure.savefig(buf, format='png')
+    plt.close(figure)
+    buf.seek(0)
+    
+    return base64.b64encode(buf.read()).decode('utf-8')
+
+
+class HistogramRenderer:
+    """
+    Class for rendering histogram images out of the request threads.
+    """
+    
+    def __init__(self, max_workers=None, cache_bytes=32 * 1024 * 1024):
+        """
+        Initialize the renderer. The process pool is started on first use.
+        
+        Args:
+            max_workers (int): Number of rendering processes
+                (defaults to the RENDER_WORKERS environment variable, or 2)
+            cache_bytes (int): Size limit of the rendered image cache
+        """
+        self.max_workers = max_workers or int(os.environ.get('RENDER_WORKERS', 2))
+        self.image_cache = ResultCache(max_bytes=cache_bytes)
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self):
+        """Create the process pool if it is not running yet."""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the server's threads or locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+    
+    def render_histogram(self, result_id, counts, timeout=60):
+        """
+        Get the histogram image of a simulation result, rendering it if needed.
+        
+        Args:
+            result_id (str): Identifier of the simulation result
+            counts (dict): Measurement counts of the result
+            timeout (float): Seconds to wait for the rendering worker
+        
+        Returns:
+            str: Base64-encoded PNG image
+        """
+        image = self.image_cache.get(result_id)
+        if image is None:
+            future = self._get_executor().submit(render_histogram_png, counts)
+            image = future.result(timeout=timeout)
+            self.image_cache.put(result_id, image)
+        return image
+    
+    def shutdown(self):
+        """Stop the rendering processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
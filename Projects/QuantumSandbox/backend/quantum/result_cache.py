@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Result cache module for QuantumSandbox.
+Provides content-addressed caching of simulation results keyed by the
+hash of the compiled circuit IR (see quantum.ir).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .serialization import dumps, loads
+
+
+def estimate_size(value):
+    """
+    Estimate the memory footprint of a cached value in bytes.
+    
+    NumPy arrays (and objects exposing `nbytes`, such as compiled circuits)
+    count their buffer size; strings and scalars count roughly
+    their JSON length, which is cheap to compute for the small metadata
+    fields of a result.
+    
+    Args:
+        value: Value made of dicts, lists, arrays, strings and numbers
+        
+    Returns:
+        int: Approximate size in bytes
+    """
+    if hasattr(value, 'nbytes'):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(len(str(key)) + estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(value, str):
+        return len(value)
+    return 8
+
+
+def circuit_cache_key(compiled, shots=1024, seed=None, **options):
+    """
+    Compute the content address of a simulation request.
+    
+    The circuit enters through the digest of its compiled IR, so payloads
+    that differ only in aliases, gate grouping or UI fields share a key.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+        shots (int): Number of simulation shots
+        seed (int): Sampling seed
+        **options: Any other request option that changes the result (backend...)
+    
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = {
+        'circuit': compiled.digest,
+        'shots': shots,
+        'seed': seed,
+        'options': options
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded in-process LRU cache with byte-size accounting.
+    
+    Values are stored as-is (NumPy arrays included) and their size is
+    given by estimate_size. Entries are evicted least-recently-used first
+    until both the entry and byte limits are respected.
+    """
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=4096):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_bytes (int): Maximum total size of the cached values
+            max_entries (int): Maximum number of cached values
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        """
+        Look up a cached value and mark it as recently used.
+        
+        Args:
+            key (str): Cache key
+        
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value):
+        """
+        Store a value, evicting least-recently-used entries as needed.
+        
+        Values larger than the whole cache are not stored.
+        
+        Args:
+            key (str): Cache key
+            value: Value to cache
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            
+            while self.current_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self):
+        """
+        Get cache counters.
+        
+        Returns:
+            dict: Hits, misses, evictions, entries and byte usage
+        """
+        with self._lock:
+            return {
+                "backend": "memory",
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+class SQLiteResultCache:
+    """
+    LRU result cache stored in a SQLite file.
+    
+    Every process opening the same file shares the cache, so all gunicorn
+    workers of a node can serve each other's results. Counters are kept in
+    the database as well so that stats() reports the whole pool.
+    """
+    
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, max_entries=16384):
+        """
+        Initialize the cache and create its tables if needed.
+        
+        Args:
+            path (str): Path of the SQLite database file
+            max_bytes (int): Maximum total size of the cached values
+            max_entries (int): Maximum number of cached values
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._local = threading.local()
+        
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                [('hits',), ('misses',), ('evictions',)]
+            )
+    
+    def _connection(self):
+        """Return this thread's connection to the database."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+    
+    def _bump(self, conn, name, amount=1):
+        """Increment a shared counter."""
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+    
+    def get(self, key):
+        """
+        Look up a cached value and mark it as recently used.
+        
+        Args:
+            key (str): Cache key
+        
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._connection() as conn:
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._bump(conn, 'misses')
+                return None
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._bump(conn, 'hits')
+        return loads(row[0])
+    
+    def put(self, key, value):
+        """
+        Store a value, evicting least-recently-used entries as needed.
+        
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value, possibly containing NumPy arrays
+        """
+        encoded = dumps(value)
+        if len(encoded) > self.max_bytes:
+            return
+        
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, encoded, len(encoded), time.time())
+            )
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            
+            evicted = 0
+            for old_key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+                if total <= self.max_bytes and entries <= self.max_entries:
+                    break
+                conn.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                total -= size
+                entries -= 1
+                evicted += 1
+            if evicted:
+                self._bump(conn, 'evictions', evicted)
+    
+    def clear(self):
+        """Remove every entry (counters are kept)."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM results")
+    
+    def stats(self):
+        """
+        Get cache counters aggregated over every process using the file.
+        
+        Returns:
+            dict: Hits, misses, evictions, entries and byte usage
+        """
+        conn = self._connection()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            "backend": "sqlite",
+            "hits": counters.get('hits', 0),
+            "misses": counters.get('misses', 0),
+            "evictions": counters.get('evictions', 0),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes
+        }
+
+
+def create_result_cache():
+    """
+    Create the result cache configured by the environment.
+    
+    RESULT_CACHE_PATH opts into the SQLite cache shared by all workers;
+    RESULT_CACHE_MAX_BYTES sets the size limit of either cache.
+    
+    Returns:
+        ResultCache or SQLiteResultCache
+    """
+    max_bytes = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    path = os.environ.get('RESULT_CACHE_PATH')
+    if path:
+        return SQLiteResultCache(path, max_bytes=max_bytes)
+    return ResultCache(max_bytes=max_bytes)
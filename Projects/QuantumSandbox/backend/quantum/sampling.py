@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measurement sampling module for QuantumSandbox.
+Provides the shot samplers shared by the simulation engines.
+"""
+
+import numpy as np
+
+
+def sample_counts(statevector, measured_qubits, num_qubits, shots, seed=None):
+    """
+    Sample measurement counts from the probabilities of a final statevector.
+    
+    A single multinomial draw over the basis-state probabilities replaces
+    per-shot sampling, so the cost is independent of the number of shots.
+    Measured qubit q is written to classical bit q; unmeasured bits read 0.
+    
+    Args:
+        statevector (np.ndarray): Flat statevector of length 2**num_qubits
+        measured_qubits (list): Qubits that are measured
+        num_qubits (int): Number of qubits (and classical bits)
+        shots (int): Number of shots
+        seed (int): Optional seed for the random generator
+        
+    Returns:
+        dict: Counts keyed by classical bitstring
+    """
+    # Normalize in double precision, also for complex64 statevectors
+    probabilities = np.abs(statevector).astype(np.float64) ** 2
+    probabilities /= probabilities.sum()
+    
+    rng = np.random.default_rng(seed)
+    return counts_from_draws(rng.multinomial(shots, probabilities), measured_qubits, num_qubits)
+
+
+def counts_from_draws(draws, measured_qubits, num_qubits):
+    """
+    Turn the number of draws of every basis state into counts.
+    
+    Args:
+        draws (np.ndarray): Draws per basis state, of length 2**num_qubits
+        measured_qubits (list): Qubits that are measured (other bits read 0)
+        num_qubits (int): Number of qubits (and classical bits)
+        
+    Returns:
+        dict: Counts keyed by classical bitstring (qubit 0 rightmost)
+    """
+    outcomes = np.flatnonzero(draws)
+    
+    # Keep only the measured bits of each sampled basis state
+    mask = sum(1 << qubit for qubit in measured_qubits)
+    counts = {}
+    for outcome, count in zip(outcomes & mask, draws[outcomes]):
+        key = format(int(outcome), f'0{num_qubits}b')
+        counts[key] = counts.get(key, 0) + int(count)
+    return counts
+
+
+def count_outcomes(outcomes, measured_qubits):
+    """
+    Turn per-shot measurement outcomes into counts.
+    
+    Args:
+        outcomes (np.ndarray): Bool array of shape (shots, n); column q is qubit q
+        measured_qubits (list): Qubits that are measured (other bits read 0)
+        
+    Returns:
+        dict: Counts keyed by classical bitstring (qubit 0 rightmost)
+    """
+    mask = np.zeros(outcomes.shape[1], dtype=bool)
+    mask[list(measured_qubits)] = True
+    
+    unique, counts = np.unique((outcomes & mask)[:, ::-1], axis=0, return_counts=True)
+    characters = np.where(unique, '1', '0')
+    return {''.join(row): int(count) for row, count in zip(characters, counts)}
+
+
+def count_indices(indices, measured_qubits, num_qubits):
+    """
+    Turn sampled basis-state indices into counts.
+    
+    Args:
+        indices (np.ndarray): Sampled basis-state indices
+        measured_qubits (list): Qubits that are measured (other bits read 0)
+        num_qubits (int): Number of qubits (and classical bits)
+        
+    Returns:
+        dict: Counts keyed by classical bitstring (qubit 0 rightmost)
+    """
+    mask = sum(1 << qubit for qubit in measured_qubits)
+    unique, counts = np.unique(np.asarray(indices, dtype=np.int64) & mask, return_counts=True)
+    return {format(int(index), f'0{num_qubits}b'): int(count) for index, count in zip(unique, counts)}
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Serialization module for QuantumSandbox.
+Provides the wire formats used to send statevectors and visualization data
+to the frontend. Simulation and visualization work on NumPy arrays; they are
+converted to JSON only here, at the edge of the API.
+"""
+
+import base64
+import json
+
+import numpy as np
+
+# Media type a client sends in its Accept header to opt into columnar statevectors
+COLUMNAR_MEDIA_TYPE = 'application/vnd.quantumsandbox.columnar+json'
+
+STATEVECTOR_FORMATS = ('records', 'columnar')
+FLOAT_DTYPES = ('float32', 'float64')
+
+
+def encode_array(values, dtype):
+    """
+    Encode a 1-D array as base64 little-endian bytes.
+    
+    Args:
+        values (np.ndarray): Array to encode
+        dtype (str): NumPy dtype name to encode as
+    
+    Returns:
+        str: Base64 string
+    """
+    return base64.b64encode(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()).decode('ascii')
+
+
+def decode_array(data, dtype):
+    """
+    Decode a base64 little-endian array produced by encode_array.
+    
+    Args:
+        data (str): Base64 string
+        dtype (str): NumPy dtype name the data was encoded as
+    
+    Returns:
+        np.ndarray: Decoded array
+    """
+    return np.frombuffer(base64.b64decode(data), dtype=np.dtype(dtype).newbyteorder('<'))
+
+
+def validate_sparse_options(top_k=None, threshold=None):
+    """
+    Check the sparse mode options of a request.
+    
+    Args:
+        top_k (int): Number of most probable states to keep, at least 1
+        threshold (float): Minimum probability of kept states, at least 0
+    
+    Raises:
+        ValueError: If either option is out of range
+    """
+    if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, (int, np.integer)) or top_k < 1):
+        raise ValueError(f"top_k must be an integer of at least 1, got {top_k!r}")
+    if threshold is not None and (isinstance(threshold, bool) or not isinstance(threshold, (int, float, np.number))
+                                  or not threshold >= 0):
+        raise ValueError(f"threshold must be a probability of at least 0, got {threshold!r}")
+
+
+def select_amplitudes(amplitudes, top_k=None, threshold=None):
+    """
+    Pick the basis states to send in sparse mode.
+    
+    Args:
+        amplitudes (np.ndarray): Flat complex statevector
+        top_k (int): Keep at most this many most probable states (at least 1)
+        threshold (float): Drop states with a probability below this value (at least 0)
+    
+    Returns:
+        np.ndarray: Sorted basis-state indices, or None to send every state
+    
+    Raises:
+        ValueError: If top_k or threshold is out of range
+    """
+    validate_sparse_options(top_k, threshold)
+    if top_k is None and threshold is None:
+        return None
+    
+    probabilities = np.abs(amplitudes) ** 2
+    indices = np.arange(len(amplitudes))
+    if threshold is not None:
+        indices = np.flatnonzero(probabilities >= threshold)
+    if top_k is not None and len(indices) > top_k:
+        keep = np.argpartition(probabilities[indices], -top_k)[-top_k:]
+        indices = indices[keep]
+    return np.sort(indices)
+
+
+def _binary_labels(indices, num_qubits):
+    """Format basis-state indices as bitstrings (qubit 0 rightmost)."""
+    return [format(int(index), f'0{num_qubits}b') for index in indices]
+
+
+def _encode_columns(columns, indices, num_qubits, statevector_format, dtype, label_key):
+    """
+    Encode equally long arrays either as JSON lists or as base64 columns.
+    
+    Args:
+        columns (dict): Name -> 1-D array, already restricted to `indices`
+        indices (np.ndarray): Basis-state indices, or None when dense
+        num_qubits (int): Number of qubits
+        statevector_format (str): 'records' or 'columnar'
+        dtype (str): Float dtype of columnar arrays
+        label_key (str): Name of the bitstring label list in 'records' format
+        
+    Returns:
+        dict: Encoded columns
+    """
+    if statevector_format == 'records':
+        length = len(next(iter(columns.values())))
+        encoded = {label_key: _binary_labels(range(length) if indices is None else indices, num_qubits)}
+        encoded.update((name, values.tolist()) for name, values in columns.items())
+        return encoded
+    
+    encoded = {
+        "encoding": "columnar",
+        "dtype": dtype,
+        "byteorder": "little",
+        "num_qubits": num_qubits
+    }
+    encoded.update((name, encode_array(values, dtype)) for name, values in columns.items())
+    if indices is not None:
+        index_dtype = 'uint32' if num_qubits <= 32 else 'uint64'
+        encoded["indices"] = encode_array(indices, index_dtype)
+        encoded["index_dtype"] = index_dtype
+    return encoded
+
+
+def _check_format(statevector_format, dtype):
+    """Validate wire format options."""
+    if statevector_format not in STATEVECTOR_FORMATS:
+        raise ValueError(f"Unknown statevector format '{statevector_format}', expected one of {', '.join(STATEVECTOR_FORMATS)}")
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}', expected one of {', '.join(FLOAT_DTYPES)}")
+
+
+def encode_statevector(amplitudes, num_qubits, statevector_format='records', dtype='float64',
+                       top_k=None, threshold=None, indices=None):
+    """
+    Encode a statevector for the JSON response.
+    
+    'records' is the original list of {state, real, imag, probability}
+    dicts. 'columnar' sends real, imag and probability as base64
+    little-endian arrays whose basis-state labels are implied by position,
+    or given by an explicit index array when top_k/threshold select a
+    sparse subset.
+    
+    Args:
+        amplitudes (np.ndarray): Flat complex statevector
+        num_qubits (int): Number of qubits
+        statevector_format (str): 'records' or 'columnar'
+        dtype (str): 'float32' or 'float64' for columnar arrays
+        top_k (int): Optional number of most probable states to keep
+        threshold (float): Optional minimum probability of kept states
+        indices (np.ndarray): Precomputed sparse selection (overrides top_k/threshold)
+        
+    Returns:
+        list or dict: Encoded statevector
+    """
+    _check_format(statevector_format, dtype)
+    
+    amplitudes = np.asarray(amplitudes)
+    if indices is None:
+        indices = select_amplitudes(amplitudes, top_k, threshold)
+    selected = amplitudes if indices is None else amplitudes[indices]
+    probabilities = np.abs(selected) ** 2
+    
+    if statevector_format == 'records':
+        labels = _binary_labels(range(len(selected)) if indices is None else indices, num_qubits)
+        return [
+            {
+                "state": label,
+                "real": real,
+                "imag": imag,
+                "probability": probability
+            }
+            for label, real, imag, probability in zip(labels, selected.real.tolist(), selected.imag.tolist(), probabilities.tolist())
+        ]
+    
+    encoded = _encode_columns(
+        {"real": selected.real, "imag": selected.imag, "probability": probabilities},
+        indices, num_qubits, statevector_format, dtype, label_key="states"
+    )
+    encoded["length"] = int(len(selected))
+    return encoded
+
+
+def encode_visualization(visualization, num_qubits, statevector_format='records', dtype='float64', indices=None):
+    """
+    Encode the array-valued output of StateVisualizer for the JSON response.
+    
+    Args:
+        visualization (dict): Output of StateVisualizer.generate_visualization
+        num_qubits (int): Number of qubits
+        statevector_format (str): 'records' or 'columnar'
+        dtype (str): Float dtype of columnar arrays
+        indices (np.ndarray): Optional sparse selection for the probability data
+        
+    Returns:
+        dict: JSON-serializable visualization data
+    """
+    _check_format(statevector_format, dtype)
+    
+    bloch_data = visualization["bloch_data"]
+    encoded = {
+        "probability_data": None,
+        "bloch_data": [
+            {"qubit": qubit, "x": x, "y": y, "z": z}
+            for qubit, x, y, z in zip(bloch_data["qubits"].tolist(), bloch_data["x"].tolist(),
+                                      bloch_data["y"].tolist(), bloch_data["z"].tolist())
+        ],
+        "phase_data": None,
+        "histogram_data": visualization["histogram_data"]
+    }
+    
+    # Statevector-based charts are absent for stabilizer results
+    if visualization["probability_data"] is not None:
+        probabilities = visualization["probability_data"]["probabilities"]
+        if indices is not None:
+            probabilities = probabilities[indices]
+        encoded["probability_data"] = _encode_columns(
+            {"probabilities": probabilities}, indices, num_qubits,
+            statevector_format, dtype, label_key="labels"
+        )
+    
+    if visualization["phase_data"] is not None:
+        phase_data = visualization["phase_data"]
+        encoded["phase_data"] = _encode_columns(
+            {"phases": phase_data["phases"], "magnitudes": phase_data["magnitudes"]},
+            phase_data["indices"], num_qubits, statevector_format, dtype, label_key="states"
+        )
+    
+    return encoded
+
+
+def encode_response(response, statevector_format='records', dtype='float64', top_k=None, threshold=None):
+    """
+    Turn a raw simulate/visualize response into its JSON wire format.
+    
+    This is the only place where NumPy arrays produced by the simulator and
+    the visualizer are converted for the client.
+    
+    Args:
+        response (dict): {"result": ..., "visualization": ...} with NumPy arrays
+        statevector_format (str): 'records' or 'columnar'
+        dtype (str): Float dtype of columnar arrays
+        top_k (int): Optional sparse mode: most probable states only
+        threshold (float): Optional sparse mode: minimum probability
+        
+    Returns:
+        dict: JSON-serializable response
+    """
+    result = response["result"]
+    num_qubits = result["num_qubits"]
+    encoded = dict(response)
+    
+    if result["statevector"] is None:
+        indices = None
+        encoded["result"] = dict(result)
+    else:
+        amplitudes = np.asarray(result["statevector"])
+        indices = select_amplitudes(amplitudes, top_k, threshold)
+        encoded["result"] = dict(result, statevector=encode_statevector(
+            amplitudes, num_qubits, statevector_format, dtype, indices=indices
+        ))
+    
+    # Per-qubit arrays of the stabilizer/MPS backends (Bloch vectors, marginals)
+    for key, value in encoded["result"].items():
+        if isinstance(value, np.ndarray):
+            encoded["result"][key] = value.tolist()
+    encoded["visualization"] = encode_visualization(
+        response["visualization"], num_qubits, statevector_format, dtype, indices=indices
+    )
+    return encoded
+
+
+def encode_sweep(result):
+    """
+    Turn the output of ParameterSweep.run into its JSON wire format.
+    
+    Args:
+        result (dict): Sweep result with NumPy arrays
+        
+    Returns:
+        dict: JSON-serializable sweep result
+    """
+    encoded = {
+        key: value.tolist() if isinstance(value, np.ndarray) else value
+        for key, value in result.items()
+    }
+    if "expectations" in result:
+        encoded["expectations"] = {
+            observable: values.tolist() for observable, values in result["expectations"].items()
+        }
+    return encoded
+
+
+def _ndarray_default(value):
+    """json.dumps hook storing NumPy arrays losslessly as base64."""
+    if isinstance(value, np.ndarray):
+        dtype = value.dtype.newbyteorder('<')
+        return {
+            "__ndarray__": base64.b64encode(np.ascontiguousarray(value, dtype=dtype).tobytes()).decode('ascii'),
+            "dtype": dtype.str,
+            "shape": list(value.shape)
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _ndarray_hook(value):
+    """json.loads hook restoring arrays written by _ndarray_default."""
+    if "__ndarray__" in value:
+        data = base64.b64decode(value["__ndarray__"])
+        return np.frombuffer(data, dtype=np.dtype(value["dtype"])).reshape(value["shape"]).copy()
+    return value
+
+
+def dumps(value):
+    """Serialize a value that may contain NumPy arrays (used by the result caches)."""
+    return json.dumps(value, default=_ndarray_default, separators=(',', ':'))
+
+
+def loads(data):
+    """Deserialize a value written by dumps()."""
+    return json.loads(data, object_hook=_ndarray_hook)
+
+
+def statevector_from_records(records):
+    """
+    Rebuild a complex array from 'records' formatted statevector data.
+    
+    Args:
+        records (list): List of {state, real, imag, probability} dicts
+        
+    Returns:
+        np.ndarray: Flat complex statevector
+    """
+    return np.array([complex(record['real'], record['imag']) for record in records], dtype=complex)
+
+
+def negotiate_statevector_format(options, accept_header):
+    """
+    Work out the statevector encoding requested by a client.
+    
+    An explicit "statevector_format" option wins; otherwise the columnar
+    format is used when the client lists COLUMNAR_MEDIA_TYPE in Accept.
+    
+    Args:
+        options (dict): Request JSON payload
+        accept_header (str): Value of the Accept header
+        
+    Returns:
+        dict: Keyword arguments for encode_response
+    
+    Raises:
+        ValueError: If the sparse mode options are out of range
+    """
+    validate_sparse_options(options.get('top_k'), options.get('threshold'))
+    statevector_format = options.get('statevector_format')
+    if statevector_format is None:
+        statevector_format = 'columnar' if COLUMNAR_MEDIA_TYPE in (accept_header or '') else 'records'
+    
+    return {
+        "statevector_format": statevector_format,
+        "dtype": options.get('dtype', 'float64'),
+        "top_k": options.get('top_k'),
+        "threshold": options.get('threshold')
+    }
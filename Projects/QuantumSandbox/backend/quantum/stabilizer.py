@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Stabilizer simulation module for QuantumSandbox.
+Simulates Clifford-only circuits with an Aaronson-Gottesman stabilizer
+tableau in polynomial time, so GHZ/Bernstein-Vazirani style circuits can
+run on hundreds of qubits.
+"""
+
+import numpy as np
+
+from .sampling import count_outcomes
+
+# Gate types the tableau engine can apply (besides terminal measurements)
+CLIFFORD_GATES = frozenset(['h', 'x', 'y', 'z', 's', 'sdg', 'cx', 'cz', 'swap'])
+
+
+def is_clifford_circuit(compiled):
+    """
+    Check whether a circuit only uses Clifford gates and measurements.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+    
+    Returns:
+        bool: True if the stabilizer engine can simulate the circuit
+    """
+    return compiled.gate_names() <= CLIFFORD_GATES | {'measure'}
+
+
+def _phase_exponent(x1, z1, x2, z2):
+    """
+    Power of i picked up when multiplying Pauli (x1, z1) by Pauli (x2, z2),
+    elementwise over qubits (the g function of Aaronson-Gottesman).
+    """
+    x1 = x1.astype(np.int8)
+    z1 = z1.astype(np.int8)
+    x2 = x2.astype(np.int8)
+    z2 = z2.astype(np.int8)
+    return np.where(
+        x1 & z1, z2 - x2,
+        np.where(x1 == 1, z2 * (2 * x2 - 1), np.where(z1 == 1, x2 * (1 - 2 * z2), 0))
+    )
+
+
+class StabilizerTableau:
+    """
+    Stabilizer tableau of an n-qubit state.
+    
+    Rows 0..n-1 are destabilizers and rows n..2n-1 stabilizers; each row is
+    a Pauli string stored as boolean x and z parts plus a sign bit r. Gates
+    update every row at once with vectorized column operations.
+    """
+    
+    def __init__(self, num_qubits):
+        """
+        Initialize the tableau of |0...0>.
+        
+        Args:
+            num_qubits (int): Number of qubits
+        """
+        self.num_qubits = num_qubits
+        self.x = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self.z = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self.r = np.zeros(2 * num_qubits, dtype=bool)
+        diagonal = np.arange(num_qubits)
+        self.x[diagonal, diagonal] = True
+        self.z[num_qubits + diagonal, diagonal] = True
+    
+    def copy(self):
+        """Return an independent copy of the tableau."""
+        tableau = StabilizerTableau.__new__(StabilizerTableau)
+        tableau.num_qubits = self.num_qubits
+        tableau.x = self.x.copy()
+        tableau.z = self.z.copy()
+        tableau.r = self.r.copy()
+        return tableau
+    
+    def h(self, qubit):
+        """Apply a Hadamard gate."""
+        self.r ^= self.x[:, qubit] & self.z[:, qubit]
+        self.x[:, qubit], self.z[:, qubit] = self.z[:, qubit].copy(), self.x[:, qubit].copy()
+    
+    def s(self, qubit):
+        """Apply a phase (S) gate."""
+        self.r ^= self.x[:, qubit] & self.z[:, qubit]
+        self.z[:, qubit] ^= self.x[:, qubit]
+    
+    def sdg(self, qubit):
+        """Apply an S-dagger gate (S followed by Z)."""
+        self.s(qubit)
+        self.pauli_z(qubit)
+    
+    def pauli_x(self, qubit):
+        """Apply a Pauli X gate."""
+        self.r ^= self.z[:, qubit]
+    
+    def pauli_y(self, qubit):
+        """Apply a Pauli Y gate."""
+        self.r ^= self.x[:, qubit] ^ self.z[:, qubit]
+    
+    def pauli_z(self, qubit):
+        """Apply a Pauli Z gate."""
+        self.r ^= self.x[:, qubit]
+    
+    def cx(self, control, target):
+        """Apply a CNOT gate."""
+        self.r ^= self.x[:, control] & self.z[:, target] & ~(self.x[:, target] ^ self.z[:, control])
+        self.x[:, target] ^= self.x[:, control]
+        self.z[:, control] ^= self.z[:, target]
+    
+    def cz(self, control, target):
+        """Apply a CZ gate (H CX H on the target)."""
+        self.h(target)
+        self.cx(control, target)
+        self.h(target)
+    
+    def swap(self, first, second):
+        """Swap two qubits."""
+        self.x[:, [first, second]] = self.x[:, [second, first]]
+        self.z[:, [first, second]] = self.z[:, [second, first]]
+    
+    def apply_operation(self, name, qubits):
+        """
+        Apply one compiled operation.
+        
+        Args:
+            name (str): Gate name, one of CLIFFORD_GATES
+            qubits (tuple): Controls followed by targets
+        """
+        single = {'h': self.h, 's': self.s, 'sdg': self.sdg,
+                  'x': self.pauli_x, 'y': self.pauli_y, 'z': self.pauli_z}
+        if name in single:
+            single[name](qubits[0])
+        else:
+            getattr(self, name)(qubits[0], qubits[1])
+    
+    def _rowsum(self, rows, source):
+        """Multiply the Pauli in row `source` into each of `rows` (vectorized)."""
+        exponent = 2 * self.r[rows].astype(np.int64) + 2 * int(self.r[source])
+        exponent += _phase_exponent(self.x[source], self.z[source], self.x[rows], self.z[rows]).sum(axis=1)
+        self.r[rows] = (exponent % 4) == 2
+        self.x[rows] ^= self.x[source]
+        self.z[rows] ^= self.z[source]
+    
+    def z_basis_distribution(self):
+        """
+        Describe the computational-basis measurement distribution.
+        
+        The outcome of measuring every qubit is uniform over an affine
+        subspace x0 + span(basis) of GF(2)^n. Gaussian elimination on the
+        X part of the stabilizers isolates the Z-only stabilizer subgroup,
+        whose signs fix the linear constraints b.z = r on outcomes b.
+        
+        Returns:
+            tuple: (x0 as bool array of length n, basis as bool array (k, n));
+            bit q of an outcome is qubit q
+        """
+        n = self.num_qubits
+        tableau = self.copy()
+        stabilizers = np.arange(n, 2 * n)
+        
+        # Eliminate X parts so the trailing stabilizer rows are Z-only
+        pivot = 0
+        for column in range(n):
+            candidates = stabilizers[pivot:][tableau.x[stabilizers[pivot:], column]]
+            if len(candidates) == 0:
+                continue
+            row = candidates[0]
+            others = stabilizers[tableau.x[stabilizers, column] & (stabilizers != row)]
+            if len(others):
+                tableau._rowsum(others, row)
+            # Move the pivot row into position
+            first = stabilizers[pivot]
+            if row != first:
+                for part in (tableau.x, tableau.z, tableau.r):
+                    part[[first, row]] = part[[row, first]]
+            pivot += 1
+        
+        constraints = tableau.z[stabilizers[pivot:]].copy()
+        signs = tableau.r[stabilizers[pivot:]].copy()
+        
+        # Solve constraints @ b = signs over GF(2)
+        pivot_columns = []
+        rank = 0
+        for column in range(n):
+            rows = np.flatnonzero(constraints[rank:, column]) + rank
+            if len(rows) == 0:
+                continue
+            row = rows[0]
+            constraints[[rank, row]] = constraints[[row, rank]]
+            signs[[rank, row]] = signs[[row, rank]]
+            others = np.flatnonzero(constraints[:, column])
+            others = others[others != rank]
+            constraints[others] ^= constraints[rank]
+            signs[others] ^= signs[rank]
+            pivot_columns.append(column)
+            rank += 1
+            if rank == len(constraints):
+                break
+        
+        x0 = np.zeros(n, dtype=bool)
+        x0[pivot_columns] = signs[:rank]
+        
+        pivot_set = set(pivot_columns)
+        free_columns = [column for column in range(n) if column not in pivot_set]
+        basis = np.zeros((len(free_columns), n), dtype=bool)
+        for index, free in enumerate(free_columns):
+            basis[index, free] = True
+            basis[index, pivot_columns] = constraints[:rank, free]
+        
+        return x0, basis
+    
+    def z_expectations(self):
+        """
+        Get <Z_q> for every qubit.
+        
+        Returns:
+            np.ndarray: Values in {-1, 0, 1}
+        """
+        x0, basis = self.z_basis_distribution()
+        random = basis.any(axis=0)
+        return np.where(random, 0.0, np.where(x0, -1.0, 1.0))
+    
+    def bloch_vectors(self):
+        """
+        Get the Bloch vector of every qubit.
+        
+        <X> and <Y> are read as <Z> after rotating all qubits with H or
+        H.Sdg, which keeps the computation polynomial.
+        
+        Returns:
+            np.ndarray: Array of shape (3, n) holding x, y and z
+        """
+        qubits = range(self.num_qubits)
+        
+        x_basis = self.copy()
+        for qubit in qubits:
+            x_basis.h(qubit)
+        
+        y_basis = self.copy()
+        for qubit in qubits:
+            y_basis.sdg(qubit)
+            y_basis.h(qubit)
+        
+        return np.array([x_basis.z_expectations(), y_basis.z_expectations(), self.z_expectations()])
+    
+    def stabilizer_strings(self):
+        """
+        Get the stabilizer generators as signed Pauli strings (qubit 0 rightmost).
+        
+        Returns:
+            list: Strings such as '+XX' or '-ZI'
+        """
+        n = self.num_qubits
+        letters = np.array(['I', 'X', 'Z', 'Y'])
+        codes = self.x[n:].astype(np.int8) + 2 * self.z[n:].astype(np.int8)
+        return [
+            ('-' if sign else '+') + ''.join(letters[row[::-1]])
+            for sign, row in zip(self.r[n:], codes)
+        ]
+
+
+def sample_stabilizer_counts(tableau, measured_qubits, shots, seed=None):
+    """
+    Sample measurement counts of a stabilizer state.
+    
+    Outcomes are drawn as x0 + (random bits) @ basis over GF(2), which is
+    vectorized over shots and never builds the 2^n distribution.
+    
+    Args:
+        tableau (StabilizerTableau): Final state
+        measured_qubits (list): Qubits that are measured
+        shots (int): Number of shots
+        seed (int): Optional seed for the random generator
+    
+    Returns:
+        dict: Counts keyed by classical bitstring (unmeasured bits read 0)
+    """
+    x0, basis = tableau.z_basis_distribution()
+    rng = np.random.default_rng(seed)
+    
+    coefficients = rng.integers(0, 2, size=(shots, len(basis)), dtype=np.int64)
+    outcomes = ((coefficients @ basis.astype(np.int64)) % 2).astype(bool) ^ x0
+    return count_outcomes(outcomes, measured_qubits)
+
+
+class StabilizerSimulator:
+    """
+    Class for simulating Clifford circuits with a stabilizer tableau.
+    """
+    
+    def run(self, compiled):
+        """
+        Compute the final stabilizer tableau of a Clifford circuit.
+        
+        Measurements must be terminal and are not applied to the state.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+        
+        Returns:
+            tuple: (StabilizerTableau, list of measured qubits)
+        """
+        non_clifford = compiled.gate_names() - CLIFFORD_GATES - {'measure'}
+        if non_clifford:
+            raise ValueError(f"Gate '{sorted(non_clifford)[0]}' is not a Clifford gate")
+        if compiled.is_dynamic:
+            raise ValueError("Mid-circuit measurement and conditional gates are not supported by the stabilizer engine")
+        
+        tableau = StabilizerTableau(compiled.num_qubits)
+        for spec, qubits, _ in compiled.operations():
+            if spec.kind != 'measure':
+                tableau.apply_operation(spec.name, qubits)
+        
+        return tableau, compiled.measured_qubits
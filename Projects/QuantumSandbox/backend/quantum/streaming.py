@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+State-evolution streaming module for QuantumSandbox.
+Simulates a circuit once and produces a snapshot of the statevector after
+every gate or layer, so the tutorial and builder pages can animate the
+evolution without one simulation request per prefix. Snapshots are delta
+encoded: each binary frame carries only the amplitudes that moved by more
+than a tolerance since the client last received them.
+
+Frame layout (little-endian, every section 4-byte aligned so browsers can
+view it with typed arrays):
+    
+    uint32 step                 snapshot number, 0 is the initial state
+    uint32 operations_applied   operations of the circuit applied so far
+    uint32 count                number of changed amplitudes
+    uint32[count] indices       basis-state indices (qubit 0 is the LSB)
+    float32[2 * count] values   interleaved real and imaginary parts
+"""
+
+import struct
+import time
+
+import numpy as np
+
+from .circuit_simulator import CircuitSimulator, NumpyStatevectorEngine
+
+FRAME_HEADER = struct.Struct('<III')
+
+GRANULARITIES = ('gate', 'layer')
+
+
+def encode_frame(step, operations_applied, indices, values):
+    """
+    Pack one delta snapshot into a binary frame.
+    
+    Args:
+        step (int): Snapshot number
+        operations_applied (int): Operations applied so far
+        indices (np.ndarray): Changed basis-state indices
+        values (np.ndarray): complex64 amplitudes at those indices
+    
+    Returns:
+        bytes: Frame in the layout of the module docstring
+    """
+    return b''.join((
+        FRAME_HEADER.pack(step, operations_applied, len(indices)),
+        np.asarray(indices, dtype='<u4').tobytes(),
+        np.asarray(values, dtype=np.complex64).view('<f4').tobytes()
+    ))
+
+
+def decode_frame(frame):
+    """
+    Unpack a binary frame (the inverse of encode_frame, used by clients and tests).
+    
+    Args:
+        frame (bytes): Binary frame
+    
+    Returns:
+        tuple: (step, operations applied, indices, complex64 values)
+    """
+    step, operations_applied, count = FRAME_HEADER.unpack_from(frame)
+    offset = FRAME_HEADER.size
+    indices = np.frombuffer(frame, dtype='<u4', count=count, offset=offset)
+    values = np.frombuffer(frame, dtype='<f4', count=2 * count, offset=offset + 4 * count).view(np.complex64)
+    return step, operations_applied, indices, values
+
+
+def evolution_steps(compiled, granularity='gate'):
+    """
+    Group the operations of a circuit into snapshot steps.
+    
+    With 'layer' granularity operations are scheduled as soon as possible
+    and each step is one layer of operations on disjoint qubits; operations
+    keep their relative order on every qubit, so the final state is the
+    same as gate by gate.
+    
+    Args:
+        compiled (CompiledCircuit): Compiled circuit
+        granularity (str): 'gate' or 'layer'
+    
+    Returns:
+        list: Steps, each a list of (spec, qubits, param) operations
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}', expected one of {', '.join(GRANULARITIES)}")
+    
+    operations = list(compiled.operations())
+    if granularity == 'gate':
+        return [[operation] for operation in operations]
+    
+    levels = [0] * compiled.num_qubits
+    layers = []
+    for operation in operations:
+        qubits = operation[1]
+        level = max(levels[qubit] for qubit in qubits) + 1
+        for qubit in qubits:
+            levels[qubit] = level
+        if level > len(layers):
+            layers.append([])
+        layers[level - 1].append(operation)
+    return layers
+
+
+class StateStreamer:
+    """
+    Class for producing delta-encoded snapshots of a circuit's state evolution.
+    
+    The state is simulated once with the NumPy engine. The amplitudes the
+    client holds are mirrored in complex64; an amplitude is resent only
+    when the simulated value differs from the mirrored one by more than
+    the tolerance, so the client's state never drifts further than that.
+    """
+    
+    MAX_QUBITS = CircuitSimulator.NUMPY_MAX_QUBITS
+    
+    def __init__(self):
+        """Initialize the streamer with its own NumPy engine."""
+        self.engine = NumpyStatevectorEngine()
+    
+    def prepare(self, compiled, granularity='gate'):
+        """
+        Check that a circuit can be streamed and split it into snapshot steps.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            granularity (str): 'gate' or 'layer'
+        
+        Returns:
+            list: Steps (see evolution_steps)
+        """
+        if compiled.num_qubits > self.MAX_QUBITS:
+            raise ValueError(f"State streaming supports at most {self.MAX_QUBITS} qubits")
+        if compiled.is_dynamic:
+            raise ValueError("Mid-circuit measurement and conditional gates are not supported by state streaming")
+        return evolution_steps(compiled, granularity)
+    
+    def frames(self, compiled, steps, tolerance=1e-6):
+        """
+        Simulate a circuit and yield one binary frame per step.
+        
+        The generator is lazy: the next step is only simulated when the
+        caller asks for the next frame, so a paused consumer pauses the
+        simulation instead of buffering frames.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit
+            steps (list): Steps from prepare
+            tolerance (float): Smallest amplitude change that is sent
+        
+        Yields:
+            bytes: len(steps) + 1 frames (see encode_frame); the first one
+            is the initial state
+        """
+        num_qubits = compiled.num_qubits
+        state = np.zeros((2,) * num_qubits, dtype=complex)
+        state[(0,) * num_qubits] = 1
+        client_state = np.zeros(2 ** num_qubits, dtype=np.complex64)
+        
+        applied = 0
+        for step in range(len(steps) + 1):
+            if step:
+                for spec, qubits, param in steps[step - 1]:
+                    if spec.kind != 'measure':
+                        state = self.engine.apply_operation(
+                            state, spec, qubits, compiled.matrix(spec, param) if spec.kind == 'single' else None)
+                applied += len(steps[step - 1])
+            
+            flat = state.reshape(-1)
+            changed = np.flatnonzero(np.abs(flat - client_state) > tolerance)
+            values = flat[changed].astype(np.complex64)
+            client_state[changed] = values
+            yield encode_frame(step, applied, changed, values)
+
+
+class CreditWindow:
+    """
+    Client-driven flow control for a stream of frames.
+    
+    The client grants credits (frames it is ready to receive) when it
+    starts the stream and whenever it has processed frames. The server
+    sends while it has credits and otherwise waits for the next grant, so
+    a slow client throttles the simulation rather than the server queuing
+    frames for it.
+    """
+    
+    def __init__(self, credits, timeout):
+        """
+        Initialize the window.
+        
+        Args:
+            credits (int): Initial number of credits
+            timeout (float): Seconds to wait for a grant before giving up
+        """
+        self.credits = max(1, int(credits))
+        self.timeout = timeout
+        self.cancelled = False
+    
+    def acquire(self, receive):
+        """
+        Take one credit, waiting for client messages while there are none.
+        
+        Pending messages are read first, so a cancel is noticed even while
+        credits are left.
+        
+        Args:
+            receive (callable): receive(timeout) -> control message dict, or
+                None when nothing arrived within timeout seconds
+        
+        Returns:
+            bool: True if a frame may be sent, False if the client cancelled
+            or did not grant credits in time
+        """
+        deadline = time.monotonic() + self.timeout
+        wait = 0
+        while True:
+            message = receive(wait)
+            if message is not None:
+                self.handle(message)
+                wait = 0
+                continue
+            if self.cancelled:
+                return False
+            if self.credits > 0:
+                self.credits -= 1
+                return True
+            wait = deadline - time.monotonic()
+            if wait <= 0:
+                return False
+    
+    def handle(self, message):
+        """
+        Apply a client control message.
+        
+        Args:
+            message (dict): {"type": "ack", "frames": k} grants k credits;
+                {"type": "cancel"} stops the stream
+        """
+        if message.get("type") == "cancel":
+            self.cancelled = True
+        elif message.get("type") == "ack":
+            self.credits += max(0, int(message.get("frames", 1)))
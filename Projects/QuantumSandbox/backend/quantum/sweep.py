@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parameter sweep module for QuantumSandbox.
+Evaluates a circuit with symbolic rotation angles over a grid or list of
+parameter values in one batched statevector computation, instead of one
+simulation request per point.
+"""
+
+import itertools
+
+import numpy as np
+
+from .circuit_simulator import CircuitSimulator, NumpyStatevectorEngine
+from .observables import pauli_expectations
+
+
+def sweep_values(parameters, grid=None, points=None):
+    """
+    Expand a sweep specification into one value array per parameter.
+    
+    Args:
+        parameters (tuple): Parameter names of the circuit
+        grid (dict): Name -> list of values, or {"start", "stop", "num"}
+            for evenly spaced values; every combination is evaluated
+        points (list): Explicit points, each a dict of name -> value
+    
+    Returns:
+        dict: Name -> np.ndarray of B values
+    """
+    if (grid is None) == (points is None):
+        raise ValueError("A sweep needs exactly one of 'grid' or 'points'")
+    
+    if points is not None:
+        try:
+            return {name: np.array([point[name] for point in points], dtype=float) for name in parameters}
+        except KeyError as e:
+            raise ValueError(f"Sweep point is missing parameter {e.args[0]}")
+    
+    axes = []
+    for name in parameters:
+        if name not in grid:
+            raise ValueError(f"Sweep grid is missing parameter '{name}'")
+        values = grid[name]
+        if isinstance(values, dict):
+            values = np.linspace(values['start'], values['stop'], int(values.get('num', 50)))
+        axes.append(np.asarray(values, dtype=float))
+    
+    mesh = np.meshgrid(*axes, indexing='ij') if axes else []
+    return {name: values.ravel() for name, values in zip(parameters, mesh)}
+
+
+def marginal_probabilities(probabilities, measured_qubits, num_qubits):
+    """
+    Sum batched probabilities over the unmeasured qubits.
+    
+    Args:
+        probabilities (np.ndarray): Array of shape (B, 2**n)
+        measured_qubits (list): Qubits that are measured
+        num_qubits (int): Number of qubits
+    
+    Returns:
+        tuple: (bitstring labels with unmeasured bits read 0, as in counts;
+        np.ndarray of shape (B, 2**k))
+    """
+    measured = sorted(measured_qubits, reverse=True)
+    tensor = probabilities.reshape((len(probabilities),) + (2,) * num_qubits)
+    unmeasured = tuple(1 + num_qubits - 1 - qubit for qubit in range(num_qubits) if qubit not in measured)
+    marginals = tensor.sum(axis=unmeasured).reshape(len(probabilities), -1)
+    
+    labels = []
+    for bits in itertools.product((0, 1), repeat=len(measured)):
+        index = sum(bit << qubit for bit, qubit in zip(bits, measured))
+        labels.append(format(index, f'0{num_qubits}b'))
+    return labels, marginals
+
+
+class ParameterSweep:
+    """
+    Class for evaluating parametrized circuits over many parameter points.
+    """
+    
+    MAX_QUBITS = CircuitSimulator.NUMPY_MAX_QUBITS
+    MAX_POINTS = 100000
+    
+    # Points are evaluated in chunks holding at most this many amplitudes
+    MAX_BATCH_AMPLITUDES = 2 ** 22
+    
+    # Statevectors alive per point of a chunk: the batch, the engine's output
+    # and the squared magnitudes
+    CHUNK_COPIES = 3
+    
+    def __init__(self):
+        """Initialize the sweep with its own NumPy engine."""
+        self.engine = NumpyStatevectorEngine()
+    
+    def chunk_size(self, num_qubits):
+        """Number of points evaluated together on a circuit of num_qubits qubits."""
+        return max(1, self.MAX_BATCH_AMPLITUDES >> num_qubits)
+    
+    def cost(self, num_qubits, num_points, probabilities=True):
+        """
+        Describe the statevector work of a sweep for the admission cost model.
+        
+        Args:
+            num_qubits (int): Number of qubits
+            num_points (int): Number of parameter points
+            probabilities (bool): Whether the distributions are returned
+        
+        Returns:
+            dict: "copies" of a statevector alive at once and "repeats", the
+            number of statevectors simulated (see CostModel.estimate)
+        """
+        copies = self.CHUNK_COPIES * min(num_points, self.chunk_size(num_qubits))
+        if probabilities:
+            # Every point's distribution is kept, then concatenated into the result
+            copies += num_points
+        return {"copies": copies, "repeats": num_points}
+    
+    def run(self, compiled, values, observables=None, probabilities=True):
+        """
+        Evaluate a compiled circuit at every parameter point.
+        
+        Args:
+            compiled (CompiledCircuit): Compiled circuit with symbolic parameters
+            values (dict): Name -> np.ndarray of B values (see sweep_values)
+            observables (list): Optional Pauli strings to evaluate
+            probabilities (bool): Whether to return the measured-qubit distribution
+        
+        Returns:
+            dict: Parameter names and points, plus per-point probabilities
+            (with their labels) and/or expectation values
+        """
+        num_qubits = compiled.num_qubits
+        if num_qubits > self.MAX_QUBITS:
+            raise ValueError(f"Parameter sweeps support at most {self.MAX_QUBITS} qubits")
+        
+        num_points = len(next(iter(values.values()))) if values else 1
+        if num_points > self.MAX_POINTS:
+            raise ValueError(f"Parameter sweeps support at most {self.MAX_POINTS} points")
+        chunk = self.chunk_size(num_qubits)
+        measured = compiled.measured_qubits or list(range(num_qubits))
+        
+        labels = None
+        chunks = {"probabilities": [], "expectations": []}
+        for start in range(0, num_points, chunk):
+            chunk_values = {name: array[start:start + chunk] for name, array in values.items()}
+            states = self.engine.run_batch(compiled, chunk_values)
+            if probabilities:
+                labels, marginals = marginal_probabilities(np.abs(states) ** 2, measured, num_qubits)
+                chunks["probabilities"].append(marginals)
+            if observables:
+                chunks["expectations"].append(dict(zip(observables, pauli_expectations(states, observables, num_qubits))))
+        
+        result = {
+            "parameters": list(compiled.parameters),
+            "points": np.column_stack([values[name] for name in compiled.parameters]) if values else np.zeros((1, 0)),
+            "num_points": num_points
+        }
+        if probabilities:
+            result["labels"] = labels
+            result["probabilities"] = np.concatenate(chunks["probabilities"])
+        if observables:
+            result["expectations"] = {
+                observable: np.concatenate([chunk_result[observable] for chunk_result in chunks["expectations"]])
+                for observable in observables
+            }
+        return result
@@ -7,13 +7,15 @@ Provides functionality to visualize quantum states and measurement results.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from qiskit.visualization import plot_bloch_multivector, plot_state_city
-from qiskit.quantum_info import Statevector
 import io
 import base64
 import json
 
+from .serialization import statevector_from_records
+
+# matplotlib and qiskit.visualization are only needed for the image helpers
+# and are imported there, keeping them out of the server's startup path.
+
 class StateVisualizer:
     """
     Class for visualizing quantum states and measurement results.
@@ -27,6 +29,9 @@ class StateVisualizer:
         """
         Generate visualization data for a simulation result.
         
+        All data is computed with vectorized NumPy on the raw amplitude array
+        and returned as arrays; quantum.serialization formats it for JSON.
+        
         Args:
             simulation_result (dict): Simulation result from CircuitSimulator
             
@@ -34,137 +39,122 @@ class StateVisualizer:
             dict: Visualization data
         """
         # Extract data from simulation result
-        statevector_data = simulation_result.get('statevector', [])
+        amplitudes = simulation_result.get('statevector', [])
         counts = simulation_result.get('counts', {})
         num_qubits = simulation_result.get('num_qubits', 1)
         
+        if amplitudes is None:
+            # Stabilizer and MPS results carry Bloch vectors instead of a statevector
+            return self._generate_local_visualization(simulation_result, counts, num_qubits)
+        
+        if len(amplitudes) and isinstance(amplitudes[0], dict):
+            # Legacy list-of-records statevector
+            amplitudes = statevector_from_records(amplitudes)
+        amplitudes = np.asarray(amplitudes)
+        if amplitudes.dtype != np.complex64:
+            # Single-precision results stay single precision
+            amplitudes = amplitudes.astype(complex, copy=False)
+        
         # Generate visualization data
         visualization = {
-            "probability_data": self._generate_probability_data(statevector_data),
-            "bloch_data": self._generate_bloch_data(statevector_data, num_qubits),
-            "phase_data": self._generate_phase_data(statevector_data),
+            "probability_data": self._generate_probability_data(amplitudes),
+            "bloch_data": self._generate_bloch_data(amplitudes, num_qubits),
+            "phase_data": self._generate_phase_data(amplitudes),
             "histogram_data": self._generate_histogram_data(counts)
         }
         
         return visualization
     
-    def _generate_probability_data(self, statevector_data):
+    def _generate_local_visualization(self, simulation_result, counts, num_qubits):
         """
-        Generate probability data for bar charts.
+        Generate visualization data for a result without a statevector.
         
         Args:
-            statevector_data (list): Statevector data from simulation result
+            simulation_result (dict): Result with a "bloch_vectors" (3, n) array
+            counts (dict): Measurement counts
+            num_qubits (int): Number of qubits in the circuit
             
         Returns:
-            dict: Probability data for visualization
+            dict: Visualization data without statevector-based charts
         """
-        labels = []
-        probabilities = []
-        
-        for state_data in statevector_data:
-            labels.append(state_data['state'])
-            probabilities.append(state_data['probability'])
+        bloch = simulation_result.get('bloch_vectors', np.zeros((3, num_qubits)))
+        return {
+            "probability_data": None,
+            "bloch_data": {
+                "qubits": np.arange(num_qubits),
+                "x": bloch[0],
+                "y": bloch[1],
+                "z": bloch[2]
+            },
+            "phase_data": None,
+            "histogram_data": self._generate_histogram_data(counts)
+        }
+    
+    def _generate_probability_data(self, amplitudes):
+        """
+        Generate probability data for bar charts.
         
+        Args:
+            amplitudes (np.ndarray): Flat complex statevector
+            
+        Returns:
+            dict: Probabilities indexed by basis state (labels are implied)
+        """
         return {
-            "labels": labels,
-            "probabilities": probabilities
+            "probabilities": np.abs(amplitudes) ** 2
         }
     
-    def _generate_bloch_data(self, statevector_data, num_qubits):
+    def _generate_bloch_data(self, amplitudes, num_qubits):
         """
-        Generate Bloch sphere data for single-qubit states.
+        Generate Bloch sphere data for every qubit.
+        
+        Each qubit's Bloch vector is read from its reduced density matrix,
+        obtained by a vectorized partial trace over all other qubits. The
+        statevector is viewed (without copying) as a (2^(n-1-q), 2, 2^q)
+        tensor so that one einsum per qubit gives the 2x2 matrix rho, and
+        x = 2 Re(rho01), y = -2 Im(rho01), z = rho00 - rho11. Vectors of
+        entangled qubits are shorter than 1.
         
         Args:
-            statevector_data (list): Statevector data from simulation result
+            amplitudes (np.ndarray): Flat complex statevector
             num_qubits (int): Number of qubits in the circuit
             
         Returns:
-            list: Bloch sphere data for each qubit
-        """
-        # For multi-qubit states, we need to calculate the reduced density matrix
-        # for each qubit to visualize on the Bloch sphere
-        
-        # This is a simplified version that works for pure states
-        # In a real implementation, we would use partial trace operations
-        
-        bloch_data = []
-        
-        # Only generate Bloch data if we have a reasonable number of qubits
-        if num_qubits <= 5:
-            for qubit_idx in range(num_qubits):
-                # Calculate expectation values of Pauli operators
-                x_exp = 0
-                y_exp = 0
-                z_exp = 0
-                
-                for state_data in statevector_data:
-                    binary = state_data['state']
-                    if len(binary) != num_qubits:
-                        continue
-                        
-                    amplitude = complex(state_data['real'], state_data['imag'])
-                    prob = state_data['probability']
-                    
-                    # This is a simplified calculation
-                    # A proper implementation would use the density matrix
-                    if binary[qubit_idx] == '0':
-                        z_exp += prob
-                    else:
-                        z_exp -= prob
-                
-                # In a simplified model, we'll just use the z-expectation
-                # and set x and y to small random values for visualization
-                # In a real implementation, these would be properly calculated
-                x_exp = np.random.uniform(-0.1, 0.1) if z_exp != 1 and z_exp != -1 else 0
-                y_exp = np.random.uniform(-0.1, 0.1) if z_exp != 1 and z_exp != -1 else 0
-                
-                # Normalize the vector
-                norm = np.sqrt(x_exp**2 + y_exp**2 + z_exp**2)
-                if norm > 0:
-                    x_exp /= norm
-                    y_exp /= norm
-                    z_exp /= norm
-                
-                bloch_data.append({
-                    "qubit": qubit_idx,
-                    "x": float(x_exp),
-                    "y": float(y_exp),
-                    "z": float(z_exp)
-                })
-        
-        return bloch_data
+            dict: Arrays of qubit indices and x, y, z Bloch coordinates
+        """
+        bloch = np.zeros((3, num_qubits))
+        conjugate = amplitudes.conj()
+        
+        for qubit in range(num_qubits):
+            shape = (2 ** (num_qubits - 1 - qubit), 2, 2 ** qubit)
+            rho = np.einsum('aib,ajb->ij', amplitudes.reshape(shape), conjugate.reshape(shape))
+            bloch[:, qubit] = (2 * rho[0, 1].real, -2 * rho[0, 1].imag, (rho[0, 0] - rho[1, 1]).real)
+        
+        return {
+            "qubits": np.arange(num_qubits),
+            "x": bloch[0],
+            "y": bloch[1],
+            "z": bloch[2]
+        }
     
-    def _generate_phase_data(self, statevector_data):
+    def _generate_phase_data(self, amplitudes):
         """
         Generate phase data for visualization.
         
         Args:
-            statevector_data (list): Statevector data from simulation result
+            amplitudes (np.ndarray): Flat complex statevector
             
         Returns:
-            dict: Phase data for visualization
-        """
-        states = []
-        phases = []
-        magnitudes = []
-        
-        for state_data in statevector_data:
-            if state_data['probability'] > 0.001:  # Only include non-zero amplitudes
-                states.append(state_data['state'])
-                
-                # Calculate phase in degrees
-                real = state_data['real']
-                imag = state_data['imag']
-                phase = np.angle(complex(real, imag)) * 180 / np.pi
-                phases.append(float(phase))
-                
-                # Calculate magnitude
-                magnitudes.append(float(np.sqrt(state_data['probability'])))
+            dict: Indices, phases (degrees) and magnitudes of non-zero amplitudes
+        """
+        magnitudes = np.abs(amplitudes)
+        # Only include non-zero amplitudes
+        indices = np.flatnonzero(magnitudes ** 2 > 0.001)
         
         return {
-            "states": states,
-            "phases": phases,
-            "magnitudes": magnitudes
+            "indices": indices,
+            "phases": np.degrees(np.angle(amplitudes[indices])),
+            "magnitudes": magnitudes[indices]
         }
     
     def _generate_histogram_data(self, counts):
@@ -200,6 +190,10 @@ class StateVisualizer:
         Returns:
             str: Base64-encoded image
         """
+        import matplotlib.pyplot as plt
+        from qiskit.visualization import plot_bloch_multivector
+        from qiskit.quantum_info import Statevector
+        
         # Convert to Qiskit Statevector format
         amplitudes = []
         for state_data in statevector:
@@ -232,6 +226,10 @@ class StateVisualizer:
         Returns:
             str: Base64-encoded image
         """
+        import matplotlib.pyplot as plt
+        from qiskit.visualization import plot_state_city
+        from qiskit.quantum_info import Statevector
+        
         # Convert to Qiskit Statevector format
         amplitudes = []
         for state_data in statevector:
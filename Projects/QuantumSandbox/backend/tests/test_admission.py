@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for cost-based admission control.
+Covers the run, queue, reroute and reject decisions of
+AdmissionController, the runtime calibration report and the 413/202
+answers of /api/simulate and of the sweep, expectation, gradient and
+stream endpoints.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+os.environ.setdefault('WARMUP', '0')
+
+import app as backend_app
+from quantum.admission import QUEUE, REJECT, RUN, AdmissionController, CostModel
+from quantum.circuit_simulator import CircuitSimulator
+from quantum.gradients import AdjointGradient
+from quantum.ir import compile_circuit
+from quantum.jobs import DONE
+from quantum.result_cache import ResultCache
+
+
+def clifford_circuit(num_qubits):
+    """GHZ preparation followed by measuring every qubit."""
+    gates = [{"type": "h", "targets": [0]}]
+    gates += [{"type": "cx", "controls": [qubit], "targets": [qubit + 1]} for qubit in range(num_qubits - 1)]
+    gates += [{"type": "measure", "targets": [qubit]} for qubit in range(num_qubits)]
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def rotation_circuit(num_qubits):
+    """Product state of single-qubit rotations (non-Clifford, bond dimension 1)."""
+    gates = [{"type": "rx", "targets": [qubit], "theta": 0.1 * (qubit + 1)} for qubit in range(num_qubits)]
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def controller(**limits):
+    """Controller with explicit limits, independent of the environment."""
+    limits = dict({"max_memory_bytes": 2 ** 30, "max_sync_seconds": 10, "max_job_seconds": 3600}, **limits)
+    return AdmissionController(CircuitSimulator(), **limits)
+
+
+def test_small_circuit_runs_synchronously():
+    decision = controller().admit(clifford_circuit(4), 1024)
+    assert decision["action"] == RUN
+    assert decision["backend"] == 'numpy'
+    assert "reason" not in decision
+    assert decision["estimate"]["memory_bytes"] == 4 * 2 ** 4 * 16
+
+
+def test_single_precision_halves_the_memory_estimate():
+    admission = controller()
+    double = admission.admit(rotation_circuit(10), 0, 'numpy')["estimate"]
+    single = admission.admit(rotation_circuit(10), 0, 'numpy', dtype='complex64')["estimate"]
+    assert single["memory_bytes"] * 2 == double["memory_bytes"]
+
+
+def test_explicit_backend_over_the_memory_limit_is_rejected():
+    decision = controller(max_memory_bytes=10000).admit(clifford_circuit(12), 100, 'numpy')
+    assert decision["action"] == REJECT
+    assert decision["backend"] == 'numpy'
+    assert "exceeds the limit" in decision["reason"]
+
+
+@pytest.mark.parametrize('compiled, expected', [
+    (clifford_circuit(12), 'stabilizer'),
+    (rotation_circuit(12), 'mps')
+], ids=['clifford', 'non-clifford'])
+def test_auto_backend_is_rerouted_when_it_does_not_fit(compiled, expected):
+    decision = controller(max_memory_bytes=10000).admit(compiled, 10)
+    assert decision["action"] == RUN
+    assert decision["backend"] == expected
+    assert decision["estimate"]["backend"] == expected
+    assert decision["estimate"]["memory_bytes"] <= 10000
+    assert f"rerouted to the {expected} backend" in decision["reason"]
+
+
+def branching_circuit(num_qubits, num_measurements):
+    """Circuit whose measurements all feed into later gates."""
+    gates = []
+    for _ in range(num_measurements):
+        gates += [{"type": "h", "targets": [0]}, {"type": "measure", "targets": [0]}]
+    gates.append({"type": "x", "targets": [0]})
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def test_dynamic_circuit_with_many_branches_is_rerouted_to_aer():
+    decision = controller(max_memory_bytes=10000).admit(branching_circuit(4, 10), 10)
+    assert decision["action"] == RUN
+    assert decision["backend"] == 'aer'
+    assert "rerouted to the aer backend" in decision["reason"]
+
+
+def test_dynamic_circuit_has_no_fallback_beyond_aer():
+    decision = controller(max_memory_bytes=10000).admit(branching_circuit(12, 1), 10)
+    assert decision["action"] == REJECT
+    assert decision["backend"] == 'numpy'
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'aer', 'out_of_core'])
+def test_statevectors_too_large_to_price_are_rejected(backend):
+    decision = controller().admit(rotation_circuit(2000), 100, backend)
+    assert decision["action"] == REJECT
+    assert decision["estimate"] is None
+    assert "2000-qubit statevector" in decision["reason"]
+
+
+def test_statevectors_too_large_to_price_fall_back_on_auto():
+    admission = controller()
+    decision = admission.admit(clifford_circuit(2000), 100, 'numpy')
+    assert decision["action"] == REJECT
+    assert admission.admit(clifford_circuit(2000), 100)["backend"] == 'stabilizer'
+    assert admission.admit(rotation_circuit(2100), 100)["backend"] == 'mps'
+
+
+def test_extra_copies_and_repeats_scale_the_estimate():
+    admission = controller()
+    single = admission.admit(rotation_circuit(10), 0, 'numpy')["estimate"]
+    gradient = admission.admit(rotation_circuit(10), 0, 'numpy', copies=5, repeats=3)["estimate"]
+    assert gradient["memory_bytes"] == 5 * 2 ** 10 * 16
+    overhead = CostModel.SECONDS_PER_REQUEST['numpy']
+    assert gradient["runtime_seconds"] - overhead == pytest.approx(3 * (single["runtime_seconds"] - overhead))
+
+
+def test_slow_requests_are_queued_unless_already_asynchronous():
+    admission = controller(max_sync_seconds=1e-6)
+    queued = admission.admit(rotation_circuit(4), 100)
+    assert queued["action"] == QUEUE
+    assert "too long for a synchronous request" in queued["reason"]
+    assert admission.admit(rotation_circuit(4), 100, asynchronous=True)["action"] == RUN
+
+
+def test_requests_over_the_job_limit_are_rejected():
+    decision = controller(max_sync_seconds=1e-7, max_job_seconds=1e-6).admit(rotation_circuit(4), 100,
+                                                                            asynchronous=True)
+    assert decision["action"] == REJECT
+    assert "Predicted runtime" in decision["reason"]
+
+
+def test_calibration_tracks_actual_over_predicted_runtime():
+    admission = controller()
+    estimate = admission.admit(rotation_circuit(4), 100)["estimate"]
+    report = admission.record(estimate, estimate["runtime_seconds"] * 4)
+    admission.record(estimate, estimate["runtime_seconds"])
+    assert report["runtime_ratio"] == pytest.approx(4)
+    calibration = admission.stats()["calibration"]["numpy"]
+    assert calibration == {"samples": 2, "runtime_factor": pytest.approx(2)}
+
+
+@pytest.fixture
+def client():
+    return backend_app.app.test_client()
+
+
+def test_simulate_rejects_with_413(client):
+    payload = {"circuit": {"qubits": 40, "gates": [{"type": "h", "targets": [0]}]}, "backend": "numpy", "seed": 1}
+    response = client.post('/api/simulate', json=payload)
+    assert response.status_code == 413
+    assert response.get_json()["estimate"]["backend"] == 'numpy'
+
+
+def test_simulate_queues_slow_requests_with_202(client, monkeypatch):
+    monkeypatch.setattr(backend_app.admission_controller, 'max_sync_seconds', 1e-9)
+    payload = {"circuit": {"qubits": 2, "gates": [{"type": "h", "targets": [1]}]}, "shots": 16, "seed": 31337}
+    response = client.post('/api/simulate', json=payload)
+    assert response.status_code == 202
+    assert response.headers['Location'] == f"/api/jobs/{response.get_json()['job_id']}"
+
+
+def test_simulate_reports_predicted_and_actual_cost(client):
+    payload = {"circuit": {"qubits": 2, "gates": [{"type": "h", "targets": [0]}]}, "shots": 16, "seed": 4242}
+    cost = client.post('/api/simulate', json=payload).get_json()["result"]["cost"]
+    assert cost["predicted"]["backend"] == 'numpy'
+    assert cost["actual"]["runtime_seconds"] > 0
+
+
+def test_simulate_rejects_huge_statevectors_with_413(client):
+    payload = {"circuit": {"qubits": 2000, "gates": [{"type": "h", "targets": [0]}]}, "backend": "numpy", "seed": 1}
+    response = client.post('/api/simulate', json=payload)
+    assert response.status_code == 413
+    assert response.get_json()["estimate"] is None
+
+
+GRADIENT = {
+    "circuit": {"qubits": 10, "gates": [{"type": "ry", "targets": [0], "theta": "alpha"}]},
+    "observables": ["IIIIIIIIIZ"],
+    "point": {"alpha": 0.3}
+}
+EXPECTATION = {
+    "circuit": {"qubits": 10, "gates": [{"type": "ry", "targets": [0], "theta": 0.3}]},
+    "observables": ["IIIIIIIIIZ"]
+}
+
+
+def test_gradient_counts_its_extra_statevectors(client, monkeypatch):
+    # Room for four statevectors: enough for an expectation value, not for a gradient
+    monkeypatch.setattr(backend_app.admission_controller, 'max_memory_bytes', 4 * 2 ** 10 * 16)
+    response = client.post('/api/gradient', json=GRADIENT)
+    assert response.status_code == 413
+    assert response.get_json()["estimate"]["memory_bytes"] == AdjointGradient.STATEVECTOR_COPIES * 2 ** 10 * 16
+    assert client.post('/api/expectation', json=EXPECTATION).status_code == 200
+
+
+def test_sweep_counts_one_statevector_per_point(client, monkeypatch):
+    payload = {"circuit": GRADIENT["circuit"], "grid": {"alpha": {"start": 0, "stop": 1, "num": 64}}}
+    # The chunk holds three statevectors per point, and the distributions one more
+    monkeypatch.setattr(backend_app.admission_controller, 'max_memory_bytes', 200 * 2 ** 10 * 16)
+    assert client.post('/api/sweep', json=payload).status_code == 413
+    assert client.post('/api/sweep', json=dict(payload, probabilities=False)).status_code == 200
+
+
+@pytest.mark.parametrize('endpoint, payload', [
+    ('/api/expectation', EXPECTATION),
+    ('/api/gradient', GRADIENT),
+    ('/api/sweep', {"circuit": GRADIENT["circuit"], "points": [{"alpha": 0.1}], "observables": ["IIIIIIIIIZ"]})
+])
+def test_slow_computations_are_queued_with_202(client, monkeypatch, endpoint, payload):
+    monkeypatch.setattr(backend_app.admission_controller, 'max_sync_seconds', 1e-9)
+    monkeypatch.setattr(backend_app, 'result_cache', ResultCache())
+    response = client.post(endpoint, json=payload)
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    
+    deadline = time.time() + 30
+    status = client.get(f'/api/jobs/{job_id}').get_json()
+    while status["status"] != DONE:
+        assert time.time() < deadline and status["error"] is None
+        time.sleep(0.01)
+        status = client.get(f'/api/jobs/{job_id}').get_json()
+    assert status["kind"] == endpoint.rsplit('/', 1)[1]
+    
+    # The job cached its result, which is then sent without admission
+    cached = client.post(endpoint, json=payload)
+    assert cached.status_code == 200
+    assert status["result"] == cached.get_json()
+
+
+class FakeWebSocket:
+    """WebSocket double holding the request message and the sent messages."""
+    
+    def __init__(self, message):
+        self.messages = [json.dumps(message)]
+        self.sent = []
+    
+    def receive(self, timeout=None):
+        return self.messages.pop(0) if self.messages else None
+    
+    def send(self, data):
+        self.sent.append(data)
+
+
+def test_stream_is_refused_when_it_would_not_run(monkeypatch):
+    monkeypatch.setattr(backend_app.admission_controller, 'max_memory_bytes', 1)
+    ws = FakeWebSocket({"circuit": {"qubits": 2, "gates": [{"type": "h", "targets": [0]}]}})
+    backend_app.app.view_functions['stream_state_evolution'].__wrapped__(ws)
+    assert len(ws.sent) == 1
+    message = json.loads(ws.sent[0])
+    assert message["type"] == 'error' and "exceeds the limit" in message["error"]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for batch simulation.
+The /api/simulate/batch endpoint must simulate each distinct request once,
+skip requests already in the result cache and answer in request order;
+the worker pool itself is exercised with one spawned process.
+"""
+
+import json
+import os
+from concurrent.futures import Future
+
+import pytest
+
+os.environ.setdefault('WARMUP', '0')
+
+import app as backend_app
+from quantum.batch import SimulationPool
+from quantum.ir import compile_circuit
+from quantum.result_cache import ResultCache
+
+BELL = {"qubits": 2, "gates": [{"type": "h", "targets": [0]}, {"type": "cx", "controls": [0], "targets": [1]}]}
+GHZ = {"qubits": 3, "gates": [{"type": "h", "targets": [0]}, {"type": "cx", "controls": [0], "targets": [1, 2]}]}
+
+
+class InlinePool:
+    """Pool double that simulates in this process and records every submission."""
+    
+    def __init__(self):
+        self.submitted = []
+    
+    def submit(self, compiled, shots=1024, backend='auto', seed=None, backend_options=None, optimize=True, **options):
+        self.submitted.append(compiled.digest)
+        result = backend_app.circuit_simulator.simulate(compiled, shots, backend=backend, seed=seed,
+                                                        options=backend_options, optimize=optimize, **options)
+        future = Future()
+        future.set_result({
+            "result": result,
+            "visualization": backend_app.state_visualizer.generate_visualization(result),
+            "runtime_seconds": 0.0
+        })
+        return future
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Inline pool and an empty result cache behind the batch endpoint."""
+    pool = InlinePool()
+    monkeypatch.setattr(backend_app, 'simulation_pool', pool)
+    monkeypatch.setattr(backend_app, 'result_cache', ResultCache())
+    return pool
+
+
+@pytest.fixture
+def client():
+    """Flask test client of the backend app."""
+    return backend_app.app.test_client()
+
+
+def test_identical_requests_are_simulated_once(client, pool):
+    payload = {"shots": 100, "requests": [
+        {"circuit": BELL, "seed": 1},
+        {"circuit": GHZ, "seed": 1},
+        {"circuit": {"qubits": 2, "gates": [{"type": "bogus", "targets": [0]}]}},
+        {"circuit": BELL, "seed": 1},
+        {"seed": 3}
+    ]}
+    response = client.post('/api/simulate/batch', json=payload)
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    
+    assert len(pool.submitted) == 2
+    assert [entry["index"] for entry in results] == [0, 1, 2, 3, 4]
+    assert "error" in results[2] and "error" in results[4]
+    assert results[0]["result"] == results[3]["result"]
+    assert results[0]["result_id"] == results[3]["result_id"] != results[1]["result_id"]
+    assert sum(results[1]["result"]["counts"].values()) == 100
+
+
+def test_cached_requests_are_not_resubmitted(client, pool):
+    payload = {"requests": [{"circuit": BELL, "seed": 4, "shots": 50}]}
+    first = client.post('/api/simulate/batch', json=payload).get_json()
+    second = client.post('/api/simulate/batch', json=payload).get_json()
+    assert len(pool.submitted) == 1
+    assert first == second
+
+
+def test_unseeded_requests_are_not_deduplicated(client, pool):
+    payload = {"requests": [{"circuit": BELL, "shots": 50}, {"circuit": BELL, "shots": 50}]}
+    results = client.post('/api/simulate/batch', json=payload).get_json()["results"]
+    client.post('/api/simulate/batch', json=payload)
+    assert len(pool.submitted) == 4
+    assert results[0]["result_id"] != results[1]["result_id"]
+
+
+def test_only_seeded_simulations_are_cached(client, pool, monkeypatch):
+    calls = []
+    simulate = backend_app.circuit_simulator.simulate
+    monkeypatch.setattr(backend_app.circuit_simulator, 'simulate',
+                        lambda *args, **kwargs: calls.append(kwargs['seed']) or simulate(*args, **kwargs))
+    
+    unseeded = [client.post('/api/simulate', json={"circuit": BELL, "shots": 50}).get_json() for _ in range(2)]
+    assert calls == [None, None]
+    assert unseeded[0]["result_id"] != unseeded[1]["result_id"]
+    assert backend_app.result_cache.get(unseeded[1]["result_id"]) is not None
+    
+    seeded = [client.post('/api/simulate', json={"circuit": BELL, "shots": 50, "seed": 5}).get_json()
+              for _ in range(2)]
+    assert calls == [None, None, 5]
+    assert seeded[0] == seeded[1]
+
+
+def test_streaming_writes_one_json_line_per_request(client, pool):
+    payload = {"stream": True, "requests": [{"circuit": BELL, "seed": 2}, {"circuit": BELL, "seed": 2}, {}]}
+    response = client.post('/api/simulate/batch', json=payload)
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert len(pool.submitted) == 1
+
+
+def test_worker_process_simulates():
+    pool = SimulationPool(max_workers=1)
+    try:
+        response = pool.submit(compile_circuit(GHZ), shots=200, backend='numpy', seed=7).result(timeout=120)
+    finally:
+        pool.shutdown()
+    assert set(response["result"]["counts"]) <= {'000', '111'}
+    assert sum(response["result"]["counts"].values()) == 200
+    assert "visualization" in response
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for branching simulation of dynamic circuits.
+Small circuits with mid-circuit measurements and c_if gates are compared
+against an exact reference that follows every measurement outcome of
+every shot separately, one state per outcome history, without merging.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.algorithm_library import AlgorithmLibrary
+from quantum.branching import BranchingSimulator, branching_measurements
+from quantum.circuit_simulator import CircuitSimulator, NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+
+ENGINE = NumpyStatevectorEngine()
+
+TELEPORTATION = AlgorithmLibrary().algorithms['teleportation']['circuit_def']
+
+
+def exact_register_distribution(circuit_def):
+    """
+    Probability of every final classical register (bit q is the last
+    measurement of qubit q), by enumerating all measurement outcomes.
+    """
+    compiled = compile_circuit(circuit_def)
+    num_qubits = compiled.num_qubits
+    branches = [(np.eye(1, 2 ** num_qubits, dtype=complex).reshape((2,) * num_qubits), 1.0, 0)]
+    for (spec, qubits, param), condition in zip(compiled.operations(), compiled.conditions()):
+        children = []
+        for state, weight, record in branches:
+            if spec.kind == 'measure':
+                axis = num_qubits - 1 - qubits[0]
+                for outcome in (0, 1):
+                    projected = state.copy()
+                    np.moveaxis(projected, axis, 0)[1 - outcome] = 0
+                    probability = np.vdot(projected, projected).real
+                    if probability > 0:
+                        bit = 1 << qubits[0]
+                        children.append((projected / np.sqrt(probability), weight * probability,
+                                         (record & ~bit) | (outcome * bit)))
+            elif condition is None or (record >> condition[0]) & 1 == condition[1]:
+                matrix = compiled.matrix(spec, param) if spec.kind == 'single' else None
+                children.append((ENGINE.apply_operation(state.copy(), spec, qubits, matrix), weight, record))
+            else:
+                children.append((state, weight, record))
+        branches = children
+    
+    distribution = np.zeros(2 ** num_qubits)
+    for _, weight, record in branches:
+        distribution[record] += weight
+    return distribution
+
+
+def branching_register_distribution(circuit_def):
+    """The same distribution from the final branches of BranchingSimulator."""
+    compiled = compile_circuit(circuit_def)
+    states, weights, records, _ = BranchingSimulator(ENGINE).run(compiled)
+    _, deferred_mask = branching_measurements(compiled)
+    distribution = np.zeros(2 ** compiled.num_qubits)
+    indices = np.arange(len(distribution))
+    for state, weight, record in zip(states, weights, records):
+        np.add.at(distribution, (indices & deferred_mask) | (int(record) & ~deferred_mask),
+                  weight * np.abs(state) ** 2)
+    return distribution
+
+
+def random_dynamic_circuit(num_qubits, num_gates, rng):
+    """Random circuit mixing rotations, CNOTs, mid-circuit measurements and c_if gates."""
+    gates = []
+    for _ in range(num_gates):
+        qubits = [int(qubit) for qubit in rng.permutation(num_qubits)]
+        kind = rng.integers(5)
+        if kind == 0:
+            gates.append({"type": "measure", "targets": qubits[:1]})
+            continue
+        if kind == 1:
+            gate = {"type": "cx", "controls": qubits[:1], "targets": qubits[1:2]}
+        else:
+            gate = {"type": str(rng.choice(['rx', 'ry'])), "targets": qubits[:1], "theta": float(rng.uniform(0, np.pi))}
+        if kind == 4:
+            gate["c_if"] = {"clbit": int(rng.integers(num_qubits)), "value": int(rng.integers(2))}
+        gates.append(gate)
+    gates.append({"type": "measure", "targets": list(range(num_qubits))})
+    return {"qubits": num_qubits, "gates": gates}
+
+
+DYNAMIC_CIRCUITS = [pytest.param(TELEPORTATION, id='teleportation')] + [
+    pytest.param(random_dynamic_circuit(3, 14, np.random.default_rng(seed)), id=f'random-{seed}') for seed in range(6)
+]
+
+
+@pytest.mark.parametrize('circuit_def', DYNAMIC_CIRCUITS)
+def test_matches_exact_enumeration(circuit_def):
+    assert compile_circuit(circuit_def).is_dynamic
+    np.testing.assert_allclose(branching_register_distribution(circuit_def),
+                               exact_register_distribution(circuit_def), atol=1e-12)
+
+
+@pytest.mark.parametrize('circuit_def', DYNAMIC_CIRCUITS)
+def test_sampled_counts_follow_the_exact_distribution(circuit_def):
+    compiled = compile_circuit(circuit_def)
+    result = BranchingSimulator(ENGINE).simulate(compiled, shots=20000, seed=3)
+    distribution = exact_register_distribution(circuit_def)
+    mask = sum(1 << qubit for qubit in compiled.measured_qubits)
+    
+    # Count keys are the full register with qubit 0 rightmost and unmeasured bits 0
+    expected = {}
+    for register, probability in enumerate(distribution):
+        key = format(register & mask, f'0{compiled.num_qubits}b')
+        expected[key] = expected.get(key, 0) + probability
+    distance = 0.5 * sum(abs(result["counts"].get(key, 0) / 20000 - probability)
+                         for key, probability in expected.items())
+    assert sum(result["counts"].values()) == 20000
+    assert distance < 0.03
+
+
+def test_teleportation_moves_the_state():
+    result = BranchingSimulator(ENGINE).simulate(compile_circuit(TELEPORTATION), shots=10, seed=0)
+    # rx(pi/4)|0> has Bloch vector (0, -sin(pi/4), cos(pi/4))
+    np.testing.assert_allclose(result["bloch_vectors"][:, 2], [0, -np.sqrt(0.5), np.sqrt(0.5)], atol=1e-12)
+    assert result["branches"]["branches"] == 4
+
+
+def test_identical_branches_are_merged():
+    # Measure, reset with a conditional X, then measure again: both
+    # first-round branches end up in the same state with the same bits
+    circuit_def = {"qubits": 1, "gates": [
+        {"type": "h", "targets": [0]},
+        {"type": "measure", "targets": [0]},
+        {"type": "x", "targets": [0], "c_if": {"clbit": 0, "value": 1}},
+        {"type": "h", "targets": [0]},
+        {"type": "measure", "targets": [0]},
+        {"type": "x", "targets": [0]}
+    ]}
+    _, weights, records, report = BranchingSimulator(ENGINE).run(compile_circuit(circuit_def))
+    assert report["branching_measurements"] == 2
+    assert report["merged_branches"] == 2
+    np.testing.assert_allclose(weights, [0.5, 0.5])
+    assert sorted(records.tolist()) == [0, 1]
+
+
+def test_too_many_branches_are_rejected():
+    gates = []
+    for qubit in range(4):
+        gates += [{"type": "h", "targets": [qubit]}, {"type": "measure", "targets": [qubit]},
+                  {"type": "x", "targets": [qubit]}]
+    with pytest.raises(ValueError, match="branches"):
+        BranchingSimulator(ENGINE, max_branches=8).run(compile_circuit({"qubits": 4, "gates": gates}))
+
+
+def test_auto_backend_runs_dynamic_circuits_on_numpy():
+    result = CircuitSimulator().simulate(TELEPORTATION, shots=256, seed=1)
+    assert result["backend"] == 'numpy'
+    assert result["branches"]["branches"] == 4
+    assert sum(result["counts"].values()) == 256
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for statevector checkpoints.
+Checkpointing is off by default and opt-in per request; a checkpointed
+run of an edited circuit resumes from the shared prefix and ends in the
+same state as a run from scratch.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('WARMUP', '0')
+
+import app as backend_app
+from quantum.checkpoints import CheckpointCache, create_checkpoint_cache
+from quantum.circuit_simulator import CircuitSimulator
+from quantum.ir import compile_circuit
+
+GATES = [{"type": "h", "targets": [qubit]} for qubit in range(4)]
+GATES += [{"type": "rx", "targets": [qubit], "theta": 0.3 * (qubit + 1)} for qubit in range(4)]
+GATES += [{"type": "cx", "controls": [qubit], "targets": [qubit + 1]} for qubit in range(3)]
+
+
+def circuit(*last_gates):
+    """Compiled 4-qubit circuit sharing GATES as its prefix."""
+    return compile_circuit({"qubits": 4, "gates": GATES + list(last_gates)})
+
+
+@pytest.fixture
+def simulator():
+    """Simulator with its own checkpoint cache."""
+    simulator = CircuitSimulator()
+    simulator.checkpoint_cache = CheckpointCache(max_bytes=2 ** 20)
+    return simulator
+
+
+def test_checkpointing_is_off_by_default(monkeypatch):
+    monkeypatch.delenv('CHECKPOINT_CACHE_MAX_BYTES', raising=False)
+    assert create_checkpoint_cache() is None
+    monkeypatch.setenv('CHECKPOINT_CACHE_MAX_BYTES', str(2 ** 20))
+    assert create_checkpoint_cache().max_bytes == 2 ** 20
+
+
+def test_runs_are_only_checkpointed_on_request(simulator):
+    simulator.simulate(circuit(), backend='numpy', seed=1, optimize=False)
+    assert simulator.checkpoint_cache.stats()["entries"] == 0
+    
+    simulator.simulate(circuit(), backend='numpy', seed=1, optimize=False, checkpoint=True)
+    assert simulator.checkpoint_cache.stats()["entries"] > 0
+
+
+def test_edited_circuit_resumes_from_its_prefix(simulator):
+    simulator.simulate(circuit({"type": "x", "targets": [0]}), backend='numpy', seed=1, optimize=False,
+                       checkpoint=True)
+    edited = circuit({"type": "y", "targets": [2]})
+    resumed = simulator.simulate(edited, backend='numpy', seed=1, optimize=False, checkpoint=True)
+    assert simulator.checkpoint_cache.stats()["gates_skipped"] == len(GATES)
+    
+    scratch = CircuitSimulator().simulate(edited, backend='numpy', seed=1, optimize=False)
+    np.testing.assert_allclose(resumed["statevector"], scratch["statevector"], atol=1e-12)
+
+
+def test_simulate_endpoint_checkpoints_only_when_asked(monkeypatch):
+    cache = CheckpointCache(max_bytes=2 ** 20)
+    monkeypatch.setattr(backend_app.circuit_simulator, 'checkpoint_cache', cache)
+    client = backend_app.app.test_client()
+    payload = {"circuit": {"qubits": 4, "gates": GATES}, "backend": "numpy", "seed": 11, "optimize": False}
+    
+    assert client.post('/api/simulate', json=payload).status_code == 200
+    assert cache.stats()["entries"] == 0
+    assert client.post('/api/simulate', json=dict(payload, seed=12, checkpoint=True)).status_code == 200
+    assert cache.stats()["entries"] > 0
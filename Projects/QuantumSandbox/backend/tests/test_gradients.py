@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for adjoint-differentiation gradients.
+Every rotation's derivative is compared against the parameter-shift rule,
+and named-parameter gradients against central finite differences, both
+evaluated on statevectors from the NumPy engine with a dense Pauli
+observable built here.
+"""
+
+import os
+from functools import reduce
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('WARMUP', '0')
+
+import app as backend_app
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.gradients import AdjointGradient
+from quantum.ir import compile_circuit
+
+PAULI_MATRICES = {
+    'I': np.eye(2),
+    'X': np.array([[0, 1], [1, 0]]),
+    'Y': np.array([[0, -1j], [1j, 0]]),
+    'Z': np.diag([1, -1])
+}
+
+OBSERVABLES = ["ZZI", {"pauli": "XIY", "coefficient": 0.5}, {"pauli": "IYX", "coefficient": -1.5}]
+
+
+def ansatz(num_layers, rng):
+    """Hardware-efficient ansatz on 3 qubits; some angles are named and shared."""
+    gates = []
+    for layer in range(num_layers):
+        for qubit in range(3):
+            gates.append({"type": "ry", "targets": [qubit], "theta": f"a{qubit}"})
+            gates.append({"type": str(rng.choice(['rx', 'rz'])), "targets": [qubit], "theta": float(rng.normal())})
+        gates.append({"type": "cx", "controls": [layer % 3], "targets": [(layer + 1) % 3]})
+        gates.append({"type": "cz", "controls": [2], "targets": [0]})
+        gates.append({"type": "h", "targets": [1]})
+    gates.append({"type": "measure", "targets": [0, 1, 2]})
+    return {"qubits": 3, "gates": gates}
+
+
+CIRCUIT_DEF = ansatz(3, np.random.default_rng(0))
+POINT = {"a0": 0.4, "a1": -1.1, "a2": 2.3}
+
+
+def expectation(circuit_def, point):
+    """<psi|H|psi> of OBSERVABLES, with the named angles bound to `point`."""
+    bound = dict(circuit_def, gates=[
+        dict(gate, theta=point[gate["theta"]]) if isinstance(gate.get("theta"), str) else gate
+        for gate in circuit_def["gates"]
+    ])
+    state, _ = NumpyStatevectorEngine().run(compile_circuit(bound))
+    psi = state.reshape(-1)
+    observable = 0
+    for term in OBSERVABLES:
+        term = {"pauli": term} if isinstance(term, str) else term
+        matrix = reduce(np.kron, [PAULI_MATRICES[pauli] for pauli in term["pauli"]])
+        observable = observable + term.get("coefficient", 1.0) * matrix
+    return float(np.vdot(psi, observable @ psi).real)
+
+
+def shifted(circuit_def, index, shift):
+    """Circuit with the angle of gate `index` shifted (named angles become fixed)."""
+    gates = [dict(gate) for gate in circuit_def["gates"]]
+    theta = gates[index]["theta"]
+    gates[index]["theta"] = (POINT[theta] if isinstance(theta, str) else theta) + shift
+    return dict(circuit_def, gates=gates)
+
+
+@pytest.fixture(params=['tensordot', 'sliced'])
+def differentiator(request):
+    """Adjoint differentiator, also with its engine forced onto the in-place sliced path."""
+    differentiator = AdjointGradient()
+    if request.param == 'sliced':
+        differentiator.engine.SLICED_MIN_AMPLITUDES = 1
+        differentiator.engine.SLICE_AMPLITUDES = 2
+    return differentiator
+
+
+def test_expectation_matches_dense_observable(differentiator):
+    result = differentiator.run(compile_circuit(CIRCUIT_DEF), OBSERVABLES, POINT)
+    assert result["expectation"] == pytest.approx(expectation(CIRCUIT_DEF, POINT), abs=1e-12)
+
+
+def test_gate_gradients_match_parameter_shift(differentiator):
+    result = differentiator.run(compile_circuit(CIRCUIT_DEF), OBSERVABLES, POINT)
+    rotations = [index for index, gate in enumerate(CIRCUIT_DEF["gates"]) if gate["type"] in ('rx', 'ry', 'rz')]
+    assert [entry["operation"] for entry in result["gate_gradients"]] == rotations
+    
+    for entry in result["gate_gradients"]:
+        index = entry["operation"]
+        shift = (expectation(shifted(CIRCUIT_DEF, index, np.pi / 2), POINT)
+                 - expectation(shifted(CIRCUIT_DEF, index, -np.pi / 2), POINT)) / 2
+        assert entry["gradient"] == pytest.approx(shift, abs=1e-10)
+        assert entry["parameter"] == (CIRCUIT_DEF["gates"][index]["theta"] if entry["gate"] == 'ry' else None)
+
+
+def test_named_gradients_match_finite_differences(differentiator):
+    result = differentiator.run(compile_circuit(CIRCUIT_DEF), OBSERVABLES, POINT)
+    step = 1e-5
+    for name in POINT:
+        plus = expectation(CIRCUIT_DEF, dict(POINT, **{name: POINT[name] + step}))
+        minus = expectation(CIRCUIT_DEF, dict(POINT, **{name: POINT[name] - step}))
+        assert result["gradient"][name] == pytest.approx((plus - minus) / (2 * step), abs=1e-7)
+
+
+def test_circuit_without_rotations_has_no_gradients():
+    circuit_def = {"qubits": 2, "gates": [{"type": "h", "targets": [0]}, {"type": "cx", "controls": [0], "targets": [1]}]}
+    result = AdjointGradient().run(compile_circuit(circuit_def), ["XX"])
+    assert result == {"expectation": pytest.approx(1), "gradient": {}, "gate_gradients": []}
+
+
+@pytest.mark.parametrize('circuit_def, point', [
+    (CIRCUIT_DEF, {"a0": 0.1}),
+    ({"qubits": 1, "gates": [
+        {"type": "measure", "targets": [0]},
+        {"type": "rx", "targets": [0], "theta": 0.3}
+    ]}, {})
+], ids=['missing-parameter', 'dynamic'])
+def test_invalid_requests_are_rejected(circuit_def, point):
+    with pytest.raises(ValueError):
+        AdjointGradient().run(compile_circuit(circuit_def), ["Z" * circuit_def["qubits"]], point)
+
+
+def test_gradient_endpoint():
+    client = backend_app.app.test_client()
+    response = client.post('/api/gradient', json={"circuit": CIRCUIT_DEF, "observables": OBSERVABLES, "point": POINT})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result["expectation"] == pytest.approx(expectation(CIRCUIT_DEF, POINT), abs=1e-12)
+    assert set(result["gradient"]) == set(POINT)
+    
+    response = client.post('/api/gradient', json={"circuit": CIRCUIT_DEF})
+    assert response.status_code == 400
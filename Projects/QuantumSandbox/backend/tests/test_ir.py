@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the compiled circuit IR.
+Covers alias resolution and multi-target expansion, validation of
+malformed gates, and the canonical digest that keys the result cache.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.ir import OPCODES, CompiledCircuit, build_circuit, compile_circuit
+
+
+def operations(compiled):
+    """(name, qubits, param) triples of a compiled circuit."""
+    return [(spec.name, qubits, param) for spec, qubits, param in compiled.operations()]
+
+
+def test_aliases_and_case_are_normalized():
+    compiled = compile_circuit({"qubits": 3, "gates": [
+        {"type": "H", "targets": [0]},
+        {"type": "CNOT", "controls": [0], "targets": [1]},
+        {"type": "toffoli", "controls": [0, 1], "targets": [2]}
+    ]})
+    assert operations(compiled) == [('h', (0,), 0.0), ('cx', (0, 1), 0.0), ('ccx', (0, 1, 2), 0.0)]
+
+
+def test_multi_target_gates_expand_to_one_row_each():
+    compiled = compile_circuit({"qubits": 3, "gates": [
+        {"type": "rx", "targets": [0, 2], "theta": 0.5},
+        {"type": "cx", "controls": [0, 1], "targets": [2]},
+        {"type": "measure", "targets": [1, 0]}
+    ]})
+    assert operations(compiled) == [
+        ('rx', (0,), 0.5), ('rx', (2,), 0.5),
+        ('cx', (0, 2), 0.0), ('cx', (1, 2), 0.0),
+        ('measure', (1,), 0.0), ('measure', (0,), 0.0)
+    ]
+    assert compiled.measured_qubits == [1, 0]
+    assert compiled.ops.dtype.names[:3] == ('opcode', 'qubits', 'param')
+
+
+@pytest.mark.parametrize('circuit_def', [
+    pytest.param({"qubits": 2, "gates": [{"type": "foo", "targets": [0]}]}, id="unknown-gate"),
+    pytest.param({"qubits": 2, "gates": [{"type": "unitary", "targets": [0]}]}, id="internal-gate"),
+    pytest.param({"qubits": 2, "gates": [{"type": "h", "targets": [2]}]}, id="qubit-out-of-range"),
+    pytest.param({"qubits": 2, "gates": [{"type": "h", "targets": [-1]}]}, id="negative-qubit"),
+    pytest.param({"qubits": 2, "gates": [{"type": "h", "targets": [True]}]}, id="bool-qubit"),
+    pytest.param({"qubits": 2, "gates": [{"type": "h", "targets": ["0"]}]}, id="string-qubit"),
+    pytest.param({"qubits": 2, "gates": [{"type": "swap", "targets": [1, 1]}]}, id="swap-same-qubit"),
+    pytest.param({"qubits": 2, "gates": [{"type": "swap", "targets": [1]}]}, id="swap-one-target"),
+    pytest.param({"qubits": 2, "gates": [{"type": "cx", "targets": [1]}]}, id="missing-control"),
+    pytest.param({"qubits": 3, "gates": [{"type": "ccx", "controls": [0], "targets": [2]}]}, id="ccx-one-control"),
+    pytest.param({"qubits": 2, "gates": [{"type": "cx", "controls": [1], "targets": [1]}]}, id="control-is-target"),
+    pytest.param({"qubits": 2, "gates": [{"type": "rx", "targets": [0], "theta": [1]}]}, id="non-numeric-theta"),
+    pytest.param({"qubits": 0, "gates": []}, id="no-qubits"),
+    pytest.param({"qubits": "2", "gates": []}, id="string-qubit-count")
+])
+def test_malformed_circuits_are_rejected(circuit_def):
+    with pytest.raises(ValueError):
+        compile_circuit(circuit_def)
+
+
+def test_digest_ignores_aliases_grouping_and_ui_fields():
+    grouped = {"qubits": 2, "gates": [
+        {"type": "H", "targets": [0, 1], "id": "gate-1", "position": {"x": 10}},
+        {"type": "cnot", "controls": [0], "targets": [1]}
+    ]}
+    expanded = {"qubits": 2, "gates": [
+        {"type": "h", "targets": [0]},
+        {"type": "h", "targets": [1]},
+        {"type": "cx", "controls": [0], "targets": [1]}
+    ]}
+    assert compile_circuit(grouped).digest == compile_circuit(expanded).digest
+
+
+@pytest.mark.parametrize('other', [
+    pytest.param({"qubits": 3, "gates": [{"type": "rx", "targets": [0], "theta": 0.5}]}, id="register-size"),
+    pytest.param({"qubits": 2, "gates": [{"type": "rx", "targets": [0], "theta": 0.25}]}, id="angle"),
+    pytest.param({"qubits": 2, "gates": [{"type": "rx", "targets": [1], "theta": 0.5}]}, id="qubit"),
+    pytest.param({"qubits": 2, "gates": [{"type": "ry", "targets": [0], "theta": 0.5}]}, id="gate")
+])
+def test_digest_separates_different_circuits(other):
+    base = {"qubits": 2, "gates": [{"type": "rx", "targets": [0], "theta": 0.5}]}
+    assert compile_circuit(base).digest != compile_circuit(other).digest
+
+
+def test_symbolic_angles_become_parameters():
+    compiled = compile_circuit({"qubits": 2, "gates": [
+        {"type": "ry", "targets": [0], "theta": "b"},
+        {"type": "rz", "targets": [1], "theta": "a"},
+        {"type": "rx", "targets": [1], "theta": "b"},
+        {"type": "rx", "targets": [0], "theta": 0.5}
+    ]})
+    assert compiled.parameters == ('b', 'a')
+    assert [name for _, _, _, name in compiled.operations(symbolic=True)] == ['b', 'a', 'b', None]
+    with pytest.raises(ValueError):
+        list(compiled.operations())
+
+
+def test_compiled_circuits_are_cached_and_passed_through():
+    circuit_def = {"qubits": 2, "gates": [{"type": "h", "targets": [0]}]}
+    compiled = compile_circuit(circuit_def)
+    assert compile_circuit(dict(circuit_def)) is compiled
+    assert compile_circuit(compiled) is compiled
+
+
+def test_build_circuit_stores_unitary_matrices():
+    matrix = np.array([[0, 1j], [1j, 0]])
+    compiled = build_circuit(2, [('unitary', (1,), matrix), ('cz', (0, 1), 0.0)])
+    assert isinstance(compiled, CompiledCircuit)
+    spec, qubits, param = next(compiled.operations())
+    assert (spec.name, qubits) == ('unitary', (1,))
+    np.testing.assert_array_equal(compiled.matrix(spec, param), matrix)
+    assert compiled.ops['opcode'].tolist() == [OPCODES['unitary'], OPCODES['cz']]
+
+
+def test_mid_circuit_measurement_is_detected():
+    terminal = compile_circuit({"qubits": 2, "gates": [
+        {"type": "h", "targets": [0]}, {"type": "measure", "targets": [0]}, {"type": "x", "targets": [1]}
+    ]})
+    mid_circuit = compile_circuit({"qubits": 2, "gates": [
+        {"type": "measure", "targets": [0]}, {"type": "cx", "controls": [0], "targets": [1]}
+    ]})
+    assert not terminal.has_mid_circuit_measurement
+    assert mid_circuit.has_mid_circuit_measurement
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the background job queue.
+Covers the job lifecycle with progress reports, failures, cancellation of
+queued, running and finished jobs, result expiry and the /api/jobs
+endpoints.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault('WARMUP', '0')
+
+import app as backend_app
+from quantum.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+TIMEOUT = 10
+
+
+def wait_for(job, *statuses):
+    """Poll a job until it reaches one of the given statuses."""
+    deadline = time.time() + TIMEOUT
+    while job.status not in statuses:
+        assert time.time() < deadline, f"job stuck in {job.status}"
+        time.sleep(0.005)
+    return job
+
+
+@pytest.fixture
+def queue():
+    """Queue with two workers: one for the small lane, one for both lanes."""
+    return JobQueue(max_workers=2, result_ttl=60)
+
+
+def test_job_runs_and_reports_progress(queue):
+    def task(progress):
+        progress('gates', 3, 4)
+        progress('shots', 10, 10)
+        return {"value": 42}
+    
+    job = queue.submit(task, 'small', shots=10, result_id='abc')
+    wait_for(job, DONE)
+    assert job.result == {"value": 42}
+    status = job.to_dict()
+    assert status["result_id"] == 'abc'
+    assert status["progress"] == {"gates_applied": 3, "gates_total": 4, "shots_done": 10, "shots_total": 10}
+    assert status["started_at"] <= status["finished_at"]
+    assert queue.get(job.id) is job
+
+
+def test_failing_job_records_the_error(queue):
+    def task(progress):
+        raise ValueError("broken circuit")
+    
+    job = wait_for(queue.submit(task, 'large'), FAILED)
+    assert job.error == "broken circuit"
+    assert job.result is None
+
+
+def test_cancel_queued_running_and_finished_jobs(queue):
+    release = threading.Event()
+    started = threading.Event()
+    
+    def blocking(progress):
+        started.set()
+        release.wait(TIMEOUT)
+        return 'blocked'
+    
+    def cancellable(progress):
+        while True:
+            progress('gates', 0, 1)
+            time.sleep(0.001)
+    
+    # Occupy both workers so the next job stays queued
+    running = queue.submit(cancellable, 'small')
+    blocker = queue.submit(blocking, 'small')
+    wait_for(running, RUNNING)
+    started.wait(TIMEOUT)
+    
+    queued = queue.submit(lambda progress: 'never', 'small')
+    assert queued.status == QUEUED
+    assert queue.cancel(queued.id).status == CANCELLED
+    
+    queue.cancel(running.id)
+    wait_for(running, CANCELLED)
+    
+    release.set()
+    wait_for(blocker, DONE)
+    queue.cancel(blocker.id)
+    assert queue.get(blocker.id) is None
+    assert queue.cancel('unknown') is None
+    assert queue.stats()["jobs"] == {CANCELLED: 2}
+
+
+def test_finished_jobs_expire_after_the_ttl(queue):
+    job = wait_for(queue.submit(lambda progress: 1, 'small'), DONE)
+    job.finished_at -= queue.result_ttl + 1
+    assert queue.get(job.id) is None
+
+
+def test_queue_limits():
+    queue = JobQueue(max_workers=2, max_jobs=1)
+    release = threading.Event()
+    queue.submit(lambda progress: release.wait(TIMEOUT), 'small')
+    with pytest.raises(RuntimeError):
+        queue.submit(lambda progress: None, 'small')
+    release.set()
+    with pytest.raises(ValueError):
+        queue.submit(lambda progress: None, 'huge')
+
+
+def test_lanes_split_by_work(queue):
+    assert queue.lane_for(10, 100) == 'small'
+    assert queue.lane_for(24, 10) == 'large'
+
+
+def test_job_endpoints():
+    client = backend_app.app.test_client()
+    payload = {"circuit": {"qubits": 2, "gates": [{"type": "h", "targets": [0]}]}, "shots": 64, "seed": 8}
+    response = client.post('/api/jobs', json=payload)
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    assert response.headers['Location'] == f'/api/jobs/{job_id}'
+    
+    deadline = time.time() + TIMEOUT
+    status = client.get(f'/api/jobs/{job_id}').get_json()
+    while status["status"] != DONE:
+        assert time.time() < deadline and status["status"] in (QUEUED, RUNNING)
+        time.sleep(0.01)
+        status = client.get(f'/api/jobs/{job_id}').get_json()
+    assert sum(status["result"]["counts"].values()) == 64
+    
+    assert client.delete(f'/api/jobs/{job_id}').status_code == 200
+    assert client.get(f'/api/jobs/{job_id}').status_code == 404
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the matrix-product-state backend.
+Without truncation the contracted MPS must equal the NumPy engine's
+statevector; with a bond-dimension cap the bonds stay within it and the
+discarded weight is reported.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.mps import MPSSimulator, estimate_bond_dimensions
+
+TOLERANCE = 1e-10
+
+
+def random_circuit(num_qubits, num_gates, rng):
+    """Random circuit with non-adjacent two- and three-qubit gates."""
+    single = ['h', 'x', 'y', 'z', 's', 'sdg', 't', 'tdg', 'rx', 'ry', 'rz']
+    choices = single + ['cx', 'cz', 'swap', 'ccx']
+    gates = []
+    for _ in range(num_gates):
+        gate_type = str(rng.choice(choices))
+        qubits = [int(qubit) for qubit in rng.permutation(num_qubits)]
+        if gate_type in ('cx', 'cz'):
+            gates.append({"type": gate_type, "controls": qubits[:1], "targets": qubits[1:2]})
+        elif gate_type == 'ccx':
+            gates.append({"type": gate_type, "controls": qubits[:2], "targets": qubits[2:3]})
+        elif gate_type == 'swap':
+            gates.append({"type": gate_type, "targets": qubits[:2]})
+        elif gate_type.startswith('r'):
+            gates.append({"type": gate_type, "targets": qubits[:1], "theta": float(rng.uniform(0, 2 * np.pi))})
+        else:
+            gates.append({"type": gate_type, "targets": qubits[:1]})
+    return {"qubits": num_qubits, "gates": gates}
+
+
+def contract(state):
+    """Dense statevector of an MPS, with qubit 0 as the least significant bit."""
+    vector = state.tensors[0][0]
+    for tensor in state.tensors[1:]:
+        vector = np.einsum('ia,apb->pib', vector, tensor).reshape(-1, tensor.shape[2])
+    return vector[:, 0]
+
+
+CIRCUITS = [
+    pytest.param(random_circuit(num_qubits, 40, np.random.default_rng(seed)), id=f"{num_qubits}q-{seed}")
+    for num_qubits in (3, 4, 6) for seed in range(3)
+]
+
+
+@pytest.mark.parametrize('circuit_def', CIRCUITS)
+def test_contraction_matches_statevector(circuit_def):
+    state, _ = MPSSimulator().run(compile_circuit(circuit_def), max_bond_dimension=64)
+    statevector, _ = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    assert state.truncation_error < TOLERANCE
+    np.testing.assert_allclose(contract(state), statevector, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('circuit_def', CIRCUITS)
+def test_local_expectations_match_statevector(circuit_def):
+    state, _ = MPSSimulator().run(compile_circuit(circuit_def))
+    statevector, _ = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    num_qubits = circuit_def['qubits']
+    probabilities = np.abs(statevector) ** 2
+    indices = np.arange(2 ** num_qubits)
+    marginals, bloch = state.local_expectations()
+    expected = [probabilities[(indices >> qubit) & 1 == 1].sum() for qubit in range(num_qubits)]
+    np.testing.assert_allclose(marginals, expected, atol=TOLERANCE)
+    np.testing.assert_allclose(bloch[2], 1 - 2 * np.array(expected), atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('circuit_def', CIRCUITS)
+def test_bond_estimate_is_an_upper_bound(circuit_def):
+    state, _ = MPSSimulator().run(compile_circuit(circuit_def))
+    assert np.all(2 ** estimate_bond_dimensions(compile_circuit(circuit_def)) >= np.array(state.bond_dimensions))
+
+
+def test_truncation_caps_bonds_and_reports_error():
+    circuit_def = random_circuit(8, 120, np.random.default_rng(4))
+    state, _ = MPSSimulator().run(compile_circuit(circuit_def), max_bond_dimension=2)
+    assert max(state.bond_dimensions) <= 2
+    assert state.truncation_error > 0
+    assert np.linalg.norm(contract(state)) == pytest.approx(1.0)
+
+
+def test_sampling_large_ghz_state():
+    num_qubits = 60
+    gates = [{"type": "h", "targets": [0]}]
+    gates += [{"type": "cx", "controls": [qubit], "targets": [qubit + 1]} for qubit in range(num_qubits - 1)]
+    result = MPSSimulator().simulate(compile_circuit({"qubits": num_qubits, "gates": gates}), shots=500, seed=2)
+    assert set(result["counts"]) <= {'0' * num_qubits, '1' * num_qubits}
+    assert sum(result["counts"].values()) == 500
+    assert max(result["mps"]["bond_dimensions"]) == 2
+    np.testing.assert_allclose(result["marginal_probabilities"], 0.5, atol=TOLERANCE)
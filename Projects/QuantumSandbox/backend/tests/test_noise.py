@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for noisy simulation.
+The density-matrix method is compared against a brute-force reference
+that applies full 2^n x 2^n gate unitaries and Kraus operators, and the
+Monte-Carlo trajectories against the exact density matrix within a
+statistical tolerance.
+"""
+
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from quantum.circuit_simulator import CircuitSimulator, NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.noise import (NoiseModel, NoisySimulator, amplitude_damping_kraus, density_matrix_bloch_vectors,
+                           depolarizing_kraus)
+
+CIRCUIT_DEF = {"qubits": 3, "gates": [
+    {"type": "h", "targets": [0]},
+    {"type": "ry", "targets": [2], "theta": 0.8},
+    {"type": "cx", "controls": [0], "targets": [1]},
+    {"type": "rx", "targets": [1], "theta": 1.3},
+    {"type": "cx", "controls": [2], "targets": [0]},
+    {"type": "measure", "targets": [0, 1, 2]}
+]}
+
+NOISE = {"depolarizing": 0.05, "amplitude_damping": {"probability": 0.1, "gates": ["cx"]}}
+
+_SINGLE = {
+    'h': np.array([[1, 1], [1, -1]]) / np.sqrt(2),
+    'x': np.array([[0, 1], [1, 0]])
+}
+
+
+def embed(matrix, qubit, num_qubits):
+    """Full operator of a 2x2 matrix on one qubit (qubit 0 is the least significant bit)."""
+    operator = np.eye(1)
+    for position in reversed(range(num_qubits)):
+        operator = np.kron(operator, matrix if position == qubit else np.eye(2))
+    return operator
+
+
+def gate_unitary(gate, num_qubits):
+    """Full unitary of one gate of CIRCUIT_DEF."""
+    theta = gate.get('theta')
+    if gate['type'] == 'ry':
+        matrix = np.array([[np.cos(theta / 2), -np.sin(theta / 2)], [np.sin(theta / 2), np.cos(theta / 2)]])
+    elif gate['type'] == 'rx':
+        matrix = np.array([[np.cos(theta / 2), -1j * np.sin(theta / 2)], [-1j * np.sin(theta / 2), np.cos(theta / 2)]])
+    else:
+        matrix = _SINGLE['x' if gate['type'] == 'cx' else gate['type']]
+    target = gate['targets'][0]
+    if gate['type'] != 'cx':
+        return embed(matrix, target, num_qubits)
+    one = embed(np.diag([0, 1]), gate['controls'][0], num_qubits)
+    return np.eye(2 ** num_qubits) - one + one @ embed(matrix, target, num_qubits)
+
+
+def brute_force_density_matrix(circuit_def, noise):
+    """rho after every gate and its channels, as sum_k K rho K^dagger on the full space."""
+    num_qubits = circuit_def['qubits']
+    rho = np.zeros((2 ** num_qubits, 2 ** num_qubits), dtype=complex)
+    rho[0, 0] = 1
+    for gate in circuit_def['gates']:
+        if gate['type'] == 'measure':
+            continue
+        unitary = gate_unitary(gate, num_qubits)
+        rho = unitary @ rho @ unitary.conj().T
+        for kraus in noise.kraus_after(gate['type']):
+            for qubit in gate.get('controls', []) + gate['targets']:
+                operators = [embed(operator, qubit, num_qubits) for operator in kraus]
+                rho = sum(operator @ rho @ operator.conj().T for operator in operators)
+    return rho
+
+
+@pytest.fixture
+def simulator():
+    """Noisy simulator without a process pool."""
+    return NoisySimulator(NumpyStatevectorEngine())
+
+
+@pytest.mark.parametrize('kraus', [depolarizing_kraus(0.3), amplitude_damping_kraus(0.4)],
+                         ids=['depolarizing', 'amplitude_damping'])
+def test_kraus_operators_are_trace_preserving(kraus):
+    np.testing.assert_allclose(np.einsum('kba,kbc->ac', kraus.conj(), kraus), np.eye(2), atol=1e-12)
+
+
+def test_density_matrix_matches_brute_force(simulator):
+    noise = NoiseModel.from_dict(NOISE)
+    rho = simulator.run_density_matrix(compile_circuit(CIRCUIT_DEF), noise)
+    expected = brute_force_density_matrix(CIRCUIT_DEF, noise)
+    np.testing.assert_allclose(rho, expected, atol=1e-12)
+    assert np.trace(rho).real == pytest.approx(1)
+
+
+def test_readout_error_matches_confusion_matrix():
+    noise = NoiseModel.from_dict({"readout_error": {"p1_given_0": 0.1, "p0_given_1": 0.3}})
+    probabilities = np.array([0.5, 0.2, 0.0, 0.3])
+    confusion = np.array([[0.9, 0.3], [0.1, 0.7]])
+    np.testing.assert_allclose(noise.apply_readout(probabilities, [0, 1], 2),
+                               np.kron(confusion, confusion) @ probabilities, atol=1e-12)
+    # Unmeasured qubits are not flipped
+    np.testing.assert_allclose(noise.apply_readout(probabilities, [1], 2),
+                               np.kron(confusion, np.eye(2)) @ probabilities, atol=1e-12)
+
+
+def exact_statistics(noise):
+    """Bloch vectors and outcome probabilities of CIRCUIT_DEF from the brute-force density matrix."""
+    rho = brute_force_density_matrix(CIRCUIT_DEF, noise)
+    bloch, _ = density_matrix_bloch_vectors(rho, CIRCUIT_DEF['qubits'])
+    return bloch, rho.diagonal().real
+
+
+def test_trajectories_converge_to_the_density_matrix(simulator):
+    noise = NoiseModel.from_dict(dict(NOISE, method='trajectories', trajectories=4000))
+    result = simulator.simulate(compile_circuit(CIRCUIT_DEF), noise, shots=20000, seed=11)
+    assert result["noise"] == {"method": 'trajectories', "trajectories": 4000, "chunks": 1}
+    
+    bloch, probabilities = exact_statistics(noise)
+    # Each component is a mean of 4000 values in [-1, 1]: 5 sigma is below 0.08
+    np.testing.assert_allclose(result["bloch_vectors"], bloch, atol=0.08)
+    
+    frequencies = np.zeros(8)
+    for bitstring, count in result["counts"].items():
+        frequencies[int(bitstring, 2)] = count / 20000
+    assert 0.5 * np.abs(frequencies - probabilities).sum() < 0.04
+
+
+class InlinePool:
+    """Pool double that runs trajectory chunks in this process."""
+    
+    max_workers = 3
+    
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.chunks = []
+    
+    def submit_trajectories(self, compiled, noise, shots_per_trajectory, seed):
+        self.chunks.append(len(shots_per_trajectory))
+        future = Future()
+        future.set_result(self.simulator.run_trajectories(compiled, noise, shots_per_trajectory, seed))
+        return future
+
+
+def test_trajectory_chunks_are_merged(simulator):
+    noise = NoiseModel.from_dict(dict(NOISE, method='trajectories', trajectories=10))
+    simulator.pool = InlinePool(NoisySimulator(simulator.engine))
+    result = simulator.simulate(compile_circuit(CIRCUIT_DEF), noise, shots=101, seed=5)
+    assert simulator.pool.chunks == [4, 3, 3]
+    assert result["noise"]["chunks"] == 3
+    assert sum(result["counts"].values()) == 101
+    assert np.all(np.abs(result["bloch_vectors"]) <= 1 + 1e-12)
+
+
+def test_circuit_noise_section_selects_the_density_matrix():
+    result = CircuitSimulator().simulate(dict(CIRCUIT_DEF, noise=NOISE), shots=500, seed=3)
+    assert result["noise"] == {"method": 'density_matrix'}
+    assert result["statevector"] is None
+    bloch, _ = exact_statistics(NoiseModel.from_dict(NOISE))
+    np.testing.assert_allclose(result["bloch_vectors"], bloch, atol=1e-12)
+
+
+@pytest.mark.parametrize('spec', [
+    {"depolarizing": 1.5},
+    {"depolarizing": True},
+    {"dephasing": 0.1},
+    {"amplitude_damping": {"probability": 0.1, "gates": ["nope"]}},
+    {"depolarizing": 0.1, "method": "exact"},
+    {"depolarizing": 0.1, "trajectories": 10 ** 9}
+], ids=['range', 'bool', 'unknown-channel', 'unknown-gate', 'method', 'trajectories'])
+def test_invalid_noise_sections_are_rejected(spec):
+    with pytest.raises(ValueError):
+        NoiseModel.from_dict(spec)
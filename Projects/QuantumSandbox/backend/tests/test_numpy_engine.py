@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parity tests for the NumPy statevector engine.
+Every supported gate and a set of random circuits are run on
+NumpyStatevectorEngine and compared against a dense-matrix reference
+built here from the textbook gate definitions (qubit 0 is the least
+significant bit, as in Qiskit), and against the Aer statevector
+simulator when qiskit-aer is installed.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+
+TOLERANCE = 1e-10
+
+_SQRT2 = np.sqrt(2)
+
+REFERENCE_GATES = {
+    'h': np.array([[1, 1], [1, -1]]) / _SQRT2,
+    'x': np.array([[0, 1], [1, 0]]),
+    'y': np.array([[0, -1j], [1j, 0]]),
+    'z': np.array([[1, 0], [0, -1]]),
+    's': np.array([[1, 0], [0, 1j]]),
+    'sdg': np.array([[1, 0], [0, -1j]]),
+    't': np.array([[1, 0], [0, (1 + 1j) / _SQRT2]]),
+    'tdg': np.array([[1, 0], [0, (1 - 1j) / _SQRT2]])
+}
+
+SINGLE_GATES = list(REFERENCE_GATES) + ['rx', 'ry', 'rz']
+ROTATIONS = ('rx', 'ry', 'rz')
+
+
+def reference_matrix(gate_type, theta=None):
+    """2x2 matrix of a single-qubit gate, rotations included."""
+    if gate_type not in ROTATIONS:
+        return REFERENCE_GATES[gate_type]
+    cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+    if gate_type == 'rx':
+        return np.array([[cos, -1j * sin], [-1j * sin, cos]])
+    if gate_type == 'ry':
+        return np.array([[cos, -sin], [sin, cos]])
+    return np.array([[cos - 1j * sin, 0], [0, cos + 1j * sin]])
+
+
+def reference_operator(gate, num_qubits):
+    """Dense 2**n x 2**n operator of one gate of a circuit definition."""
+    dimension = 2 ** num_qubits
+    operator = np.zeros((dimension, dimension), dtype=complex)
+    gate_type = gate['type']
+    controls = gate.get('controls', [])
+    targets = gate['targets']
+    for column in range(dimension):
+        if gate_type == 'swap':
+            first, second = targets
+            bits = ((column >> first) & 1, (column >> second) & 1)
+            row = column & ~(1 << first) & ~(1 << second) | (bits[1] << first) | (bits[0] << second)
+            operator[row, column] = 1
+        elif all((column >> control) & 1 for control in controls):
+            matrix = reference_matrix('x' if gate_type in ('cx', 'ccx') else 'z' if gate_type == 'cz' else gate_type,
+                                      gate.get('theta'))
+            target = targets[0]
+            bit = (column >> target) & 1
+            for outcome in (0, 1):
+                operator[column & ~(1 << target) | (outcome << target), column] += matrix[outcome, bit]
+        else:
+            operator[column, column] = 1
+    return operator
+
+
+def reference_statevector(circuit_def):
+    """Final statevector of a circuit definition by dense matrix products."""
+    num_qubits = circuit_def['qubits']
+    state = np.zeros(2 ** num_qubits, dtype=complex)
+    state[0] = 1
+    for gate in circuit_def['gates']:
+        state = reference_operator(gate, num_qubits) @ state
+    return state
+
+
+def random_circuit(num_qubits, num_gates, rng):
+    """Random circuit over every supported gate."""
+    gates = []
+    choices = SINGLE_GATES + ['cx', 'cz', 'swap'] + (['ccx'] if num_qubits >= 3 else [])
+    for _ in range(num_gates):
+        gate_type = str(rng.choice(choices)) if num_qubits > 1 else str(rng.choice(SINGLE_GATES))
+        qubits = [int(qubit) for qubit in rng.permutation(num_qubits)]
+        if gate_type in ('cx', 'cz'):
+            gates.append({"type": gate_type, "controls": qubits[:1], "targets": qubits[1:2]})
+        elif gate_type == 'ccx':
+            gates.append({"type": gate_type, "controls": qubits[:2], "targets": qubits[2:3]})
+        elif gate_type == 'swap':
+            gates.append({"type": gate_type, "targets": qubits[:2]})
+        elif gate_type in ROTATIONS:
+            gates.append({"type": gate_type, "targets": qubits[:1], "theta": float(rng.uniform(-2 * np.pi, 2 * np.pi))})
+        else:
+            gates.append({"type": gate_type, "targets": qubits[:1]})
+    return {"qubits": num_qubits, "gates": gates}
+
+
+def gate_circuits():
+    """One circuit per supported gate, on a non-trivial input state."""
+    # Put every qubit in a distinct superposition so phases and controls matter
+    preparation = [{"type": "ry", "targets": [qubit], "theta": 0.3 + 0.4 * qubit} for qubit in range(3)]
+    preparation += [{"type": "rz", "targets": [qubit], "theta": 0.2 + 0.5 * qubit} for qubit in range(3)]
+    cases = []
+    for gate_type in SINGLE_GATES:
+        for qubit in range(3):
+            gate = {"type": gate_type, "targets": [qubit]}
+            if gate_type in ROTATIONS:
+                gate["theta"] = 1.234
+            cases.append((f"{gate_type}-q{qubit}", gate))
+    for control, target in [(0, 1), (1, 0), (2, 0), (0, 2)]:
+        cases.append((f"cx-{control}{target}", {"type": "cx", "controls": [control], "targets": [target]}))
+        cases.append((f"cz-{control}{target}", {"type": "cz", "controls": [control], "targets": [target]}))
+    for first, second in [(0, 1), (0, 2), (2, 1)]:
+        cases.append((f"swap-{first}{second}", {"type": "swap", "targets": [first, second]}))
+    for controls, target in [([0, 1], 2), ([2, 0], 1), ([1, 2], 0)]:
+        cases.append((f"ccx-{controls[0]}{controls[1]}{target}", {"type": "ccx", "controls": controls, "targets": [target]}))
+    return [pytest.param({"qubits": 3, "gates": preparation + [gate]}, id=name) for name, gate in cases]
+
+
+RANDOM_CIRCUITS = [
+    pytest.param(random_circuit(num_qubits, 40, np.random.default_rng(seed)), id=f"random-{num_qubits}q-{seed}")
+    for num_qubits in (1, 2, 3, 5) for seed in range(3)
+]
+
+
+def aer_statevector(circuit_def):
+    """Final statevector of a circuit definition on the Aer statevector simulator."""
+    pytest.importorskip("qiskit.providers.aer")
+    from qiskit import Aer, QuantumCircuit, execute
+    
+    circuit = QuantumCircuit(circuit_def['qubits'])
+    for gate in circuit_def['gates']:
+        arguments = [gate['theta']] if gate['type'] in ROTATIONS else []
+        getattr(circuit, gate['type'])(*arguments, *gate.get('controls', []), *gate['targets'])
+    result = execute(circuit, Aer.get_backend('statevector_simulator')).result()
+    return np.asarray(result.get_statevector(circuit))
+
+
+@pytest.fixture(params=['tensordot', 'sliced'])
+def engine(request):
+    """NumPy engine on its small-state path, and forced onto the in-place sliced path."""
+    engine = NumpyStatevectorEngine(num_threads=2)
+    if request.param == 'sliced':
+        engine.SLICED_MIN_AMPLITUDES = 1
+        engine.SLICE_AMPLITUDES = 2
+    return engine
+
+
+@pytest.mark.parametrize('circuit_def', gate_circuits() + RANDOM_CIRCUITS)
+def test_matches_dense_reference(engine, circuit_def):
+    statevector, _ = engine.run(compile_circuit(circuit_def))
+    np.testing.assert_allclose(statevector, reference_statevector(circuit_def), atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('circuit_def', RANDOM_CIRCUITS)
+def test_single_precision_matches_dense_reference(engine, circuit_def):
+    statevector, _ = engine.run(compile_circuit(circuit_def), dtype=np.complex64)
+    assert statevector.dtype == np.complex64
+    np.testing.assert_allclose(statevector, reference_statevector(circuit_def), atol=1e-5)
+
+
+@pytest.mark.parametrize('slice_amplitudes', [1, 2, 8])
+@pytest.mark.parametrize('controls, target', [((), 0), ((), 2), ((), 4), ((3,), 0), ((0, 4), 2)])
+def test_sliced_update_matches_tensordot(slice_amplitudes, controls, target):
+    rng = np.random.default_rng(len(controls) * 5 + target)
+    state = (rng.normal(size=32) + 1j * rng.normal(size=32)).reshape((2,) * 5)
+    matrix = rng.normal(size=(2, 2)) + 1j * rng.normal(size=(2, 2))
+    engine = NumpyStatevectorEngine(num_threads=2)
+    engine.SLICE_AMPLITUDES = slice_amplitudes
+    
+    if controls:
+        expected = state.copy()
+        engine._apply_controlled(expected, matrix, controls, target)
+    else:
+        expected = engine._apply_single(state, matrix, target)
+    # Slices of a single amplitude pair are one-dimensional and must still be updated in place
+    sliced = engine._apply_sliced(state.copy(), matrix, controls, target)
+    np.testing.assert_allclose(sliced, expected, atol=TOLERANCE)
+
+
+def test_run_batch_matches_run():
+    circuit_def = {"qubits": 3, "gates": [
+        {"type": "h", "targets": [0]},
+        {"type": "ry", "targets": [1], "theta": "a"},
+        {"type": "cx", "controls": [0], "targets": [2]},
+        {"type": "rz", "targets": [2], "theta": "b"},
+        {"type": "ccx", "controls": [1, 2], "targets": [0]}
+    ]}
+    compiled = compile_circuit(circuit_def)
+    values = {"a": np.array([0.1, 1.7, -2.0]), "b": np.array([3.0, -0.4, 0.9])}
+    states = NumpyStatevectorEngine().run_batch(compiled, values)
+    for index in range(3):
+        bound = {"qubits": 3, "gates": [
+            dict(gate, theta=float(values[gate["theta"]][index])) if isinstance(gate.get("theta"), str) else gate
+            for gate in circuit_def["gates"]
+        ]}
+        np.testing.assert_allclose(states[index], reference_statevector(bound), atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('circuit_def', gate_circuits() + RANDOM_CIRCUITS)
+def test_matches_aer(circuit_def):
+    statevector, _ = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    np.testing.assert_allclose(statevector, aer_statevector(circuit_def), atol=TOLERANCE)
+
+
+def test_measured_qubits_are_reported():
+    circuit_def = {"qubits": 3, "gates": [
+        {"type": "h", "targets": [0]},
+        {"type": "measure", "targets": [2]},
+        {"type": "measure", "targets": [0]}
+    ]}
+    _, measured = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    assert measured == [2, 0]
+
+
+def test_rejects_gate_after_measurement():
+    circuit_def = {"qubits": 2, "gates": [
+        {"type": "measure", "targets": [0]},
+        {"type": "x", "targets": [0]}
+    ]}
+    with pytest.raises(ValueError):
+        NumpyStatevectorEngine().run(compile_circuit(circuit_def))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the peephole optimizer.
+Optimized circuits must produce exactly the statevector of the submitted
+circuit, global phase included, while the report shows the cancellations,
+merges and fusions that were made.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.optimizer import INVERSE_GATES, optimize_circuit
+from quantum.stabilizer import CLIFFORD_GATES
+
+TOLERANCE = 1e-10
+
+
+def redundant_circuit(num_qubits, num_gates, rng, gate_types=None):
+    """Random circuit where many gates are followed by their inverse or a repeat."""
+    gate_types = gate_types or ['h', 'x', 'y', 'z', 's', 'sdg', 't', 'tdg', 'rx', 'ry', 'rz', 'cx', 'cz', 'swap', 'ccx']
+    gates = []
+    for _ in range(num_gates):
+        if gates and rng.random() < 0.3:
+            previous = dict(gates[-1])
+            if previous['type'] in INVERSE_GATES:
+                previous['type'] = INVERSE_GATES[previous['type']]
+            elif 'theta' in previous:
+                previous['theta'] = float(rng.choice([-previous['theta'], rng.uniform(-np.pi, np.pi)]))
+            gates.append(previous)
+            continue
+        gate_type = str(rng.choice(gate_types))
+        qubits = [int(qubit) for qubit in rng.permutation(num_qubits)]
+        if gate_type in ('cx', 'cz'):
+            gates.append({"type": gate_type, "controls": qubits[:1], "targets": qubits[1:2]})
+        elif gate_type == 'ccx':
+            gates.append({"type": gate_type, "controls": qubits[:2], "targets": qubits[2:3]})
+        elif gate_type == 'swap':
+            gates.append({"type": gate_type, "targets": qubits[:2]})
+        elif gate_type.startswith('r'):
+            gates.append({"type": gate_type, "targets": qubits[:1], "theta": float(rng.uniform(-np.pi, np.pi))})
+        else:
+            gates.append({"type": gate_type, "targets": qubits[:1]})
+    return {"qubits": num_qubits, "gates": gates}
+
+
+def gate_names(compiled):
+    """Gate names of a compiled circuit in order."""
+    return [spec.name for spec, _, _ in compiled.operations()]
+
+
+def statevector(circuit_def):
+    """Final statevector of a circuit on the NumPy engine."""
+    state, _ = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    return state
+
+
+CIRCUITS = [
+    pytest.param(redundant_circuit(num_qubits, 60, np.random.default_rng(seed)), id=f"{num_qubits}q-{seed}")
+    for num_qubits in (3, 4, 5) for seed in range(4)
+]
+
+
+@pytest.mark.parametrize('fuse', [True, False])
+@pytest.mark.parametrize('circuit_def', CIRCUITS)
+def test_optimized_statevector_is_unchanged(circuit_def, fuse):
+    optimized, report = optimize_circuit(compile_circuit(circuit_def), fuse=fuse)
+    np.testing.assert_allclose(statevector(optimized), statevector(circuit_def), atol=TOLERANCE)
+    assert report["gates_after"] == len(optimized)
+    assert report["gates_after"] <= report["gates_before"]
+    assert report["depth_after"] <= report["depth_before"]
+
+
+def test_fusion_leaves_one_gate_per_single_qubit_run():
+    circuit_def = {"qubits": 1, "gates": [
+        {"type": "h", "targets": [0]}, {"type": "t", "targets": [0]}, {"type": "rx", "targets": [0], "theta": 0.3}
+    ]}
+    optimized, report = optimize_circuit(compile_circuit(circuit_def))
+    assert gate_names(optimized) == ['unitary']
+    assert report["gates_before"] == 3 and report["gates_after"] == 1
+
+
+def test_inverse_pairs_cancel_completely():
+    circuit_def = {"qubits": 3, "gates": [
+        {"type": "h", "targets": [0]},
+        {"type": "cnot", "controls": [0], "targets": [1]},
+        {"type": "s", "targets": [2]},
+        {"type": "sdg", "targets": [2]},
+        {"type": "cx", "controls": [0], "targets": [1]},
+        {"type": "cz", "controls": [1], "targets": [2]},
+        {"type": "cz", "controls": [2], "targets": [1]},
+        {"type": "h", "targets": [0]}
+    ]}
+    optimized, report = optimize_circuit(compile_circuit(circuit_def))
+    assert len(optimized) == 0
+    assert report == {"gates_before": 8, "gates_after": 0, "depth_before": 5, "depth_after": 0}
+
+
+def test_rotations_merge_and_full_periods_drop():
+    circuit_def = {"qubits": 1, "gates": [
+        {"type": "rz", "targets": [0], "theta": 1.5 * np.pi},
+        {"type": "rz", "targets": [0], "theta": 2.5 * np.pi}
+    ]}
+    optimized, _ = optimize_circuit(compile_circuit(circuit_def), fuse=False)
+    assert len(optimized) == 0
+
+
+def test_diagonal_gates_commute_past_controls():
+    circuit_def = {"qubits": 2, "gates": [
+        {"type": "cx", "controls": [0], "targets": [1]},
+        {"type": "rz", "targets": [0], "theta": 0.7},
+        {"type": "cx", "controls": [0], "targets": [1]}
+    ]}
+    optimized, _ = optimize_circuit(compile_circuit(circuit_def), fuse=False)
+    assert gate_names(optimized) == ['rz']
+    np.testing.assert_allclose(statevector(optimized), statevector(circuit_def), atol=TOLERANCE)
+
+
+def test_unfused_clifford_circuits_stay_clifford():
+    circuit_def = redundant_circuit(4, 80, np.random.default_rng(9), gate_types=sorted(CLIFFORD_GATES))
+    optimized, _ = optimize_circuit(compile_circuit(circuit_def), fuse=False)
+    assert optimized.gate_names() <= CLIFFORD_GATES
+    np.testing.assert_allclose(statevector(optimized), statevector(circuit_def), atol=TOLERANCE)
+
+
+def test_multi_target_gates_are_expanded():
+    circuit_def = {"qubits": 3, "gates": [{"type": "h", "targets": [0, 1, 2]}, {"type": "h", "targets": [1]}]}
+    optimized, report = optimize_circuit(compile_circuit(circuit_def), fuse=False)
+    assert report["gates_before"] == 4
+    assert sorted(qubits[0] for _, qubits, _ in optimized.operations()) == [0, 2]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the memory-mapped out-of-core statevector engine.
+Random circuits are run with chunks of a few amplitudes, so every gate
+kind crosses chunk boundaries, and compared against the in-memory NumPy
+engine.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.out_of_core import OutOfCoreStatevectorEngine, plan_passes
+
+CHUNK_QUBITS = 2
+NUM_QUBITS = 6
+
+
+def random_circuit(num_qubits, num_gates, rng):
+    """Random circuit of rotations, CNOTs, Toffolis and swaps over all qubits."""
+    gates = []
+    for _ in range(num_gates):
+        qubits = [int(qubit) for qubit in rng.permutation(num_qubits)]
+        kind = rng.integers(5)
+        if kind == 0:
+            gates.append({"type": "h", "targets": qubits[:1]})
+        elif kind == 1:
+            gates.append({"type": "ry", "targets": qubits[:1], "theta": float(rng.normal())})
+        elif kind == 2:
+            gates.append({"type": "cx", "controls": qubits[:1], "targets": qubits[1:2]})
+        elif kind == 3:
+            gates.append({"type": "ccx", "controls": qubits[:2], "targets": qubits[2:3]})
+        else:
+            gates.append({"type": "swap", "targets": qubits[:2]})
+    # Phases make the Bloch x/y components non-trivial
+    gates += [{"type": "s", "targets": [qubit]} for qubit in range(0, num_qubits, 2)]
+    return compile_circuit({"qubits": num_qubits, "gates": gates})
+
+
+def reference_statistics(compiled):
+    """Probabilities, P(qubit = 1) and Bloch vectors from the NumPy engine."""
+    statevector, _ = NumpyStatevectorEngine().run(compiled)
+    probabilities = np.abs(statevector) ** 2
+    indices = np.arange(len(statevector))
+    marginals = np.array([probabilities[(indices >> qubit) & 1 == 1].sum() for qubit in range(compiled.num_qubits)])
+    coherences = np.array([
+        np.vdot(statevector[(indices >> qubit) & 1 == 1], statevector[(indices >> qubit) & 1 == 0])
+        for qubit in range(compiled.num_qubits)
+    ])
+    bloch = np.array([2 * coherences.real, -2 * coherences.imag, 1 - 2 * marginals])
+    return probabilities, marginals, bloch
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine with tiny chunks and its files in a per-test directory."""
+    return OutOfCoreStatevectorEngine(directory=str(tmp_path), chunk_qubits=CHUNK_QUBITS)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_numpy_engine(engine, seed):
+    compiled = random_circuit(NUM_QUBITS, 40, np.random.default_rng(seed))
+    probabilities, marginals, bloch = reference_statistics(compiled)
+    result = engine.simulate(compiled, shots=20000, seed=seed)
+    
+    assert result["out_of_core"]["norm"] == pytest.approx(1)
+    np.testing.assert_allclose(result["marginal_probabilities"], marginals, atol=1e-10)
+    # x/y components of in-chunk qubits and of qubits paired across chunks
+    np.testing.assert_allclose(result["bloch_vectors"], bloch, atol=1e-10)
+    
+    # Sampled frequencies follow the exact distribution
+    frequencies = np.zeros(2 ** NUM_QUBITS)
+    for bitstring, count in result["counts"].items():
+        frequencies[int(bitstring, 2)] = count / 20000
+    assert np.all(probabilities[frequencies > 0] > 1e-12)
+    assert 0.5 * np.abs(frequencies - probabilities).sum() < 0.03
+
+
+def test_single_precision_file(engine):
+    compiled = random_circuit(NUM_QUBITS, 30, np.random.default_rng(9))
+    _, marginals, _ = reference_statistics(compiled)
+    result = engine.simulate(compiled, shots=10, seed=1, dtype=np.complex64)
+    assert result["out_of_core"]["disk_bytes"] == 2 ** NUM_QUBITS * 8
+    np.testing.assert_allclose(result["marginal_probabilities"], marginals, atol=1e-5)
+
+
+def test_low_qubit_gates_share_a_pass():
+    compiled = compile_circuit({"qubits": 6, "gates": [
+        {"type": "h", "targets": [0]},
+        {"type": "cx", "controls": [0], "targets": [1]},
+        {"type": "cx", "controls": [1], "targets": [4]},
+        {"type": "cx", "controls": [4], "targets": [5]},
+        {"type": "cx", "controls": [5], "targets": [3]},
+        {"type": "measure", "targets": [0]}
+    ]})
+    passes = plan_passes(compiled, chunk_qubits=2, max_high_qubits=2)
+    assert [high for high, _ in passes] == [(4, 5), (3, 5)]
+    assert sum(len(operations) for _, operations in passes) == 5
+
+
+def test_disk_quota_is_enforced_and_released(tmp_path):
+    compiled = random_circuit(NUM_QUBITS, 5, np.random.default_rng(0))
+    engine = OutOfCoreStatevectorEngine(directory=str(tmp_path), max_disk_bytes=100, chunk_qubits=CHUNK_QUBITS)
+    with pytest.raises(ValueError, match="disk quota"):
+        engine.simulate(compiled, shots=1)
+    
+    OutOfCoreStatevectorEngine(directory=str(tmp_path), chunk_qubits=CHUNK_QUBITS).simulate(compiled, shots=1)
+    assert OutOfCoreStatevectorEngine._disk_reserved == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rejects_mid_circuit_measurement(engine):
+    compiled = compile_circuit({"qubits": 3, "gates": [
+        {"type": "measure", "targets": [0]},
+        {"type": "h", "targets": [0]}
+    ]})
+    with pytest.raises(ValueError):
+        engine.simulate(compiled, shots=1)
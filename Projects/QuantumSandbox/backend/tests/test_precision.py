@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Single- vs double-precision comparison tests.
+Every AlgorithmLibrary circuit is simulated on the NumPy backend with
+precision="single" and precision="double", and the norm drift and the
+largest probability error reported for the complex64 statevector must
+stay within PRECISION_TOLERANCE.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.algorithm_library import AlgorithmLibrary
+from quantum.circuit_simulator import CircuitSimulator
+from quantum.ir import compile_circuit
+
+# Largest norm drift and probability error accepted from a complex64 statevector
+PRECISION_TOLERANCE = 1e-5
+
+ALGORITHMS = AlgorithmLibrary().algorithms
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    """One simulator for the module, so its NumPy engine and caches are shared."""
+    return CircuitSimulator()
+
+
+@pytest.mark.parametrize('algorithm_id', list(ALGORITHMS))
+def test_single_precision_within_tolerance(simulator, algorithm_id):
+    circuit_def = ALGORITHMS[algorithm_id]["circuit_def"]
+    single = simulator.simulate(circuit_def, shots=256, backend='numpy', seed=7, precision='single')
+    double = simulator.simulate(circuit_def, shots=256, backend='numpy', seed=7, precision='double')
+    assert double["precision"] == 'double'
+    assert "accuracy" not in double
+    
+    if compile_circuit(circuit_def).is_dynamic:
+        # Branching simulations always run in double precision
+        assert single["precision"] == 'double'
+        assert single["counts"] == double["counts"]
+        return
+    
+    assert single["precision"] == 'single'
+    assert single["statevector"].dtype == np.complex64
+    accuracy = single["accuracy"]
+    assert accuracy["norm_drift"] <= PRECISION_TOLERANCE
+    assert accuracy["max_probability_error"] is not None
+    assert accuracy["max_probability_error"] <= PRECISION_TOLERANCE
+    
+    # The reported error agrees with the two statevectors actually returned
+    single_probabilities = np.abs(single["statevector"]).astype(np.float64) ** 2
+    double_probabilities = np.abs(double["statevector"]) ** 2
+    assert np.max(np.abs(single_probabilities - double_probabilities)) <= PRECISION_TOLERANCE
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the Qiskit-free text circuit diagrams.
+Every non-Aer backend returns a "circuit_diagram" without building a
+Qiskit circuit.
+"""
+
+import pytest
+
+from quantum.algorithm_library import AlgorithmLibrary
+from quantum.circuit_simulator import CircuitSimulator
+from quantum.ir import compile_circuit
+from quantum.rendering import draw_circuit_text
+
+TELEPORTATION = AlgorithmLibrary().algorithms['teleportation']['circuit_def']
+
+GHZ = {"qubits": 3, "gates": [
+    {"type": "h", "targets": [0]},
+    {"type": "cx", "controls": [0], "targets": [1]},
+    {"type": "cx", "controls": [1], "targets": [2]},
+    {"type": "measure", "targets": [0, 1, 2]}
+]}
+
+
+def test_wires_and_labels():
+    diagram = draw_circuit_text(compile_circuit({"qubits": 3, "gates": [
+        {"type": "ccx", "controls": [0, 2], "targets": [1]},
+        {"type": "ry", "targets": [1], "theta": "alpha"},
+        {"type": "rz", "targets": [0], "theta": 0.5},
+        {"type": "swap", "targets": [0, 2]}
+    ]}))
+    lines = diagram.split('\n')
+    assert [line.split(':')[0] for line in lines] == ['q_0', 'q_1', 'q_2']
+    assert len({len(line) for line in lines}) == 1
+    assert lines[0].replace('─', ' ').split() == ['q_0:', '■', 'RZ(0.5)', 'x']
+    assert 'RY(alpha)' in lines[1]
+    # The swap crosses q_1 and the Toffoli target sits between its controls
+    assert lines[1].count('┼') == 1 and '─X─' in lines[1]
+
+
+def test_conditional_gates_follow_their_measurement():
+    lines = draw_circuit_text(compile_circuit(TELEPORTATION)).split('\n')
+    assert lines[2].index('X[c1=1]') > lines[1].index('M')
+    assert lines[2].index('Z[c0=1]') > lines[0].index('M')
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    """Simulator that fails if any backend builds a Qiskit circuit."""
+    def forbidden(self, compiled):
+        raise AssertionError("Qiskit circuit built on a non-Aer backend")
+    
+    monkeypatch.setattr(CircuitSimulator, '_create_qiskit_circuit', forbidden)
+    return CircuitSimulator()
+
+
+@pytest.mark.parametrize('circuit_def, backend', [
+    (GHZ, 'numpy'),
+    (GHZ, 'stabilizer'),
+    (GHZ, 'mps'),
+    (dict(GHZ, noise={"depolarizing": 0.01}), 'numpy'),
+    (TELEPORTATION, 'numpy')
+], ids=['numpy', 'stabilizer', 'mps', 'noisy', 'branching'])
+def test_every_backend_returns_a_diagram(simulator, circuit_def, backend):
+    result = simulator.simulate(circuit_def, shots=16, backend=backend, seed=0)
+    assert result["circuit_diagram"] == draw_circuit_text(compile_circuit(circuit_def))
+
+
+def test_no_diagram_above_the_size_limit(simulator):
+    num_qubits = CircuitSimulator.DIAGRAM_MAX_QUBITS + 1
+    circuit_def = {"qubits": num_qubits, "gates": [{"type": "h", "targets": [0]}]}
+    assert simulator.simulate(circuit_def, shots=4, backend='stabilizer')["circuit_diagram"] is None
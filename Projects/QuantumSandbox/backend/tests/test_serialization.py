@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the statevector wire formats.
+Sparse mode must keep the most probable states, and out-of-range top_k or
+threshold options must be rejected with 400 instead of failing later.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('WARMUP', '0')
+
+import app as backend_app
+from quantum.serialization import select_amplitudes
+
+BELL = {"qubits": 2, "gates": [{"type": "h", "targets": [0]}, {"type": "cx", "controls": [0], "targets": [1]}]}
+AMPLITUDES = np.sqrt(np.array([0.5, 0.3, 0.0, 0.2])).astype(complex)
+
+
+@pytest.fixture
+def client():
+    """Flask test client of the backend app."""
+    return backend_app.app.test_client()
+
+
+def test_select_amplitudes():
+    assert select_amplitudes(AMPLITUDES) is None
+    assert select_amplitudes(AMPLITUDES, top_k=2).tolist() == [0, 1]
+    assert select_amplitudes(AMPLITUDES, threshold=0.25).tolist() == [0, 1]
+    assert select_amplitudes(AMPLITUDES, threshold=0).tolist() == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("options", [
+    {"top_k": 0}, {"top_k": -3}, {"top_k": 1.5}, {"top_k": True}, {"top_k": "4"},
+    {"threshold": -0.1}, {"threshold": float('nan')}, {"threshold": "0.1"}
+])
+def test_select_amplitudes_rejects_out_of_range_options(options):
+    with pytest.raises(ValueError):
+        select_amplitudes(AMPLITUDES, **options)
+
+
+@pytest.mark.parametrize("options", [{"top_k": 0}, {"top_k": -1}, {"threshold": -0.5}])
+def test_out_of_range_options_are_rejected_with_400(client, options):
+    response = client.post('/api/simulate', json=dict({"circuit": BELL, "seed": 1}, **options))
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+    
+    batch = client.post('/api/simulate/batch', json=dict({"requests": [{"circuit": BELL, "seed": 1}]}, **options))
+    assert batch.status_code == 400
+
+
+def test_sparse_mode_response(client):
+    response = client.post('/api/simulate', json={"circuit": BELL, "seed": 1, "top_k": 1})
+    assert response.status_code == 200
+    assert len(response.get_json()["result"]["statevector"]) == 1
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the stabilizer-tableau backend.
+Random Clifford circuits are run on the tableau and on the NumPy
+statevector engine; the measurement distribution, the Bloch vectors and
+the stabilizer generators of the tableau must describe the same state.
+"""
+
+import numpy as np
+import pytest
+
+from quantum.circuit_simulator import CircuitSimulator, NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.stabilizer import (CLIFFORD_GATES, StabilizerSimulator, is_clifford_circuit,
+                                sample_stabilizer_counts)
+
+TOLERANCE = 1e-10
+
+PAULIS = {
+    'I': np.eye(2),
+    'X': np.array([[0, 1], [1, 0]]),
+    'Y': np.array([[0, -1j], [1j, 0]]),
+    'Z': np.array([[1, 0], [0, -1]])
+}
+
+
+def random_clifford_circuit(num_qubits, num_gates, rng):
+    """Random circuit over the gates the tableau supports."""
+    single = ['h', 'x', 'y', 'z', 's', 'sdg']
+    gates = []
+    for _ in range(num_gates):
+        gate_type = str(rng.choice(sorted(CLIFFORD_GATES) if num_qubits > 1 else single))
+        qubits = [int(qubit) for qubit in rng.permutation(num_qubits)]
+        if gate_type in ('cx', 'cz'):
+            gates.append({"type": gate_type, "controls": qubits[:1], "targets": qubits[1:2]})
+        elif gate_type == 'swap':
+            gates.append({"type": gate_type, "targets": qubits[:2]})
+        else:
+            gates.append({"type": gate_type, "targets": qubits[:1]})
+    return {"qubits": num_qubits, "gates": gates}
+
+
+def pauli_operator(label):
+    """Dense operator of a Pauli string with qubit 0 rightmost."""
+    operator = np.eye(1)
+    for letter in label:
+        operator = np.kron(operator, PAULIS[letter])
+    return operator
+
+
+def distribution(tableau):
+    """Computational-basis probabilities described by a tableau."""
+    x0, basis = tableau.z_basis_distribution()
+    weights = 1 << np.arange(tableau.num_qubits)
+    probabilities = np.zeros(2 ** tableau.num_qubits)
+    for coefficients in range(2 ** len(basis)):
+        bits = x0.copy()
+        for row in range(len(basis)):
+            if coefficients >> row & 1:
+                bits ^= basis[row]
+        probabilities[int(bits @ weights)] += 1 / 2 ** len(basis)
+    return probabilities
+
+
+CIRCUITS = [
+    pytest.param(random_clifford_circuit(num_qubits, 30, np.random.default_rng(seed)), id=f"{num_qubits}q-{seed}")
+    for num_qubits in (1, 2, 3, 5) for seed in range(4)
+]
+
+
+@pytest.mark.parametrize('circuit_def', CIRCUITS)
+def test_distribution_matches_statevector(circuit_def):
+    tableau, _ = StabilizerSimulator().run(compile_circuit(circuit_def))
+    statevector, _ = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    np.testing.assert_allclose(distribution(tableau), np.abs(statevector) ** 2, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('circuit_def', CIRCUITS)
+def test_bloch_vectors_match_statevector(circuit_def):
+    tableau, _ = StabilizerSimulator().run(compile_circuit(circuit_def))
+    statevector, _ = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    num_qubits = circuit_def['qubits']
+    expected = np.zeros((3, num_qubits))
+    for qubit in range(num_qubits):
+        for axis, letter in enumerate('XYZ'):
+            label = ''.join(letter if position == qubit else 'I' for position in reversed(range(num_qubits)))
+            expected[axis, qubit] = np.vdot(statevector, pauli_operator(label) @ statevector).real
+    np.testing.assert_allclose(tableau.bloch_vectors(), expected, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('circuit_def', CIRCUITS)
+def test_stabilizers_fix_the_statevector(circuit_def):
+    tableau, _ = StabilizerSimulator().run(compile_circuit(circuit_def))
+    statevector, _ = NumpyStatevectorEngine().run(compile_circuit(circuit_def))
+    for generator in tableau.stabilizer_strings():
+        sign = -1 if generator[0] == '-' else 1
+        np.testing.assert_allclose(sign * pauli_operator(generator[1:]) @ statevector, statevector, atol=TOLERANCE)
+
+
+def test_sampled_counts_stay_in_support():
+    circuit_def = random_clifford_circuit(4, 25, np.random.default_rng(11))
+    tableau, _ = StabilizerSimulator().run(compile_circuit(circuit_def))
+    probabilities = distribution(tableau)
+    counts = sample_stabilizer_counts(tableau, range(4), 2000, seed=3)
+    assert sum(counts.values()) == 2000
+    for bitstring, count in counts.items():
+        assert probabilities[int(bitstring, 2)] > 0
+        # Outcomes are uniform over the support
+        assert abs(count / 2000 - probabilities[int(bitstring, 2)]) < 0.05
+
+
+def test_is_clifford_circuit():
+    assert is_clifford_circuit(compile_circuit({"qubits": 2, "gates": [
+        {"type": "h", "targets": [0]}, {"type": "cnot", "controls": [0], "targets": [1]}, {"type": "measure", "targets": [1]}
+    ]}))
+    assert not is_clifford_circuit(compile_circuit({"qubits": 1, "gates": [{"type": "t", "targets": [0]}]}))
+    assert not is_clifford_circuit(compile_circuit({"qubits": 1, "gates": [{"type": "rx", "targets": [0], "theta": 0.1}]}))
+
+
+def test_large_ghz_state():
+    num_qubits = 300
+    gates = [{"type": "h", "targets": [0]}]
+    gates += [{"type": "cx", "controls": [qubit], "targets": [qubit + 1]} for qubit in range(num_qubits - 1)]
+    result = CircuitSimulator().simulate({"qubits": num_qubits, "gates": gates}, shots=200, backend='stabilizer', seed=5)
+    assert set(result["counts"]) <= {'0' * num_qubits, '1' * num_qubits}
+    assert sum(result["counts"].values()) == 200
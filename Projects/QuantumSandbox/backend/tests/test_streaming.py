@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for per-gate state streaming.
+Covers the binary frame layout, the delta-encoded snapshots replayed on
+the client side, layer scheduling and the credit-based flow control.
+"""
+
+from collections import deque
+
+import numpy as np
+import pytest
+
+from quantum.circuit_simulator import NumpyStatevectorEngine
+from quantum.ir import compile_circuit
+from quantum.streaming import CreditWindow, StateStreamer, decode_frame, encode_frame, evolution_steps
+
+CIRCUIT = compile_circuit({"qubits": 4, "gates": [
+    {"type": "h", "targets": [0]},
+    {"type": "h", "targets": [2]},
+    {"type": "cx", "controls": [0], "targets": [1]},
+    {"type": "ry", "targets": [3], "theta": 0.7},
+    {"type": "t", "targets": [1]},
+    {"type": "cz", "controls": [2], "targets": [3]},
+    {"type": "swap", "targets": [0, 3]},
+    {"type": "rx", "targets": [2], "theta": 1e-7},
+    {"type": "measure", "targets": [0, 1, 2, 3]}
+]})
+
+
+def replay(frames, num_qubits):
+    """Rebuild the client-side state after every frame."""
+    state = np.zeros(2 ** num_qubits, dtype=np.complex64)
+    states = []
+    for frame in frames:
+        _, _, indices, values = decode_frame(frame)
+        state[indices] = values
+        states.append(state.copy())
+    return states
+
+
+def test_frame_round_trip():
+    indices = np.array([0, 5, 2 ** 20 + 3])
+    values = np.array([0.5 + 0.25j, -1j, 1e-3], dtype=np.complex64)
+    frame = encode_frame(7, 12, indices, values)
+    assert len(frame) == 12 + 3 * 12
+    
+    step, applied, decoded_indices, decoded_values = decode_frame(frame)
+    assert (step, applied) == (7, 12)
+    np.testing.assert_array_equal(decoded_indices, indices)
+    np.testing.assert_array_equal(decoded_values, values)
+    
+    empty = decode_frame(encode_frame(3, 4, [], []))
+    assert empty[:2] == (3, 4)
+    assert len(empty[2]) == len(empty[3]) == 0
+
+
+@pytest.mark.parametrize('granularity', ['gate', 'layer'])
+def test_replayed_frames_track_the_statevector(granularity):
+    streamer = StateStreamer()
+    steps = streamer.prepare(CIRCUIT, granularity)
+    tolerance = 1e-6
+    frames = list(streamer.frames(CIRCUIT, steps, tolerance))
+    assert len(frames) == len(steps) + 1
+    assert decode_frame(frames[-1])[1] == len(CIRCUIT)
+    
+    states = replay(frames, CIRCUIT.num_qubits)
+    assert states[0][0] == 1
+    final, _ = NumpyStatevectorEngine().run(CIRCUIT)
+    assert np.max(np.abs(states[-1] - final.reshape(-1))) <= tolerance
+    
+    # The tiny rotation stays below the tolerance and is not resent
+    if granularity == 'gate':
+        assert len(decode_frame(frames[8])[2]) == 0
+
+
+def test_layers_hold_operations_on_disjoint_qubits():
+    layers = evolution_steps(CIRCUIT, 'layer')
+    assert len(layers) < len(evolution_steps(CIRCUIT, 'gate'))
+    for layer in layers:
+        qubits = [qubit for _, operation_qubits, _ in layer for qubit in operation_qubits]
+        assert len(qubits) == len(set(qubits))
+    with pytest.raises(ValueError):
+        evolution_steps(CIRCUIT, 'shot')
+
+
+def test_prepare_rejects_unsupported_circuits():
+    streamer = StateStreamer()
+    with pytest.raises(ValueError):
+        streamer.prepare(compile_circuit({"qubits": 1, "gates": [
+            {"type": "measure", "targets": [0]},
+            {"type": "h", "targets": [0]}
+        ]}))
+    with pytest.raises(ValueError):
+        streamer.prepare(compile_circuit({"qubits": StateStreamer.MAX_QUBITS + 1, "gates": []}))
+
+
+def receiver(*messages):
+    """receive(timeout) double that returns queued messages, then None."""
+    pending = deque(messages)
+    return lambda timeout: pending.popleft() if pending else None
+
+
+def test_credit_window_waits_for_acks():
+    window = CreditWindow(2, timeout=0.01)
+    receive = receiver()
+    assert window.acquire(receive)
+    assert window.acquire(receive)
+    # No credits left and no grant within the timeout
+    assert not window.acquire(receive)
+    
+    receive = receiver({"type": "ack", "frames": 1})
+    assert window.acquire(receive)
+    assert window.credits == 0
+    assert not window.cancelled
+
+
+def test_credit_window_notices_a_cancel_with_credits_left():
+    window = CreditWindow(8, timeout=1)
+    assert not window.acquire(receiver({"type": "ack", "frames": 2}, {"type": "cancel"}))
+    assert window.cancelled
+    assert window.credits == 10